@@ -17,13 +17,33 @@ import re
 
 # gemini 모듈 임포트
 try:
-    from gemini import GeminiAPI
+    from gemini import (DuplicateIndex, GeminiAPI, GenerateAhead, ResponseCache, TokenBudget, get_gemini_api,
+                        insert_date_disclaimer, validate_blog_post)
 except ImportError:
+    TokenBudget = None
+    GenerateAhead = None
     GeminiAPI = None
+    get_gemini_api = None
+    ResponseCache = None
+    DuplicateIndex = None
+    insert_date_disclaimer = None
+    validate_blog_post = None
 
 # 설정 파일 경로
 CONFIG_FILE = "config.json"
 
+# 생성 결과 캐시 파일 경로 (같은 키워드 재실행 시 API 재호출 방지)
+CACHE_FILE = "gemini_cache.sqlite3"
+
+# 유사 중복 색인 파일 경로 (이미 다룬 키워드/본문 재생성 방지)
+DEDUP_FILE = "gemini_dedup.sqlite3"
+
+# 출력 토큰 예산 학습 파일 경로 (목표 길이에 맞춰 max_output_tokens를 줄이는 데 사용)
+TOKEN_BUDGET_FILE = "gemini_token_budget.json"
+
+# 블로그 글 목표 길이 (프롬프트의 "최소 2000자 이상", 서식 포함 실제 길이와의 차이는 TokenBudget이 학습)
+BLOG_TARGET_CHARS = 2000
+
 
 class NaverBlogAutomationGUI:
     """네이버 블로그 자동화 GUI 프로그램"""
@@ -47,6 +67,9 @@ class NaverBlogAutomationGUI:
         self.driver = None
         self.is_running = False
         self.gemini = None
+        self.response_cache = None
+        self.duplicate_index = None
+        self.token_budget = None
         
         # 설정 불러오기
         self.load_config()
@@ -376,14 +399,107 @@ class NaverBlogAutomationGUI:
             return
         
         try:
-            # Gemini API 초기화 시도
-            self.gemini = GeminiAPI(api_key=api_key)
+            # Gemini API 초기화 시도 (쉼표로 여러 키 입력 시 키 풀로 분산)
+            self.gemini = get_gemini_api(
+                api_keys=self.get_api_keys(),
+                cache=self.get_response_cache(),
+                duplicate_index=self.get_duplicate_index(),
+                token_budget=self.get_token_budget()
+            )
+            # 첫 글 생성 전에 백그라운드로 연결을 미리 맺어 둠
+            self.gemini.warm_up(background=True)
             self.log("✓ Gemini API 키가 성공적으로 설정되었습니다.")
             messagebox.showinfo("성공", "API 키가 성공적으로 설정되었습니다.")
         except Exception as e:
             self.log(f"✗ API 키 설정 실패: {str(e)}")
             messagebox.showerror("오류", f"API 키 설정에 실패했습니다.\n{str(e)}")
             
+    def get_api_keys(self):
+        """입력된 API 키 목록 (쉼표로 구분해 여러 개 입력 가능)"""
+        return [key.strip() for key in self.api_key_var.get().split(",") if key.strip()]
+        
+    def get_response_cache(self):
+        """생성 결과 캐시 (처음 요청 시 한 번만 연결)"""
+        if self.response_cache is None:
+            try:
+                self.response_cache = ResponseCache(CACHE_FILE)
+            except Exception as e:
+                self.log(f"⚠ 캐시 사용 불가 (캐시 없이 진행): {str(e)}")
+        return self.response_cache
+        
+    def get_token_budget(self):
+        """출력 토큰 예산 학습기 (처음 요청 시 한 번만 생성해 공유 Gemini API 인스턴스와 함께 재사용)"""
+        if self.token_budget is None and TokenBudget is not None:
+            self.token_budget = TokenBudget(TOKEN_BUDGET_FILE)
+        return self.token_budget
+        
+    def get_duplicate_index(self):
+        """키워드/본문 유사 중복 색인 (처음 요청 시 한 번만 연결)"""
+        if self.duplicate_index is None and DuplicateIndex is not None:
+            try:
+                self.duplicate_index = DuplicateIndex(DEDUP_FILE)
+            except Exception as e:
+                self.log(f"⚠ 중복 확인 사용 불가 (확인 없이 진행): {str(e)}")
+        return self.duplicate_index
+        
+    def ask_yes_no(self, title, message):
+        """
+        예/아니오 확인 창을 Tk 메인 스레드에서 표시하고 답을 기다림
+        
+        생성 파이프라인의 생산자 스레드에서 messagebox를 직접 열면 Tk가 멈추거나 오류가 나므로
+        root.after로 메인 루프에 넘기고, 기다리는 동안 사용자가 중지하면 아니오로 처리
+        """
+        if threading.current_thread() is threading.main_thread():
+            return messagebox.askyesno(title, message)
+        
+        answer = {}
+        answered = threading.Event()
+        
+        def ask():
+            try:
+                answer["value"] = messagebox.askyesno(title, message)
+            finally:
+                answered.set()
+        
+        self.root.after(0, ask)
+        while not answered.wait(timeout=0.5):
+            if not self.is_running:
+                return False
+        return answer.get("value", False)
+        
+    def confirm_not_duplicate(self, text, kind, title):
+        """이미 다룬 키워드/본문과 유사하면 계속 진행할지 확인 (색인이 없으면 통과, 어느 스레드에서든 호출 가능)"""
+        duplicate_index = self.get_duplicate_index()
+        if duplicate_index is None or not text:
+            return True
+        
+        matches = duplicate_index.find_similar(text, kind=kind)
+        if not matches:
+            return True
+        
+        similarity, label = matches[0]
+        self.log(f"⚠ {title}: '{label}' (유사도 {similarity:.2f})")
+        return self.ask_yes_no("중복 의심", f"{title}\n\n'{label}' (유사도 {similarity:.2f})\n\n그래도 계속 진행하시겠습니까?")
+        
+    def save_generation_stats(self):
+        """Gemini 호출 통계를 JSON 파일로 저장"""
+        if not self.gemini or not self.gemini.stats.records:
+            return
+        
+        try:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            stats_path = f"생성통계_{timestamp}.json"
+            self.gemini.stats.dump_json(stats_path, extra={
+                "api_keys": self.gemini.key_pool.usage(),
+                "token_budget": self.gemini.token_budget.usage() if self.gemini.token_budget else None,
+                "single_flight": self.gemini.single_flight.usage(),
+            })
+            overall = self.gemini.stats.summary()["overall"]
+            self.log(f"📊 생성 통계: 호출 {overall['calls']}회, 토큰 {overall['total_tokens']}개, "
+                     f"지연 p50 {overall['latency_p50']}초 → {stats_path}")
+        except Exception as e:
+            self.log(f"통계 저장 실패: {str(e)}")
+        
     def upload_keywords(self):
         """핵심 키워드 파일 업로드"""
         file_path = filedialog.askopenfilename(
@@ -397,10 +513,41 @@ class NaverBlogAutomationGUI:
                     keywords = f.read().strip()
                     self.keyword_var.set(keywords)
                     self.log(f"✓ 키워드 파일 업로드 완료: {os.path.basename(file_path)}")
+                self.report_duplicate_keywords(keywords.splitlines())
             except Exception as e:
                 self.log(f"✗ 파일 읽기 오류: {str(e)}")
                 messagebox.showerror("오류", f"파일을 읽을 수 없습니다.\n{str(e)}")
                 
+    def report_duplicate_keywords(self, keywords):
+        """업로드한 키워드 중 이미 다뤘거나 서로 거의 같은 키워드를 로그로 안내"""
+        duplicate_index = self.get_duplicate_index()
+        if duplicate_index is None:
+            return
+        
+        # 같은 파일 안의 유사 키워드는 임시 메모리 색인으로 확인
+        upload_index = DuplicateIndex(":memory:")
+        duplicates = 0
+        for keyword in (line.strip() for line in keywords):
+            if not keyword:
+                continue
+            signature = duplicate_index.signature(keyword, kind="keyword")
+            matches = duplicate_index.find_similar(keyword, kind="keyword", signature=signature)
+            if matches:
+                duplicates += 1
+                self.log(f"⚠ 이미 다룬 키워드와 유사: {keyword} ≈ {matches[0][1]}")
+                continue
+            
+            matches = upload_index.find_similar(keyword, kind="keyword", signature=signature)
+            if matches:
+                duplicates += 1
+                self.log(f"⚠ 파일 내 유사 키워드: {keyword} ≈ {matches[0][1]}")
+                continue
+            upload_index.add(keyword, kind="keyword", signature=signature)
+        upload_index.close()
+        
+        if duplicates:
+            self.log(f"⚠ 유사 중복 키워드 {duplicates}개 (생성 시 확인 창이 표시됩니다)")
+        
     def log(self, message):
         """로그 출력"""
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -522,28 +669,57 @@ class NaverBlogAutomationGUI:
             # 브라우저가 없으면 종지 버튼 비활성화
             self.stop_button.config(state=tk.DISABLED)
         
+    def get_keywords(self):
+        """키워드 입력값을 줄 단위 목록으로 변환 (키워드 파일 업로드 시 여러 개)"""
+        return [line.strip() for line in self.keyword_var.get().splitlines() if line.strip()]
+        
+    def prepare_blog_content(self, keyword):
+        """
+        키워드 하나의 글 생성 (생성 파이프라인의 생산자 단계, 백그라운드 스레드에서 실행)
+        
+        Args:
+            keyword: 블로그 글 키워드
+            
+        Returns:
+            {"title", "content"} 딕셔너리 (중복으로 건너뛰거나 생성 실패 시 None)
+        """
+        # 이미 다룬 키워드면 생성 비용을 쓰기 전에 확인
+        if not self.confirm_not_duplicate(keyword, "keyword", "이미 다룬 키워드와 유사합니다"):
+            self.log(f"✗ 중복 키워드로 건너뜀: {keyword}")
+            return None
+        
+        self.log(f"[생성] '{keyword}' 블로그 글 생성 중...")
+        blog_content = self.generate_blog_content(keyword)
+        if not blog_content:
+            return None
+        
+        # 다른 키워드였어도 본문이 기존 글과 거의 같으면 발행 전에 확인
+        if not self.confirm_not_duplicate(blog_content['content'], "post", "이미 발행한 글과 본문이 유사합니다"):
+            self.log(f"✗ 중복 본문으로 건너뜀: {keyword}")
+            return None
+        
+        self.log(f"[생성] ✓ '{keyword}' 생성 완료 ({len(blog_content['content'])}자)")
+        return blog_content
+        
     def run_automation(self):
         """자동화 실행 (메인 로직)"""
+        pipeline = None
         try:
             # 1. Gemini API 초기화
             if not self.gemini:
                 self.log("Gemini API 초기화 중...")
-                self.gemini = GeminiAPI(api_key=self.api_key_var.get())
-            
-            # 2. 블로그 글 생성
-            keyword = self.keyword_var.get().strip()
-            self.log(f"키워드: {keyword}")
-            self.log("블로그 글 생성 중...")
-            
-            blog_content = self.generate_blog_content(keyword)
-            
-            if not blog_content:
-                self.log("✗ 블로그 글 생성 실패")
-                self.finish_automation(close_browser=True)
-                return
+                self.gemini = get_gemini_api(
+                    api_keys=self.get_api_keys(),
+                    cache=self.get_response_cache(),
+                    duplicate_index=self.get_duplicate_index(),
+                    token_budget=self.get_token_budget()
+                )
             
-            self.log(f"✓ 제목: {blog_content['title']}")
-            self.log(f"✓ 본문 길이: {len(blog_content['content'])}자")
+            # 2. 블로그 글 생성 시작 (글 N을 브라우저에 작성하는 동안 글 N+1을 미리 생성)
+            keywords = self.get_keywords()
+            self.log(f"키워드: {', '.join(keywords)}")
+            self.log("블로그 글 생성 중... (브라우저 준비와 동시에 진행)")
+            pipeline = GenerateAhead(keywords, self.prepare_blog_content).start()
             
             # 3. 크롬 드라이버 설정
             self.log("\n크롬 드라이버 설정 중...")
@@ -556,20 +732,52 @@ class NaverBlogAutomationGUI:
                 self.finish_automation(close_browser=True)
                 return
             
-            # 5. 블로그 글 작성
-            self.log("\n블로그 글 작성 중...")
-            if not self.write_blog_post(blog_content):
-                self.log("✗ 블로그 글 작성 실패")
-                self.finish_automation(close_browser=False)
+            # 5. 생성이 끝난 순서대로 블로그 글 작성
+            success_count = 0
+            write_fail_count = 0
+            for idx, (keyword, blog_content, error) in enumerate(pipeline, 1):
+                if not self.is_running:
+                    self.log("✗ 사용자 중지로 남은 글 작성 취소")
+                    break
+                
+                self.log(f"\n[{idx}/{len(keywords)}] 키워드: {keyword}")
+                if error is not None or not blog_content:
+                    self.log(f"✗ 블로그 글 생성 실패{': ' + str(error) if error else ''}")
+                    continue
+                
+                self.log(f"✓ 제목: {blog_content['title']}")
+                self.log(f"✓ 본문 길이: {len(blog_content['content'])}자")
+                
+                # 첫 글은 로그인 직후 열린 편집기 사용, 이후 글은 새 편집기 열기
+                if success_count or write_fail_count:
+                    self.open_write_page()
+                
+                self.log("\n블로그 글 작성 중...")
+                if not self.write_blog_post(blog_content):
+                    self.log("✗ 블로그 글 작성 실패")
+                    write_fail_count += 1
+                    continue
+                success_count += 1
+                
+                # 발행한 키워드와 본문을 중복 색인에 등록
+                duplicate_index = self.get_duplicate_index()
+                if duplicate_index is not None:
+                    duplicate_index.add(keyword, kind="keyword")
+                    duplicate_index.add(blog_content['content'], kind="post", label=keyword)
+            
+            if not success_count:
+                # 생성이 모두 실패했으면 브라우저 정리, 작성 실패가 있으면 확인할 수 있게 유지
+                self.log("✗ 작성된 글이 없습니다")
+                self.finish_automation(close_browser=not write_fail_count)
                 return
             
             # 6. 완료
             self.log("\n="*50)
-            self.log("✓ 모든 작업 완료!")
+            self.log(f"✓ 모든 작업 완료! ({success_count}/{len(keywords)}개 작성)")
             self.log("브라우저는 유지됩니다. 확인 후 '종지' 버튼을 눌러주세요.")
             self.log("="*50)
             
-            messagebox.showinfo("완료", "블로그 글 작성이 완료되었습니다!\n\n브라우저는 유지됩니다.\n확인 후 '종지' 버튼을 눌러주세요.")
+            messagebox.showinfo("완료", f"블로그 글 작성이 완료되었습니다! ({success_count}/{len(keywords)}개)\n\n브라우저는 유지됩니다.\n확인 후 '종지' 버튼을 눌러주세요.")
             
         except Exception as e:
             self.log(f"\n✗ 오류 발생: {str(e)}")
@@ -577,6 +785,13 @@ class NaverBlogAutomationGUI:
             self.finish_automation(close_browser=True)
         
         finally:
+            # 미리 생성 중인 글은 더 진행하지 않음
+            if pipeline:
+                pipeline.stop()
+            
+            # 생성 통계 저장 (토큰 사용량/지연 시간)
+            self.save_generation_stats()
+            
             # 작업 완료 후 버튼 상태만 변경 (브라우저는 유지)
             self.is_running = False
             self.start_button.config(state=tk.NORMAL)
@@ -659,19 +874,7 @@ class NaverBlogAutomationGUI:
                 self.log("✓ 네이버 로그인 완료")
 
             # 블로그 글쓰기 페이지로 이동
-            self.log("블로그 글쓰기 페이지로 이동 중...")
-            self.driver.get("https://blog.naver.com/GoBlogWrite.naver")
-            time.sleep(7)
-            
-            # 페이지 로드 확인
-            try:
-                WebDriverWait(self.driver, 15).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "#mainFrame"))
-                )
-                self.log("✓ 블로그 글쓰기 페이지 로드 완료")
-            except:
-                self.log("⚠ 글쓰기 페이지 로드 지연 - 추가 대기")
-                time.sleep(5)
+            self.open_write_page()
 
             return True
 
@@ -689,6 +892,23 @@ class NaverBlogAutomationGUI:
                 
             return False
             
+    def open_write_page(self):
+        """블로그 글쓰기 페이지로 이동 (글마다 새 편집기에서 작성)"""
+        self.log("블로그 글쓰기 페이지로 이동 중...")
+        self.driver.switch_to.default_content()
+        self.driver.get("https://blog.naver.com/GoBlogWrite.naver")
+        time.sleep(7)
+        
+        # 페이지 로드 확인
+        try:
+            WebDriverWait(self.driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "#mainFrame"))
+            )
+            self.log("✓ 블로그 글쓰기 페이지 로드 완료")
+        except:
+            self.log("⚠ 글쓰기 페이지 로드 지연 - 추가 대기")
+            time.sleep(5)
+            
     def input_with_clipboard(self, element, text):
         """클립보드를 이용한 텍스트 입력"""
         element.click()
@@ -719,10 +939,6 @@ class NaverBlogAutomationGUI:
     def generate_blog_content(self, topic):
         """블로그 글 생성"""
         try:
-            # 오늘 날짜 가져오기
-            today = datetime.now()
-            today_str = today.strftime("%Y년 %m월 %d일")
-            
             # 전문적인 블로그 형식의 커스텀 프롬프트 (HTML 형식)
             custom_prompt = f"""
 다음 주제로 전문적인 블로그 글을 작성해주세요:
@@ -731,7 +947,7 @@ class NaverBlogAutomationGUI:
 
 필수 구성 요소:
 1. 매력적이고 클릭하고 싶은 제목 (감탄사나 질문형)
-2. 본문 최상단: "※ 본 글은 {today_str} 기준 최신 정보를 바탕으로 작성되었습니다."
+2. 작성 기준일 안내 문구는 프로그램이 자동으로 추가하므로 작성하지 말 것
 3. 도입부: 주제와 관련된 공감 가는 상황 설명 (3-4문장, 충분히 상세하게)
 4. "✔ 이런 분들께 추천합니다!" 섹션 (4-5개 항목)
 5. "📌 목차" 섹션 (5-6개 항목) - 각 목차 항목은 클릭 가능한 링크로 만들 것
@@ -759,8 +975,6 @@ class NaverBlogAutomationGUI:
 출력 형식 (HTML 태그 사용, 기본서체, 본문 16px, 모든 텍스트는 왼쪽 정렬, 줄 간격 1.8 적용):
 제목: [매력적인 제목]
 
-<p style="font-family: inherit; font-size: 16px; text-align: left; line-height: 1.8; margin-bottom: 15px;">※ 본 글은 {today_str} 기준 최신 정보를 바탕으로 작성되었습니다.</p>
-
 <p style="font-family: inherit; font-size: 16px; text-align: left; line-height: 1.8; margin-bottom: 20px;">[도입부 문단 - 3-4문장으로 충분히 상세하게 작성]</p>
 
 <p style="font-family: inherit; font-size: 16px; text-align: left; line-height: 1.8; margin-top: 25px; margin-bottom: 10px;"><strong>✔ 이런 분들께 추천합니다!</strong></p>
@@ -828,8 +1042,27 @@ A: [답변 5 - 2-3문장으로 상세하게]</p>
 블로그 글을 작성해주세요:
 """
 
-            # 긴 블로그 글 생성 (최대 토큰 증가)
-            blog_post = self.gemini.generate_content(custom_prompt, max_output_tokens=16384)
+            # 긴 블로그 글 생성 (최대 토큰 증가, 스트리밍으로 진행 상황 표시)
+            blog_post = ""
+            next_progress = 1000
+            for chunk in self.gemini.generate_content_stream(custom_prompt, max_output_tokens=16384, task="blog_post_styled",
+                                                             target_chars=BLOG_TARGET_CHARS):
+                blog_post += chunk
+                if len(blog_post) >= next_progress:
+                    self.log(f"  생성 중... ({len(blog_post)}자)")
+                    next_progress = (len(blog_post) // 1000 + 1) * 1000
+            
+            # 잘렸거나 구조가 빠진 글은 해당 구역만 다시 생성해 채움 (다음 실행용 캐시도 교체)
+            validation = validate_blog_post(blog_post, require_date=False)
+            if not validation["valid"]:
+                self.log(f"⚠ 구조 검증 실패: {', '.join(validation['problems'])}")
+                self.log("  빠진 구역만 다시 생성 중...")
+                blog_post = self.gemini.repair_blog_post(topic, blog_post, validation=validation)
+                self.gemini.replace_cached(custom_prompt, blog_post, max_output_tokens=16384, task="blog_post_styled")
+                self.log("✓ 부분 재생성 완료")
+            
+            # 작성 기준일 안내 문구는 생성 후 제목 아래에 삽입
+            blog_post = insert_date_disclaimer(blog_post)
 
             # 마크다운 제거는 HTML 형식이므로 건너뜀
             # blog_post = self.remove_markdown(blog_post)
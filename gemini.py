@@ -1,6 +1,16 @@
 # -*- coding: utf-8 -*-
 import os
 import sys
+import asyncio
+import hashlib
+import html
+import json
+import queue
+import random
+import re
+import sqlite3
+import threading
+import time
 
 # Windows 콘솔 인코딩 설정 (GUI 모드에서는 건너뜀)
 if sys.platform == "win32" and sys.stdout is not None:
@@ -11,86 +21,66 @@ if sys.platform == "win32" and sys.stdout is not None:
 
 from google import genai
 from datetime import datetime
+from types import SimpleNamespace
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 
-class GeminiAPI:
-    """Gemini API를 사용하기 위한 클래스"""
+
+# 본문 최상단 작성 기준일 안내 문구 (날짜가 바뀌어도 프롬프트/캐시 키가 유지되도록 생성 후 삽입)
+DATE_DISCLAIMER_HTML = '<p style="font-family: inherit; font-size: 16px; text-align: left; line-height: 1.8; margin-bottom: 15px;">※ 본 글은 {date} 기준 최신 정보를 바탕으로 작성되었습니다.</p>'
+
+
+def insert_date_disclaimer(blog_post, date=None):
+    """
+    생성된 블로그 글의 제목 바로 아래에 작성 기준일 안내 문구 삽입
     
-    def __init__(self, api_key=None):
-        """
-        Gemini API 클라이언트 초기화
+    Args:
+        blog_post: "제목: ..." 줄로 시작하는 생성 결과
+        date: 기준 날짜 (None이면 오늘)
         
-        Args:
-            api_key: Gemini API 키 (None이면 환경변수에서 가져옴)
-        """
-        # API 키 설정
-        if api_key:
-            os.environ['GEMINI_API_KEY'] = api_key
-        elif 'GEMINI_API_KEY' not in os.environ:
-            raise ValueError("API 키가 제공되지 않았습니다. api_key 매개변수나 GEMINI_API_KEY 환경변수를 설정해주세요.")
-        
-        # 클라이언트 초기화
-        try:
-            self.client = genai.Client(api_key=api_key or os.environ.get('GEMINI_API_KEY'))
-            self.model_name = "gemini-2.0-flash-exp"
-            print(f"[OK] Gemini API 클라이언트 초기화 완료 (모델: {self.model_name})")
-        except Exception as error:
-            raise Exception(f"Gemini API 초기화 실패: {str(error)}")
+    Returns:
+        안내 문구가 삽입된 블로그 글
+    """
+    date = date or datetime.now()
+    disclaimer = DATE_DISCLAIMER_HTML.format(date=date.strftime("%Y년 %m월 %d일"))
     
-    def generate_content(self, prompt, temperature=1.0, max_output_tokens=16384):
-        """
-        텍스트 생성 요청
-        
-        Args:
-            prompt: 생성할 텍스트의 프롬프트
-            temperature: 생성 다양성 (0.0 ~ 2.0, 높을수록 창의적)
-            max_output_tokens: 최대 출력 토큰 수
-            
-        Returns:
-            생성된 텍스트 문자열
-        """
-        try:
-            print(f"\n[생성 요청] 프롬프트: {prompt[:100]}...")
-            
-            # 생성 설정
-            generation_config = {
-                "temperature": temperature,
-                "max_output_tokens": max_output_tokens,
-            }
-            
-            # API 호출
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config=generation_config
-            )
-            
-            # 응답 텍스트 추출
-            result_text = response.text
-            print(f"[OK] 생성 완료 (길이: {len(result_text)}자)")
-            
-            return result_text
-            
-        except Exception as error:
-            print(f"[ERROR] 텍스트 생성 중 오류 발생: {str(error)}")
-            raise
+    lines = blog_post.strip().split('\n')
     
-    def generate_blog_post(self, topic, style="친근하고 정보적인", word_count=1000):
-        """
-        블로그 글 생성
-        
-        Args:
-            topic: 블로그 글 주제
-            style: 글 스타일
-            word_count: 목표 단어 수
-            
-        Returns:
-            생성된 블로그 글
-        """
-        # 오늘 날짜 가져오기
-        today = datetime.now()
-        today_str = today.strftime("%Y년 %m월 %d일")
+    # "제목:" 줄을 찾고, 없으면 첫 번째 비어있지 않은 줄을 제목으로 간주
+    title_index = None
+    for i, line in enumerate(lines):
+        if line.strip().startswith('제목:'):
+            title_index = i
+            break
+    if title_index is None:
+        title_index = next((i for i, line in enumerate(lines) if line.strip()), None)
+    if title_index is None:
+        return disclaimer
+    
+    return '\n'.join(lines[:title_index + 1] + ['', disclaimer] + lines[title_index + 1:])
+
+
+# 블로그 글 프롬프트가 목표 길이와 별도로 요구하는 최소 본문 길이(자)
+BLOG_POST_MIN_CHARS = 2000
+
+
+def blog_post_target_chars(word_count):
+    """프롬프트가 실제로 요구하는 본문 길이(자) - 목표 길이와 최소 길이 중 큰 값 (점수/토큰 예산 기준)"""
+    return max(word_count or 0, BLOG_POST_MIN_CHARS)
+
+
+def build_blog_post_prompt(topic, style="친근하고 정보적인", word_count=1000):
+    """
+    블로그 글 생성 프롬프트 작성
+    
+    Args:
+        topic: 블로그 글 주제
+        style: 글 스타일
+        word_count: 목표 단어 수
         
-        prompt = f"""
+    Returns:
+        프롬프트 문자열
+    """
+    prompt = f"""
 다음 주제로 전문적인 블로그 글을 작성해주세요:
 
 주제: {topic}
@@ -99,7 +89,7 @@ class GeminiAPI:
 
 필수 구성 요소:
 1. 매력적이고 클릭하고 싶은 제목 (감탄사나 질문형)
-2. 본문 최상단: "※ 본 글은 {today_str} 기준 최신 정보를 바탕으로 작성되었습니다."
+2. 작성 기준일 안내 문구는 프로그램이 자동으로 추가하므로 작성하지 말 것
 3. 도입부: 주제와 관련된 공감 가는 상황 설명 (3-4문장, 충분히 상세하게)
 4. "✔ 이런 분들께 추천합니다!" 섹션 (4-5개 항목)
 5. "📌 목차" 섹션 (5-6개 항목) - 각 목차 항목은 클릭 가능한 링크로 만들 것
@@ -121,14 +111,12 @@ class GeminiAPI:
 - 친근하면서도 전문적인 어투
 - 구체적인 예시와 팁을 반드시 포함
 - 실용적이고 도움되는 정보 중심
-- 본문은 충분히 길고 상세하게 작성 (최소 2000자 이상)
+- 본문은 충분히 길고 상세하게 작성 (최소 {BLOG_POST_MIN_CHARS}자 이상)
 - 각 문단은 3-4문장으로 구성하여 읽기 쉽게
 
 출력 형식 (HTML 태그 사용, 기본서체, 본문 16px, 모든 텍스트는 왼쪽 정렬, 줄 간격 1.8 적용):
 제목: [매력적인 제목]
 
-<p style="font-family: inherit; font-size: 16px; text-align: left; line-height: 1.8; margin-bottom: 15px;">※ 본 글은 {today_str} 기준 최신 정보를 바탕으로 작성되었습니다.</p>
-
 <p style="font-family: inherit; font-size: 16px; text-align: left; line-height: 1.8; margin-bottom: 20px;">[도입부 문단 - 3-4문장으로 충분히 상세하게 작성]</p>
 
 <p style="font-family: inherit; font-size: 16px; text-align: left; line-height: 1.8; margin-top: 25px; margin-bottom: 10px;"><strong>✔ 이런 분들께 추천합니다!</strong></p>
@@ -195,73 +183,3841 @@ A: [답변 5 - 2-3문장으로 상세하게]</p>
 
 블로그 글을 작성해주세요:
 """
-        
-        return self.generate_content(prompt)
+    return prompt
+
+
+# 구조화(JSON) 출력 모드에서 로컬 렌더러가 붙이는 공통 서식 (모델이 매 태그마다 출력하지 않도록 분리)
+TEXT_STYLE = "font-family: inherit; font-size: 16px; text-align: left; line-height: 1.8;"
+HEADING_STYLE = "font-family: inherit; font-size: 24px; font-weight: 900; color: #333; margin-top: 35px; margin-bottom: 15px; text-align: left;"
+CLOSING_DISCLAIMER = "※ 본 글은 다양한 공식 자료를 바탕으로 작성되었으나, 작성자도 오류가 있을 수 있으며 모든 내용은 참고용입니다. 최종 신청 전에는 반드시 관련 기관의 공식 공고문을 통해 정확한 정보를 확인하시기 바랍니다."
+DEFAULT_LINKS = [
+    {"name": "쿠팡 공식 쇼핑몰", "url": "https://www.coupang.com"},
+    {"name": "네이버 스마트스토어", "url": "https://shopping.naver.com"},
+]
+
+
+def build_blog_post_json_prompt(topic, style="친근하고 정보적인", word_count=1000):
+    """
+    구조화(JSON) 출력용 블로그 글 프롬프트 작성
     
-    def summarize_text(self, text, max_sentences=5):
-        """
-        텍스트 요약
+    서식(HTML/인라인 스타일)은 render_blog_post_html이 붙이므로
+    모델은 내용만 간결한 JSON으로 반환한다.
+    
+    Args:
+        topic: 블로그 글 주제
+        style: 글 스타일
+        word_count: 목표 단어 수
         
-        Args:
-            text: 요약할 텍스트
-            max_sentences: 최대 문장 수
-            
-        Returns:
-            요약된 텍스트
-        """
-        prompt = f"""
-다음 텍스트를 {max_sentences}개 문장 이내로 요약해주세요:
+    Returns:
+        프롬프트 문자열
+    """
+    return f"""
+다음 주제로 전문적인 블로그 글의 내용을 작성해주세요:
 
-{text}
+주제: {topic}
+스타일: {style}
+목표 길이: 약 {word_count}자
 
-요약:
+작성 규칙:
+- 매력적이고 클릭하고 싶은 제목 (감탄사나 질문형)
+- 도입부: 주제와 관련된 공감 가는 상황 설명 (3-4문장, 충분히 상세하게)
+- 추천 대상 4-5개
+- 전체 요약 2-3줄
+- 본문 5-7개의 소제목, 각 소제목마다 3-4문장 문단 2개 이상 (구체적인 예시, 통계, 실용적인 팁 포함)
+- 자주 묻는 질문 5개 (각 답변 2-3문장)
+- 관련 참고 사이트 3개 (이름과 URL)
+- 마무리 요약 및 실천 유도 (3-4문장, 구체적인 행동 촉구)
+- 마크다운 문법과 HTML 태그를 사용하지 말고 순수 텍스트로만 작성할 것
+- 본문은 충분히 길고 상세하게 작성 (최소 {BLOG_POST_MIN_CHARS}자 이상)
+
+아래 형식의 JSON 하나만 출력하세요 (다른 설명 없이):
+{{"title": "제목", "intro": "도입부", "recommend": ["추천 대상"], "summary": "전체 요약", "sections": [{{"heading": "소제목", "paragraphs": ["문단"]}}], "faq": [{{"q": "질문", "a": "답변"}}], "links": [{{"name": "사이트 이름", "url": "https://..."}}], "closing": "마무리 문단"}}
 """
+
+
+def parse_json_response(text):
+    """
+    모델 응답에서 JSON 객체 추출 (```json 코드 블록이나 앞뒤 설명이 붙어도 처리)
+    
+    Returns:
+        파싱된 딕셔너리 (파싱할 수 없으면 ValueError 발생)
+    """
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("응답에서 JSON 객체를 찾을 수 없습니다")
+    
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError as error:
+        raise ValueError(f"JSON 형식 응답 파싱 실패: {str(error)}")
+
+
+def _render_text(value):
+    return html.escape(str(value or "").strip())
+
+
+def _render_paragraph(content, margin):
+    return f'<p style="{TEXT_STYLE} {margin}">{content}</p>'
+
+
+def _render_list(items):
+    lines = [f'<ul style="{TEXT_STYLE} margin-bottom: 20px;">']
+    lines += [f"<li>{item}</li>" for item in items]
+    lines.append("</ul>")
+    return "\n".join(lines)
+
+
+def _render_label(content, margin_top="25px"):
+    return _render_paragraph(f"<strong>{content}</strong>", f"margin-top: {margin_top}; margin-bottom: 10px;")
+
+
+def render_intro_html(intro):
+    """도입부 문단"""
+    return _render_paragraph(_render_text(intro), "margin-bottom: 20px;")
+
+
+def render_recommend_html(items):
+    """"이런 분들께 추천합니다" 섹션"""
+    return _render_label("✔ 이런 분들께 추천합니다!") + "\n" + _render_list(_render_text(item) for item in items or [])
+
+
+def render_toc_html(headings):
+    """목차 섹션 (index번째 소제목은 #section{index}로 연결)"""
+    return _render_label("📌 목차") + "\n" + _render_list(
+        f'<a href="#section{index}">{_render_text(heading)}</a>'
+        for index, heading in enumerate(headings, 1)
+    )
+
+
+def render_summary_html(summary):
+    """전체 요약 섹션"""
+    return _render_label("🔍 전체 요약") + "\n" + _render_paragraph(_render_text(summary), "margin-bottom: 25px;")
+
+
+def render_section_html(index, heading, paragraphs):
+    """본문 소제목 하나와 문단들"""
+    section_lines = [
+        f'<h2 id="section{index}" style="{HEADING_STYLE}"><b><strong>{_render_text(heading)}</strong></b></h2>'
+    ]
+    section_lines += [_render_paragraph(_render_text(body), "margin-bottom: 15px;") for body in paragraphs or []]
+    return "\n".join(section_lines)
+
+
+def render_faq_html(faq):
+    """FAQ 섹션 (FAQ 제목 바로 아래에 첫 질문, 이후 질문은 빈 줄로 구분)"""
+    faq_items = [
+        _render_paragraph(f"<strong>Q: {_render_text(item.get('q'))}</strong><br>\nA: {_render_text(item.get('a'))}", "margin-bottom: 15px;")
+        for item in faq or []
+    ]
+    return "\n\n".join(["\n".join([_render_label("자주 묻는 질문(FAQ)", margin_top="35px")] + faq_items[:1])] + faq_items[1:])
+
+
+def render_links_html(links):
+    """참고 사이트 섹션 (기본 링크 뒤에 links를 붙임)"""
+    links = DEFAULT_LINKS + [link for link in links or [] if isinstance(link, dict)]
+    return _render_label("📌 참고할 만한 사이트") + "\n" + _render_list(
+        f'<a href="{html.escape(str(link.get("url") or ""), quote=True)}" target="_blank">{_render_text(link.get("name"))}</a>'
+        for link in links
+    )
+
+
+def render_closing_html(closing):
+    """마무리 요약 및 실천 유도 섹션"""
+    return _render_label("📝 마무리 요약 및 실천 유도") + "\n" + _render_paragraph(_render_text(closing), "margin-bottom: 15px;")
+
+
+def render_disclaimer_html():
+    """글 마지막 참고용 안내 문구"""
+    return _render_paragraph(CLOSING_DISCLAIMER, "margin-top: 20px;")
+
+
+def render_blog_post_html(data, date=None):
+    """
+    구조화된 블로그 글 데이터를 기존 HTML 출력 형식과 같은 서식으로 렌더링
+    
+    목차는 본문 소제목에서 만들어 앵커(section1..N)가 항상 일치한다.
+    
+    Args:
+        data: build_blog_post_json_prompt 형식의 딕셔너리
+        date: 작성 기준일 (None이면 오늘)
         
-        return self.generate_content(prompt, temperature=0.3)
+    Returns:
+        "제목: ..." 줄로 시작하는 블로그 글 (HTML)
+    """
+    date = date or datetime.now()
+    sections = data.get("sections") or []
     
-    def translate_text(self, text, target_language="한국어"):
-        """
-        텍스트 번역
+    parts = [
+        f"제목: {str(data.get('title') or '').strip()}",
+        DATE_DISCLAIMER_HTML.format(date=date.strftime("%Y년 %m월 %d일")),
+        render_intro_html(data.get("intro")),
+        render_recommend_html(data.get("recommend")),
+        render_toc_html(section.get("heading") for section in sections),
+        render_summary_html(data.get("summary")),
+    ]
+    parts += [
+        render_section_html(index, section.get("heading"), section.get("paragraphs"))
+        for index, section in enumerate(sections, 1)
+    ]
+    parts += [
+        render_faq_html(data.get("faq")),
+        render_links_html(data.get("links")),
+        render_closing_html(data.get("closing")),
+        render_disclaimer_html(),
+    ]
+    
+    return "\n\n".join(parts)
+
+
+# 블로그 글 HTML을 구역으로 나눌 때 쓰는 구역별 시작 표시 (글에 나오는 순서대로)
+# 표시가 줄의 첫 텍스트인 제목 줄만 구역 시작으로 인정 (목차의 "자주 묻는 질문" 항목 등은 제외)
+BLOG_BLOCK_MARKERS = [
+    ("recommend", "✔ 이런 분들께 추천합니다"),
+    ("toc", "📌 목차"),
+    ("summary", "🔍 전체 요약"),
+    ("faq", "자주 묻는 질문"),
+    ("links", "📌 참고할 만한 사이트"),
+    ("closing", "📝 마무리"),
+    ("disclaimer", "※ 본 글은 다양한"),
+]
+DATE_DISCLAIMER_MARKER = "기준 최신 정보를 바탕으로 작성되었습니다"
+SECTION_START_PATTERN = re.compile(r"<h2[^>]*id=[\"']section(\d+)[\"']")
+SECTION_HEADING_PATTERN = re.compile(r"<h2[^>]*id=[\"']section(\d+)[\"'][^>]*>(.*?)</h2>", re.S)
+TOC_ANCHOR_PATTERN = re.compile(r"href=[\"']#section(\d+)[\"'][^>]*>(.*?)</a>", re.S)
+COMPLETE_PARAGRAPH_PATTERN = re.compile(r"<p[^>]*>(.*?)</p>", re.S)
+
+
+def _plain_text(fragment):
+    """HTML 조각의 태그를 지운 순수 텍스트"""
+    return html.unescape(re.sub(r"<[^>]+>", "", fragment or "")).strip()
+
+
+def _find_block_marker(blog_post, marker, start=0):
+    """
+    start 이후에서 marker로 시작하는 제목 줄의 줄 시작 위치 (없으면 -1)
+    
+    <p><strong>, <h2> 등으로 감싼 줄에서 marker가 첫 텍스트여야 하며 (앞에 이모지 정도는 허용),
+    목록 항목(<li>)이나 링크(<a>) 안에 있는 같은 문구는 건너뛴다.
+    """
+    index = blog_post.find(marker, start)
+    while index != -1:
+        line_start = blog_post.rfind("\n", 0, index) + 1
+        prefix = blog_post[line_start:index]
+        if not re.search(r"\w", _plain_text(prefix)) and not re.search(r"<(li|a)\b", prefix, re.I):
+            return line_start
+        index = blog_post.find(marker, index + len(marker))
+    return -1
+
+
+def split_blog_post_blocks(blog_post):
+    """
+    블로그 글 HTML을 구역별 조각으로 분리
+    
+    Returns:
+        {"head": 제목~도입부, "recommend": ..., "toc": ..., "sections": {번호: 조각}, ...} 딕셔너리
+        (글에서 찾지 못한 구역은 키가 없음)
+    """
+    positions = []
+    search_from = 0
+    for name, marker in BLOG_BLOCK_MARKERS:
+        # 앞 구역보다 뒤에서 찾음 (본문 소제목은 요약과 FAQ 사이라 순서에 영향 없음)
+        line_start = _find_block_marker(blog_post, marker, search_from)
+        if line_start != -1:
+            positions.append((line_start, name))
+            search_from = line_start
+    # 닫는 태그가 잘린 마지막 소제목도 구역으로 인식하도록 여는 태그 기준으로 찾음
+    for match in SECTION_START_PATTERN.finditer(blog_post):
+        positions.append((blog_post.rfind("\n", 0, match.start()) + 1, f"section{match.group(1)}"))
+    positions.sort()
+    
+    blocks = {"head": blog_post[:positions[0][0]] if positions else blog_post, "sections": {}}
+    for order, (start, name) in enumerate(positions):
+        end = positions[order + 1][0] if order + 1 < len(positions) else len(blog_post)
+        block = blog_post[start:end].strip()
+        if name.startswith("section"):
+            blocks["sections"].setdefault(int(name[len("section"):]), block)
+        else:
+            blocks.setdefault(name, block)
+    return blocks
+
+
+def _complete_paragraphs(block):
+    """조각 안의 닫힌 <p> 문단 중 내용이 있는 것"""
+    return [body for body in COMPLETE_PARAGRAPH_PATTERN.findall(block or "") if _plain_text(body)]
+
+
+def validate_blog_post(blog_post, expected_faq=5, require_date=True):
+    """
+    블로그 글 HTML 구조를 로컬에서 빠르게 검사
+    
+    제목 줄, 작성 기준일 안내, 추천 대상 목록, 목차 앵커(section1..N)와 소제목 일치,
+    소제목별 문단, FAQ 개수, 마무리/참고 사이트, 마지막 안내 문구를 확인한다.
+    
+    Args:
+        blog_post: "제목: ..." 줄로 시작하는 블로그 글
+        expected_faq: 필요한 FAQ 질문 수
+        require_date: 작성 기준일 안내 문구까지 확인할지 여부 (삽입 전 원문 검사 시 False)
         
-        Args:
-            text: 번역할 텍스트
-            target_language: 목표 언어
-            
-        Returns:
-            번역된 텍스트
-        """
-        prompt = f"""
-다음 텍스트를 {target_language}로 번역해주세요:
+    Returns:
+        {"valid", "problems", "missing", "headings"} 딕셔너리
+        missing은 다시 만들어야 할 구역 이름 리스트 ("title", "section3", "faq" 등),
+        headings는 {번호: 소제목} (본문 소제목이 없으면 목차 항목으로 보충)
+    """
+    blocks = split_blog_post_blocks(blog_post or "")
+    problems = []
+    missing = []
+    
+    def fail(name, problem):
+        problems.append(problem)
+        if name not in missing:
+            missing.append(name)
+    
+    head_lines = [line for line in blocks["head"].splitlines() if line.strip()]
+    title_line = next((line for line in head_lines if line.strip().startswith("제목:")), "")
+    if not title_line.strip()[len("제목:"):].strip():
+        fail("title", "제목 줄 없음")
+    if require_date and DATE_DISCLAIMER_MARKER not in blocks["head"]:
+        fail("date", "작성 기준일 안내 문구 없음")
+    intro = [body for body in _complete_paragraphs(blocks["head"]) if DATE_DISCLAIMER_MARKER not in body]
+    if not intro:
+        fail("intro", "도입부 문단 없음")
+    
+    if "recommend" not in blocks:
+        fail("recommend", "추천 대상 섹션 없음")
+    elif "</ul>" not in blocks["recommend"] or blocks["recommend"].count("<li") < 3:
+        fail("recommend", "추천 대상 목록이 3개 미만이거나 닫히지 않음")
+    
+    # 소제목 목록: 본문 소제목 우선, 잘려서 사라진 소제목은 목차 항목으로 보충
+    toc_headings = {
+        int(number): _plain_text(label)
+        for number, label in TOC_ANCHOR_PATTERN.findall(blocks.get("toc", ""))
+    }
+    headings = dict(toc_headings)
+    for number, block in blocks["sections"].items():
+        match = SECTION_HEADING_PATTERN.search(block)
+        if match and _plain_text(match.group(2)):
+            headings[number] = _plain_text(match.group(2))
+    section_count = max(list(headings) + list(blocks["sections"]) + [0])
+    
+    if section_count == 0:
+        fail("sections", "본문 소제목(section1..N) 없음")
+    for number in range(1, section_count + 1):
+        block = blocks["sections"].get(number)
+        if block is None:
+            fail(f"section{number}", f"소제목 {number} 없음")
+        elif "</h2>" not in block or not _complete_paragraphs(block):
+            fail(f"section{number}", f"소제목 {number} 본문이 비었거나 잘림")
+    
+    if "toc" not in blocks:
+        fail("toc", "목차 섹션 없음")
+    elif "</ul>" not in blocks["toc"] or sorted(toc_headings) != list(range(1, section_count + 1)):
+        fail("toc", f"목차 앵커가 section1..{section_count}와 일치하지 않음 ({sorted(toc_headings)})")
+    
+    if "summary" not in blocks or len(_complete_paragraphs(blocks["summary"])) < 2:
+        fail("summary", "전체 요약 없음")
+    
+    # "Q:", "Q1.", "질문 1:" 등 번호가 붙거나 한국어로 쓴 질문 표시도 인정
+    faq_count = len([
+        body for body in _complete_paragraphs(blocks.get("faq", ""))
+        if re.search(r"(Q\s*\d*|질문\s*\d*)\s*[:.)]", _plain_text(body))
+    ])
+    if faq_count < expected_faq:
+        fail("faq", f"FAQ {faq_count}개 (필요: {expected_faq}개)")
+    
+    if "links" not in blocks or "</ul>" not in blocks["links"] or "<li" not in blocks["links"]:
+        fail("links", "참고 사이트 목록 없음")
+    if "closing" not in blocks or len(_complete_paragraphs(blocks["closing"])) < 2:
+        fail("closing", "마무리 문단 없음")
+    if "disclaimer" not in blocks or not _complete_paragraphs(blocks["disclaimer"]):
+        fail("disclaimer", "마지막 안내 문구 없음")
+    
+    return {
+        "valid": not problems,
+        "problems": problems,
+        "missing": missing,
+        "headings": {number: headings[number] for number in sorted(headings)},
+    }
+
+
+MARKDOWN_PATTERN = re.compile(r"^\s{0,3}#{1,6}\s|\*\*[^*\n]+\*\*|__[^_\n]+__|^\s*[-*]\s+\S|```", re.M)
+
+
+def score_blog_post(blog_post, word_count=BLOG_POST_MIN_CHARS, expected_faq=5):
+    """
+    best-of-N 후보 비교용 로컬 점수 (0.0 ~ 1.0, 높을수록 좋음)
+    
+    구조 완성도(validate_blog_post 문제 수) 50%, 목표 길이 근접도(태그를 뺀 글자 수) 30%,
+    마크다운 미사용 20%로 계산한다. 모델 호출 없이 정규식만 사용하므로 후보 수에 비해 무시할 만큼 빠르다.
+    
+    Args:
+        blog_post: "제목: ..." 줄로 시작하는 블로그 글 (HTML)
+        word_count: 프롬프트가 요구하는 목표 길이(자, blog_post_target_chars 참고)
+        expected_faq: 필요한 FAQ 질문 수
+        
+    Returns:
+        {"score", "problems", "length", "markdown"} 딕셔너리
+    """
+    validation = validate_blog_post(blog_post, expected_faq=expected_faq, require_date=False)
+    length = len(_plain_text(blog_post))
+    markdown = len(MARKDOWN_PATTERN.findall(_plain_text(blog_post)))
+    
+    structure_score = 1 / (1 + len(validation["problems"]))
+    length_score = min(length, word_count) / max(length, word_count) if length and word_count else 0.0
+    markdown_score = 1 / (1 + markdown)
+    
+    return {
+        "score": round(0.5 * structure_score + 0.3 * length_score + 0.2 * markdown_score, 4),
+        "problems": validation["problems"],
+        "length": length,
+        "markdown": markdown,
+    }
+
+
+def build_outline_prompt(topic, style="친근하고 정보적인"):
+    """개요(제목, 도입부, 추천 대상, 요약, 소제목 목록) 생성 프롬프트 작성"""
+    return f"""
+다음 주제로 블로그 글의 개요를 작성해주세요:
+
+주제: {topic}
+스타일: {style}
+
+작성 규칙:
+- 매력적이고 클릭하고 싶은 제목 (감탄사나 질문형)
+- 도입부: 주제와 관련된 공감 가는 상황 설명 (3-4문장)
+- 추천 대상 4-5개
+- 전체 요약 2-3줄
+- 본문 소제목 5-7개 (서로 겹치지 않게)
+- 마크다운 문법과 HTML 태그를 사용하지 말 것
+
+아래 형식의 JSON 하나만 출력하세요 (다른 설명 없이):
+{{"title": "제목", "intro": "도입부", "recommend": ["추천 대상"], "summary": "전체 요약", "headings": ["소제목"]}}
+"""
+
+
+def _outline_context(topic, outline, style):
+    """섹션별 프롬프트에 공통으로 들어갈 글 전체 맥락"""
+    headings = "\n".join(f"{index}. {heading}" for index, heading in enumerate(outline["headings"], 1))
+    return f"""주제: {topic}
+제목: {outline.get("title", "")}
+스타일: {style}
+전체 소제목:
+{headings}"""
+
+
+def build_section_prompt(topic, outline, index, style="친근하고 정보적인", paragraph_count=2):
+    """개요의 index번째(1부터) 소제목 본문 생성 프롬프트 작성"""
+    heading = outline["headings"][index - 1]
+    return f"""
+다음 블로그 글의 한 섹션 본문을 작성해주세요.
+
+{_outline_context(topic, outline, style)}
+
+작성할 소제목: {index}. {heading}
+
+작성 규칙:
+- 이 소제목 내용만 작성하고 다른 소제목과 내용이 겹치지 않게 할 것
+- 3-4문장 문단 {paragraph_count}개 이상, 구체적인 예시, 통계, 실용적인 팁 포함
+- 마크다운 문법과 HTML 태그를 사용하지 말 것
+
+아래 형식의 JSON 하나만 출력하세요 (다른 설명 없이):
+{{"paragraphs": ["문단"]}}
+"""
+
+
+def build_faq_prompt(topic, outline, style="친근하고 정보적인"):
+    """FAQ 생성 프롬프트 작성"""
+    return f"""
+다음 블로그 글의 자주 묻는 질문(FAQ)을 작성해주세요.
+
+{_outline_context(topic, outline, style)}
+
+작성 규칙:
+- 질문 5개, 각 답변은 2-3문장으로 상세하게
+- 마크다운 문법과 HTML 태그를 사용하지 말 것
+
+아래 형식의 JSON 하나만 출력하세요 (다른 설명 없이):
+{{"faq": [{{"q": "질문", "a": "답변"}}]}}
+"""
+
+
+def build_closing_prompt(topic, outline, style="친근하고 정보적인"):
+    """마무리 문단과 참고 사이트 생성 프롬프트 작성"""
+    return f"""
+다음 블로그 글의 마무리 부분을 작성해주세요.
+
+{_outline_context(topic, outline, style)}
+
+작성 규칙:
+- 마무리 요약 및 실천 유도 문단 (3-4문장, 구체적인 행동 촉구)
+- 관련 참고 사이트 3개 (이름과 URL)
+- 마크다운 문법과 HTML 태그를 사용하지 말 것
+
+아래 형식의 JSON 하나만 출력하세요 (다른 설명 없이):
+{{"closing": "마무리 문단", "links": [{{"name": "사이트 이름", "url": "https://..."}}]}}
+"""
+
+
+def build_header_parts_prompt(topic, outline, style="친근하고 정보적인"):
+    """제목, 도입부, 추천 대상, 전체 요약을 다시 만드는 프롬프트 작성 (부분 재생성용)"""
+    return f"""
+다음 블로그 글의 앞부분을 작성해주세요.
+
+{_outline_context(topic, outline, style)}
+
+작성 규칙:
+- 매력적이고 클릭하고 싶은 제목 (감탄사나 질문형)
+- 도입부: 주제와 관련된 공감 가는 상황 설명 (3-4문장)
+- 추천 대상 4-5개
+- 전체 요약 2-3줄
+- 마크다운 문법과 HTML 태그를 사용하지 말 것
+
+아래 형식의 JSON 하나만 출력하세요 (다른 설명 없이):
+{{"title": "제목", "intro": "도입부", "recommend": ["추천 대상"], "summary": "전체 요약"}}
+"""
+
+
+def build_summarize_prompt(text, max_sentences=5):
+    """요약 프롬프트 작성"""
+    return f"""
+다음 텍스트를 {max_sentences}개 문장 이내로 요약해주세요:
 
 {text}
 
-번역:
+요약:
 """
-        
-        return self.generate_content(prompt, temperature=0.3)
+
+
+SUMMARY_CHUNK_CHARS = 12000
+
+
+def split_into_chunks(text, max_chars=SUMMARY_CHUNK_CHARS):
+    """
+    텍스트를 문단 경계 기준으로 max_chars 이하 조각으로 분할
     
-    def improve_writing(self, text):
-        """
-        글쓰기 개선
+    문단 하나가 max_chars보다 길면 줄, 그래도 길면 글자 수 기준으로 나눈다.
+    
+    Args:
+        text: 분할할 텍스트
+        max_chars: 조각당 최대 글자 수
         
-        Args:
-            text: 개선할 텍스트
-            
-        Returns:
-            개선된 텍스트
-        """
-        prompt = f"""
-다음 텍스트의 맞춤법, 문법, 표현을 개선해주세요.
-더 자연스럽고 읽기 쉽게 다듬어주세요:
+    Returns:
+        조각 문자열 리스트 (순서 유지)
+    """
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text.strip()):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for line in paragraph.splitlines():
+            line = line.strip()
+            while len(line) > max_chars:
+                pieces.append(line[:max_chars])
+                line = line[max_chars:]
+            if line:
+                pieces.append(line)
+    
+    # 이웃한 조각을 max_chars까지 다시 묶어 요청 수를 줄임
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) + 2 > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    
+    return chunks
+
+
+def build_chunk_summary_prompt(text, index, total):
+    """긴 텍스트 중 한 조각의 부분 요약 프롬프트 작성 (map 단계)"""
+    return f"""
+다음은 긴 문서를 {total}개로 나눈 조각 중 {index + 1}번째입니다.
+이 조각의 핵심 내용을 빠짐없이 간결하게 요약해주세요 (숫자, 고유명사 등 중요한 사실은 유지할 것):
 
 {text}
 
-개선된 버전:
+요약:
 """
-        
-        return self.generate_content(prompt, temperature=0.5)
 
 
+def build_reduce_summary_prompt(summaries, max_sentences=5):
+    """부분 요약들을 하나의 최종 요약으로 합치는 프롬프트 작성 (reduce 단계)"""
+    joined = "\n\n".join(f"[부분 {index + 1}]\n{summary.strip()}" for index, summary in enumerate(summaries))
+    return f"""
+다음은 한 문서를 순서대로 나누어 요약한 부분 요약들입니다.
+전체 문서의 내용을 {max_sentences}개 문장 이내로 요약해주세요:
+
+{joined}
+
+요약:
+"""
+
+
+def build_translate_prompt(text, target_language="한국어"):
+    """번역 프롬프트 작성"""
+    return f"""
+다음 텍스트를 {target_language}로 번역해주세요:
+
+{text}
+
+번역:
+"""
+
+
+TRANSLATE_SEGMENT_PATTERN = re.compile(r"<<<SEG (\d+)>>>\s*(.*?)\s*(?=<<<SEG \d+>>>|<<<END>>>|\Z)", re.S)
+
+
+def build_batch_translate_prompt(segments, target_language="한국어"):
+    """
+    여러 짧은 텍스트를 구분자로 묶어 한 번에 번역하는 프롬프트 작성
+    
+    Args:
+        segments: 번역할 텍스트 리스트
+        target_language: 목표 언어
+    """
+    body = "\n".join(f"<<<SEG {index}>>>\n{segment}" for index, segment in enumerate(segments))
+    return f"""
+다음은 <<<SEG 번호>>> 구분자로 나뉜 {len(segments)}개의 텍스트입니다. 각 텍스트를 {target_language}로 번역해주세요.
+
+규칙:
+1. 각 번역 앞에 원문과 같은 <<<SEG 번호>>> 구분자를 그대로 붙일 것
+2. 구분자 순서와 개수를 바꾸지 말고, 텍스트끼리 합치거나 나누지 말 것
+3. 마지막에 <<<END>>>를 출력하고, 번역 외의 설명은 쓰지 말 것
+
+{body}
+<<<END>>>
+"""
+
+
+def parse_batch_translation(response_text, count):
+    """
+    묶음 번역 응답을 구분자 기준으로 나눔
+    
+    Returns:
+        길이 count의 리스트 (응답에서 찾지 못한 항목은 None)
+    """
+    translations = [None] * count
+    for match in TRANSLATE_SEGMENT_PATTERN.finditer(response_text or ""):
+        index = int(match.group(1))
+        if 0 <= index < count and translations[index] is None and match.group(2):
+            translations[index] = match.group(2)
+    return translations
+
+
+def build_improve_writing_prompt(text):
+    """글쓰기 개선 프롬프트 작성"""
+    return f"""
+다음 텍스트의 맞춤법, 문법, 표현을 개선해주세요.
+더 자연스럽고 읽기 쉽게 다듬어주세요:
+
+{text}
+
+개선된 버전:
+"""
+
+
+def build_continuation_prompt(prompt, partial_text):
+    """
+    출력 토큰 한도로 끊긴 생성 결과를 이어서 작성하게 하는 프롬프트
+    
+    Args:
+        prompt: 원래 프롬프트
+        partial_text: 지금까지 생성된 (끊긴) 결과
+        
+    Returns:
+        프롬프트 문자열
+    """
+    return f"""{prompt}
+
+[지금까지 작성한 내용]
+{partial_text}
+
+위 내용은 출력 길이 제한으로 중간에 끊겼습니다.
+끊긴 지점 바로 다음 글자부터 이어서 작성하세요.
+이미 작성한 내용을 반복하거나 설명을 덧붙이지 말고, 이어지는 내용만 출력하세요.
+"""
+
+
+# build_plain_post_prompt가 요구하는 분량(800-1200자)의 상한
+PLAIN_POST_TARGET_CHARS = 1200
+
+
+def build_plain_post_prompt(title):
+    """
+    블로그 제목으로 서론-본론-결론 구조의 순수 텍스트 본문 작성 프롬프트 생성
+    (엑셀 기반 글쓰기처럼 편집기에 문단 단위로 입력하는 흐름용)
+    
+    Args:
+        title: 블로그 제목
+        
+    Returns:
+        프롬프트 문자열
+    """
+    return f"""
+다음 제목으로 블로그 본문을 작성해주세요:
+
+제목: {title}
+
+요구사항:
+1. 서론-본론-결론의 3단 구조로 작성할 것
+2. 서론: 주제를 소개하고 독자의 관심을 끌 것
+3. 본론: 핵심 내용을 구체적이고 상세하게 설명할 것 (2-3개의 소주제 포함)
+4. 결론: 내용을 요약하고 행동을 유도할 것
+5. 읽기 쉽고 자연스러운 한국어로 작성할 것
+6. 실용적인 정보와 구체적인 예시를 포함할 것
+7. 약 800-1200자 분량으로 작성할 것
+8. 마크다운 문법을 사용하지 말고 순수 텍스트로만 작성할 것
+
+블로그 본문을 작성해주세요:
+"""
+
+
+def prepare_post(gemini, post, log=print):
+    """
+    엑셀 행 하나의 본문 준비 (GenerateAhead 생산자 단계, 백그라운드 스레드에서 실행)
+    
+    Args:
+        gemini: GeminiAPI 인스턴스 (본문이 모두 채워져 있으면 None)
+        post: {"row", "title", "content"} 딕셔너리 (content가 비어 있으면 제목으로 생성)
+        log: 진행 메시지 출력 함수 (스크립트의 로그 파일 기록 함수 등)
+        
+    Returns:
+        편집기에 입력할 본문
+    """
+    if post["content"]:
+        return post["content"]
+    
+    log(f"  [생성] {post['row']}행 본문 생성 시작: {post['title'][:30]}")
+    content = gemini.generate_content(
+        build_plain_post_prompt(post["title"]),
+        temperature=1.0,
+        max_output_tokens=8192,
+        task="blog_post_plain",
+        target_chars=PLAIN_POST_TARGET_CHARS
+    ).strip()
+    log(f"  [생성] {post['row']}행 본문 생성 완료 ({len(content)}자)")
+    return content
+
+
+class ResponseCache:
+    """SQLite 기반 생성 결과 캐시 (모델 + 프롬프트 + 생성 설정을 키로 사용, LRU 제거 및 TTL 지원)"""
+    
+    def __init__(self, db_path="gemini_cache.sqlite3", max_entries=5000, max_bytes=200 * 1024 * 1024, ttl_seconds=None):
+        """
+        캐시 초기화
+        
+        Args:
+            db_path: SQLite 파일 경로
+            max_entries: 최대 저장 항목 수 (초과 시 가장 오래 사용되지 않은 항목부터 제거)
+            max_bytes: 최대 저장 용량 (바이트)
+            ttl_seconds: 항목 유효 시간 (None이면 만료 없음)
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        
+        # 여러 스레드(generate_many, GUI 스레드)에서 같은 연결을 공유
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+    
+    @staticmethod
+    def make_key(model_name, prompt, config):
+        """모델명, 프롬프트, 생성 설정으로 캐시 키(SHA-256) 생성"""
+        payload = json.dumps(
+            {"model": model_name, "prompt": prompt, "config": config},
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key):
+        """
+        캐시 조회
+        
+        Returns:
+            저장된 텍스트 (없거나 만료되었으면 None)
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None:
+                self.misses += 1
+                return None
+            
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return value
+    
+    def set(self, key, value):
+        """캐시 저장 후 용량 제한을 넘으면 LRU 순서로 제거"""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+    
+    def _evict(self):
+        """항목 수/용량 제한을 넘는 만큼 가장 오래 사용되지 않은 항목 제거 (락을 잡은 상태에서 호출)"""
+        count, total_size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        
+        if count <= self.max_entries and total_size <= self.max_bytes:
+            return
+        
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC").fetchall()
+        expired_keys = []
+        for key, size in rows:
+            if count <= self.max_entries and total_size <= self.max_bytes:
+                break
+            expired_keys.append((key,))
+            count -= 1
+            total_size -= size
+        
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", expired_keys)
+    
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+    
+    def close(self):
+        """SQLite 연결 종료"""
+        with self._lock:
+            self._conn.close()
+
+
+class DuplicateIndex:
+    """
+    MinHash + LSH 기반 유사 중복 색인 (키워드와 생성된 본문을 SQLite에 저장)
+    
+    새 키워드나 생성 결과가 이미 다룬 내용과 거의 같은지 생성/발행 전에 확인한다.
+    서명은 메모리의 LSH 버킷에도 올려 두므로 조회는 후보 몇 개만 비교한다.
+    """
+    
+    # 종류별 shingle 길이 (짧은 키워드는 2글자, 본문은 3글자 단위)
+    SHINGLE_SIZES = {"keyword": 2, "post": 3}
+    DEFAULT_THRESHOLDS = {"keyword": 0.7, "post": 0.6}
+    _PRIME = (1 << 61) - 1
+    
+    def __init__(self, db_path="gemini_dedup.sqlite3", num_perm=64, bands=16):
+        """
+        색인 초기화 (저장된 서명을 메모리로 불러옴)
+        
+        Args:
+            db_path: SQLite 파일 경로
+            num_perm: MinHash 서명 길이
+            bands: LSH 밴드 수 (num_perm의 약수, 많을수록 낮은 유사도도 후보로 잡음)
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+        
+        self.db_path = db_path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        
+        # 저장된 서명과 호환되도록 고정 시드로 해시 계수 생성
+        generator = random.Random(num_perm)
+        self._coefficients = [
+            (generator.randrange(1, self._PRIME), generator.randrange(0, self._PRIME))
+            for _ in range(num_perm)
+        ]
+        
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._buckets = {}
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                label TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        
+        for entry_id, kind, label, signature in self._conn.execute(
+            "SELECT id, kind, label, signature FROM entries"
+        ).fetchall():
+            signature = json.loads(signature)
+            if len(signature) == num_perm:
+                self._index(entry_id, kind, label, signature)
+    
+    @staticmethod
+    def normalize(text):
+        """HTML 태그, 공백, 문장부호를 제거하고 소문자로 통일"""
+        text = html.unescape(re.sub(r"<[^>]+>", " ", text or ""))
+        return re.sub(r"[\W_]+", "", text.lower())
+    
+    def signature(self, text, kind="keyword"):
+        """텍스트의 MinHash 서명 계산"""
+        normalized = self.normalize(text)
+        size = self.SHINGLE_SIZES.get(kind, 3)
+        shingles = {normalized[index:index + size] for index in range(max(1, len(normalized) - size + 1))}
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+            for shingle in shingles
+        ]
+        return [min((a * value + b) % self._PRIME for value in hashes) for a, b in self._coefficients]
+    
+    def _band_keys(self, kind, signature):
+        return [
+            (kind, band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+    
+    def _index(self, entry_id, kind, label, signature):
+        """메모리 색인에 등록 (락을 잡은 상태나 초기화 중에 호출)"""
+        self._entries[entry_id] = (kind, label, signature)
+        for band_key in self._band_keys(kind, signature):
+            self._buckets.setdefault(band_key, []).append(entry_id)
+    
+    def similarity(self, signature, other):
+        """두 서명의 일치 비율 (Jaccard 유사도 추정값)"""
+        return sum(1 for mine, theirs in zip(signature, other) if mine == theirs) / self.num_perm
+    
+    def find_similar(self, text, kind="keyword", threshold=None, signature=None):
+        """
+        이미 등록된 항목 중 유사한 항목 검색
+        
+        Args:
+            text: 확인할 키워드 또는 본문
+            kind: "keyword" 또는 "post"
+            threshold: 추정 Jaccard 유사도 기준 (None이면 종류별 기본값)
+            signature: 미리 계산한 서명 (None이면 text로 계산)
+            
+        Returns:
+            유사도 내림차순 [(유사도, 등록 당시 라벨)] 리스트
+        """
+        if threshold is None:
+            threshold = self.DEFAULT_THRESHOLDS.get(kind, 0.7)
+        signature = signature or self.signature(text, kind=kind)
+        
+        with self._lock:
+            candidates = set()
+            for band_key in self._band_keys(kind, signature):
+                candidates.update(self._buckets.get(band_key, ()))
+            
+            matches = []
+            for entry_id in candidates:
+                _, label, other = self._entries[entry_id]
+                similarity = self.similarity(signature, other)
+                if similarity >= threshold:
+                    matches.append((round(similarity, 3), label))
+        
+        return sorted(matches, reverse=True)
+    
+    def add(self, text, kind="keyword", label=None, signature=None):
+        """
+        항목 등록
+        
+        Args:
+            text: 등록할 키워드 또는 본문
+            kind: "keyword" 또는 "post"
+            label: 중복 발견 시 보여줄 이름 (None이면 text 앞부분)
+            signature: 미리 계산한 서명 (None이면 text로 계산)
+        """
+        signature = signature or self.signature(text, kind=kind)
+        label = label or (text or "")[:50]
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO entries (kind, label, signature, created_at) VALUES (?, ?, ?, ?)",
+                (kind, label, json.dumps(signature), time.time())
+            )
+            self._conn.commit()
+            self._index(cursor.lastrowid, kind, label, signature)
+    
+    def close(self):
+        """SQLite 연결 종료"""
+        with self._lock:
+            self._conn.close()
+
+
+class Cassette:
+    """
+    생성 요청/응답 녹화·재생기
+    
+    record 모드에서는 모델 호출마다 요청(모델, 프롬프트, 생성 설정)과 응답(텍스트, 스트리밍 조각,
+    토큰 사용량, 종료 사유, 지연 시간, 오류)을 요청별 JSON 파일로 저장한다.
+    replay 모드에서는 네트워크 없이 녹화된 응답을 녹화된 지연 시간만큼 기다렸다가 돌려주므로
+    실제 운영 출력 그대로 할당량 없이 같은 성능 측정을 반복할 수 있다.
+    같은 요청이 여러 번 녹화되었으면 녹화 순서대로 돌아가며 재생한다.
+    """
+    
+    MODES = ("record", "replay")
+    
+    def __init__(self, path="gemini_cassettes", mode="replay", latency_scale=1.0, fixed_latency=None):
+        """
+        Args:
+            path: 카세트 파일(요청별 JSON)을 저장할 폴더
+            mode: "record"(실제 호출 결과 저장) 또는 "replay"(저장된 응답 재생)
+            latency_scale: 재생 시 녹화된 지연 시간에 곱할 배율 (0이면 기다리지 않음)
+            fixed_latency: 지정하면 녹화된 값 대신 모든 재생에 이 지연 시간(초) 적용
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"지원하지 않는 카세트 모드입니다: {mode} (record 또는 replay)")
+        
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.fixed_latency = fixed_latency
+        self.recorded = 0
+        self.replayed = 0
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._positions = {}
+        os.makedirs(path, exist_ok=True)
+    
+    @classmethod
+    def from_env(cls):
+        """
+        환경변수로 카세트 생성 (코드 수정 없이 GUI/스크립트 전체를 녹화·재생할 때 사용)
+        
+        GEMINI_CASSETTE_MODE: record 또는 replay (없으면 None 반환)
+        GEMINI_CASSETTE_DIR: 카세트 폴더 (기본 gemini_cassettes)
+        GEMINI_CASSETTE_LATENCY_SCALE: 재생 지연 배율 (기본 1.0)
+        """
+        mode = os.environ.get("GEMINI_CASSETTE_MODE")
+        if not mode:
+            return None
+        return cls(
+            path=os.environ.get("GEMINI_CASSETTE_DIR", "gemini_cassettes"),
+            mode=mode,
+            latency_scale=float(os.environ.get("GEMINI_CASSETTE_LATENCY_SCALE", "1.0"))
+        )
+    
+    @property
+    def recording(self):
+        return self.mode == "record"
+    
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+    
+    def _file_path(self, key):
+        return os.path.join(self.path, f"{key}.json")
+    
+    def _load(self, key):
+        """요청 키의 카세트 파일 읽기 (락을 잡은 상태에서 호출, 없으면 None)"""
+        if key not in self._entries:
+            try:
+                with open(self._file_path(key), "r", encoding="utf-8") as f:
+                    self._entries[key] = json.load(f)
+            except FileNotFoundError:
+                self._entries[key] = None
+        return self._entries[key]
+    
+    def record(self, model_name, prompt, config, task, latency, response=None, error=None, chunks=None):
+        """
+        호출 한 건 녹화
+        
+        Args:
+            model_name, prompt, config: 호출에 사용한 모델/프롬프트/생성 설정 (재생 시 조회 키)
+            task: 통계 집계용 호출 종류
+            latency: 응답까지 걸린 시간(초)
+            response: 응답 객체 (스트리밍이면 마지막 조각)
+            error: 호출이 실패했으면 발생한 예외
+            chunks: 스트리밍 호출이면 받은 텍스트 조각 리스트
+        """
+        interaction = {
+            "task": task,
+            "latency": round(latency, 4),
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        if error is not None:
+            interaction["error"] = str(error)
+        else:
+            if chunks is not None:
+                interaction["chunks"] = list(chunks)
+                interaction["text"] = "".join(chunks)
+            else:
+                try:
+                    interaction["text"] = response.text
+                except Exception:
+                    interaction["text"] = None
+                # candidate_count > 1 요청이면 모든 후보 저장
+                try:
+                    candidates = extract_candidate_texts(response)
+                except Exception:
+                    candidates = []
+                if len(candidates) > 1:
+                    interaction["candidates"] = candidates
+            usage = response_usage(response)
+            interaction["finish_reason"] = usage.pop("finish_reason")
+            interaction["usage"] = usage
+        
+        key = ResponseCache.make_key(model_name, prompt, config)
+        with self._lock:
+            entry = self._load(key) or {"model": model_name, "prompt": prompt, "config": config, "interactions": []}
+            entry["interactions"].append(interaction)
+            self._entries[key] = entry
+            
+            # 기록 도중 중단되어도 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+            temp_path = self._file_path(key) + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, self._file_path(key))
+            self.recorded += 1
+    
+    def _next(self, model_name, prompt, config):
+        """재생할 다음 녹화 응답 (녹화 순서대로 순환)"""
+        key = ResponseCache.make_key(model_name, prompt, config)
+        with self._lock:
+            entry = self._load(key)
+            if not entry or not entry["interactions"]:
+                raise CassetteMissError(f"녹화된 응답이 없는 요청입니다 (모델: {model_name}, 키: {key[:12]}, 프롬프트: {prompt[:50]})")
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            self.replayed += 1
+            return entry["interactions"][position % len(entry["interactions"])]
+    
+    def _latency(self, interaction):
+        if self.fixed_latency is not None:
+            return self.fixed_latency
+        return interaction.get("latency", 0.0) * self.latency_scale
+    
+    @staticmethod
+    def _response(text, interaction=None):
+        """녹화 내용을 google-genai 응답과 같은 속성을 가진 객체로 변환 (interaction이 없으면 사용량 없음)"""
+        if interaction is None:
+            return SimpleNamespace(text=text, usage_metadata=None, candidates=None)
+        
+        usage = interaction.get("usage") or {}
+        finish_reason = interaction.get("finish_reason")
+        return SimpleNamespace(
+            text=text,
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=usage.get("prompt_tokens"),
+                candidates_token_count=usage.get("output_tokens"),
+                total_token_count=usage.get("total_tokens")
+            ),
+            candidates=[
+                SimpleNamespace(
+                    content=SimpleNamespace(parts=[SimpleNamespace(text=candidate_text)]),
+                    finish_reason=SimpleNamespace(name=finish_reason) if finish_reason else None
+                )
+                for candidate_text in interaction.get("candidates") or [text]
+            ]
+        )
+    
+    def replay(self, model_name, prompt, config):
+        """
+        녹화된 응답을 녹화된 지연 시간만큼 기다린 뒤 반환
+        
+        Returns:
+            응답 객체 (녹화된 호출이 실패였으면 같은 메시지의 예외 발생 - 재시도 분류도 동일)
+        """
+        interaction = self._next(model_name, prompt, config)
+        time.sleep(self._latency(interaction))
+        if "error" in interaction:
+            raise Exception(interaction["error"])
+        return self._response(interaction["text"], interaction)
+    
+    def replay_stream(self, model_name, prompt, config):
+        """
+        녹화된 응답을 스트리밍 조각 단위로 재생 (지연 시간은 조각 수만큼 나눠서 기다림)
+        
+        Yields:
+            응답 조각 객체 (마지막 조각에 사용량 포함)
+        """
+        interaction = self._next(model_name, prompt, config)
+        if "error" in interaction:
+            time.sleep(self._latency(interaction))
+            raise Exception(interaction["error"])
+        
+        chunks = interaction.get("chunks") or [interaction["text"] or ""]
+        delay = self._latency(interaction) / len(chunks)
+        for index, chunk in enumerate(chunks):
+            time.sleep(delay)
+            yield self._response(chunk, interaction if index + 1 == len(chunks) else None)
+
+
+def is_rate_limit_error(error):
+    """429 / RESOURCE_EXHAUSTED (할당량 초과) 오류인지 확인"""
+    message = str(error)
+    return "429" in message or "RESOURCE_EXHAUSTED" in message or "quota" in message.lower()
+
+
+def estimate_tokens(text):
+    """텍스트의 토큰 수 대략 추정 (한국어 기준 1자 ≈ 1토큰으로 보수적으로 계산)"""
+    return len(text or "")
+
+
+class GenerationBlockedError(Exception):
+    """응답 텍스트가 비어 있음 (안전 필터 차단 등) - 같은 요청을 재시도해도 의미 없음"""
+    pass
+
+
+class DuplicateContentError(Exception):
+    """이미 다룬 키워드/본문과 거의 같아 생성이나 발행을 건너뜀"""
+    pass
+
+
+class CassetteMissError(Exception):
+    """재생 모드에서 요청에 해당하는 녹화 응답이 없음 - 재시도해도 의미 없음"""
+    pass
+
+
+class BatchJobFailedError(Exception):
+    """배치 작업이 실패/취소/만료 상태로 끝남 - 같은 작업을 다시 기다려도 결과가 나오지 않음"""
+    pass
+
+
+class CircuitOpenError(Exception):
+    """연속 실패로 회로 차단기가 열려 있어 호출하지 않고 바로 실패"""
+    pass
+
+
+# 재시도하면 성공할 수 있는 일시적 오류 표시
+RETRYABLE_ERROR_MARKERS = (
+    "429", "500", "502", "503", "504",
+    "RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL",
+    "timeout", "timed out", "Connection", "connection",
+)
+
+# 재시도해도 결과가 같은 오류 표시 (잘못된 요청, 인증 실패, 안전 차단)
+NON_RETRYABLE_ERROR_MARKERS = (
+    "400", "401", "403", "404",
+    "INVALID_ARGUMENT", "PERMISSION_DENIED", "UNAUTHENTICATED", "NOT_FOUND", "SAFETY", "API key",
+)
+
+
+def extract_response_text(response):
+    """
+    응답 객체에서 텍스트 추출
+    
+    안전 필터 등으로 후보가 차단되면 response.text가 None이거나 예외를 던지므로
+    GenerationBlockedError로 바꿔 재시도 대상에서 제외한다.
+    """
+    try:
+        text = response.text
+    except Exception as error:
+        raise GenerationBlockedError(f"응답 텍스트를 읽을 수 없습니다 (차단 가능성): {str(error)}")
+    
+    if not text:
+        finish_reason = None
+        candidates = getattr(response, "candidates", None)
+        if candidates:
+            finish_reason = getattr(candidates[0], "finish_reason", None)
+        raise GenerationBlockedError(f"빈 응답이 반환되었습니다 (finish_reason: {finish_reason})")
+    
+    return text
+
+
+def extract_candidate_texts(response):
+    """
+    응답 객체에서 모든 후보의 텍스트 추출 (candidate_count > 1 요청용)
+    
+    차단되었거나 비어 있는 후보는 제외하고, 남은 후보가 없으면 GenerationBlockedError를 발생시킨다.
+    
+    Returns:
+        후보 텍스트 리스트 (응답 순서)
+    """
+    texts = []
+    for candidate in getattr(response, "candidates", None) or []:
+        parts = getattr(getattr(candidate, "content", None), "parts", None) or []
+        text = "".join(getattr(part, "text", None) or "" for part in parts if not getattr(part, "thought", False))
+        if text:
+            texts.append(text)
+    
+    if not texts:
+        raise GenerationBlockedError("모든 후보가 비어 있거나 차단되었습니다")
+    return texts
+
+
+class RetryPolicy:
+    """지수 백오프 + 지터 재시도 정책"""
+    
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=30.0):
+        """
+        재시도 정책 초기화
+        
+        Args:
+            max_attempts: 최대 시도 횟수 (첫 시도 포함, 1이면 재시도 안 함)
+            base_delay: 첫 재시도 전 기본 대기 시간(초)
+            max_delay: 재시도 대기 시간 상한(초)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+    
+    def is_retryable(self, error):
+        """재시도 가능한 오류인지 분류"""
+        if isinstance(error, (GenerationBlockedError, CircuitOpenError, CassetteMissError, ValueError)):
+            return False
+        
+        message = str(error)
+        if any(marker in message for marker in NON_RETRYABLE_ERROR_MARKERS) and not is_rate_limit_error(error):
+            return False
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        return any(marker in message for marker in RETRYABLE_ERROR_MARKERS)
+    
+    def delay_for(self, attempt):
+        """attempt번째 재시도 전 대기 시간 (full jitter: 0 ~ base * 2^attempt 사이 무작위)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+    
+    def run(self, func):
+        """
+        재시도 정책에 따라 func 실행
+        
+        Returns:
+            func()의 반환값 (모든 시도가 실패하면 마지막 오류를 다시 발생)
+        """
+        for attempt in range(self.max_attempts):
+            try:
+                return func()
+            except Exception as error:
+                if attempt + 1 >= self.max_attempts or not self.is_retryable(error):
+                    raise
+                delay = self.delay_for(attempt)
+                print(f"[재시도] {attempt + 1}/{self.max_attempts - 1}회 - {delay:.1f}초 후 다시 시도 ({str(error)[:100]})")
+                time.sleep(delay)
+
+
+class CircuitBreaker:
+    """연속 실패 시 일정 시간 동안 호출을 차단하는 회로 차단기"""
+    
+    def __init__(self, failure_threshold=5, reset_timeout=60.0):
+        """
+        회로 차단기 초기화
+        
+        Args:
+            failure_threshold: 회로를 열기까지의 연속 실패 횟수
+            reset_timeout: 회로가 열린 뒤 시험 호출을 허용하기까지의 시간(초)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"  # closed, open, half_open
+        self.failure_count = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+    
+    def before_call(self):
+        """호출 전 확인 - 회로가 열려 있으면 CircuitOpenError 발생"""
+        with self._lock:
+            if self.state == "closed":
+                return
+            
+            now = time.monotonic()
+            if now - self.opened_at >= self.reset_timeout:
+                # reset_timeout마다 시험 호출 한 건만 허용
+                self.state = "half_open"
+                self.opened_at = now
+                return
+            
+            remaining = max(0.0, self.reset_timeout - (now - self.opened_at))
+            raise CircuitOpenError(f"Gemini API 연속 실패로 호출이 차단되었습니다 ({remaining:.0f}초 후 재시도 가능)")
+    
+    def record_success(self):
+        """호출 성공 기록 - 회로를 닫음"""
+        with self._lock:
+            self.state = "closed"
+            self.failure_count = 0
+            self.opened_at = None
+    
+    def record_failure(self):
+        """호출 실패 기록 - 임계치에 도달하거나 시험 호출이 실패하면 회로를 엶"""
+        with self._lock:
+            self.failure_count += 1
+            if self.state == "half_open" or self.failure_count >= self.failure_threshold:
+                if self.state != "open":
+                    print(f"[회로 차단] 연속 {self.failure_count}회 실패 - {self.reset_timeout:.0f}초 동안 호출 차단")
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class HedgingPolicy:
+    """
+    꼬리 지연 제어용 헤지 요청 정책
+    
+    호출이 관측된 p95 지연 시간 안에 끝나지 않으면 같은 요청을 한 번 더 보내고
+    먼저 끝난 응답을 사용한다. 추가 요청 비율은 max_hedge_ratio로 제한한다.
+    """
+    
+    def __init__(self, percent=95, min_samples=20, min_delay=1.0, max_hedge_ratio=0.1):
+        """
+        헤지 정책 초기화
+        
+        Args:
+            percent: 헤지 요청을 보낼 지연 시간 백분위수
+            min_samples: 백분위수를 믿고 쓰기 위한 최소 성공 기록 수 (부족하면 헤지 안 함)
+            min_delay: 헤지 요청 전 최소 대기 시간(초)
+            max_hedge_ratio: 전체 호출 대비 헤지 요청 비율 상한
+        """
+        self.percent = percent
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_hedge_ratio = max_hedge_ratio
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+    
+    def delay_for(self, stats, task):
+        """
+        헤지 요청까지 기다릴 시간 (기록이 부족하면 None)
+        
+        Args:
+            stats: 지연 시간 기록이 담긴 UsageStats
+            task: 호출 종류 (종류별 지연 시간 분포 사용)
+        """
+        with self._lock:
+            self.calls += 1
+        
+        latencies = stats.latencies(task=task)
+        if len(latencies) < self.min_samples:
+            return None
+        return max(self.min_delay, percentile(latencies, self.percent))
+    
+    def try_hedge(self):
+        """헤지 요청 비율 상한 안이면 헤지 요청 수를 늘리고 True 반환"""
+        with self._lock:
+            if self.hedges + 1 > self.max_hedge_ratio * self.calls:
+                return False
+            self.hedges += 1
+            return True
+    
+    def record_win(self):
+        """헤지 요청이 원래 요청보다 먼저 끝남"""
+        with self._lock:
+            self.hedge_wins += 1
+    
+    def usage(self):
+        """헤지 요청 횟수 요약"""
+        with self._lock:
+            return {"calls": self.calls, "hedges": self.hedges, "hedge_wins": self.hedge_wins}
+
+
+class SingleFlight:
+    """
+    같은 요청의 동시 실행 병합
+    
+    같은 키(모델 + 프롬프트 + 생성 설정)의 요청이 이미 진행 중이면 새로 호출하지 않고
+    먼저 시작한 호출이 끝나기를 기다려 같은 결과(또는 같은 오류)를 받는다.
+    먼저 시작한 호출이 결과 없이 중단되면(스트리밍 소비자가 반복을 멈춘 경우 등)
+    기다리던 호출이 직접 다시 요청한다.
+    """
+    
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+    
+    def join(self, key):
+        """
+        진행 중인 같은 요청에 합류하거나 새 요청의 실행을 맡음
+        
+        Returns:
+            진행 중인 요청이 없으면 (완료를 알릴 Future, None),
+            있으면 끝날 때까지 기다린 뒤 (None, 결과) - 그 요청이 실패했으면 같은 예외 발생
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                if future is None:
+                    future = Future()
+                    self._calls[key] = future
+                    return future, None
+            
+            result = future.result()
+            if result is not None:
+                with self._lock:
+                    self.coalesced += 1
+                print("[요청 병합] 진행 중이던 같은 요청의 결과를 함께 사용")
+                return None, result
+    
+    def finish(self, key, future, result=None, error=None):
+        """
+        join()으로 맡은 요청의 완료를 알림
+        
+        Args:
+            result: 기다리던 호출에 넘길 결과 (None이면 결과 없이 중단된 것으로 보고 각자 다시 요청)
+            error: 실패했으면 기다리던 호출에도 전달할 예외
+        """
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def do(self, key, func):
+        """같은 키의 요청이 진행 중이면 그 결과를 받고, 없으면 func()를 실행해 결과를 공유"""
+        future, result = self.join(key)
+        if future is None:
+            return result
+        
+        try:
+            result = func()
+        except Exception as error:
+            self.finish(key, future, error=error)
+            raise
+        except BaseException:
+            self.finish(key, future)
+            raise
+        self.finish(key, future, result=result)
+        return result
+    
+    def usage(self):
+        """병합된 요청 수와 현재 진행 중인 요청 수 (통계 저장용)"""
+        with self._lock:
+            return {"coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+class TokenBudget:
+    """
+    출력 토큰 예산 조절기
+    
+    호출 종류별로 출력 토큰/글자 비율과 목표 길이 대비 실제 출력 길이 비율을 지수 이동 평균으로 학습해
+    목표 길이에 맞는 max_output_tokens를 정한다. 예산이 모자라 MAX_TOKENS로 잘린 결과는
+    GeminiAPI가 처음부터 다시 만들지 않고 max_continuations번까지 이어서 생성한다.
+    """
+    
+    def __init__(self, path=None, headroom=1.3, min_tokens=512, min_samples=3, smoothing=0.2, max_continuations=2):
+        """
+        Args:
+            path: 학습한 비율을 저장할 JSON 파일 (None이면 저장하지 않음, 실행할 때마다 새로 학습)
+            headroom: 예상 토큰 수에 곱할 여유 배율
+            min_tokens: 예산 하한
+            min_samples: 예산을 줄이기 전에 필요한 최소 관측 수 (부족하면 호출자가 준 최대값 사용)
+            smoothing: 지수 이동 평균에서 새 관측값의 가중치
+            max_continuations: 잘린 결과를 이어서 생성할 최대 횟수
+        """
+        self.path = path
+        self.headroom = headroom
+        self.min_tokens = min_tokens
+        self.min_samples = min_samples
+        self.smoothing = smoothing
+        self.max_continuations = max_continuations
+        self.continuations = 0
+        self._lock = threading.Lock()
+        self._tasks = {}
+        
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._tasks = json.load(f)
+            except (OSError, ValueError) as error:
+                print(f"[경고] 토큰 예산 학습 파일을 읽지 못해 새로 학습합니다: {str(error)}")
+    
+    def _update(self, task, name, value):
+        """호출 종류의 비율 하나를 지수 이동 평균으로 갱신 (락을 잡은 상태에서 호출)"""
+        entry = self._tasks.setdefault(task, {})
+        samples = entry.get(f"{name}_samples", 0)
+        if samples == 0:
+            entry[name] = value
+        else:
+            entry[name] = (1 - self.smoothing) * entry[name] + self.smoothing * value
+        entry[f"{name}_samples"] = samples + 1
+    
+    def _save(self):
+        """학습한 비율 저장 (락을 잡은 상태에서 호출, 실패해도 무시)"""
+        if not self.path:
+            return
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self._tasks, f, ensure_ascii=False, indent=2)
+        except OSError as error:
+            print(f"[경고] 토큰 예산 학습 파일 저장 실패 (무시): {str(error)}")
+    
+    def observe_output(self, task, output_tokens, output_chars):
+        """호출 한 건의 출력 토큰 수와 글자 수로 토큰/글자 비율 학습"""
+        if not output_tokens or not output_chars:
+            return
+        with self._lock:
+            self._update(task, "tokens_per_char", output_tokens / output_chars)
+            self._save()
+    
+    def observe_length(self, task, target_chars, output_chars):
+        """목표 길이를 지정한 호출의 최종 결과 길이로 목표 대비 실제 길이 비율 학습"""
+        if not target_chars or not output_chars:
+            return
+        with self._lock:
+            self._update(task, "length_ratio", output_chars / target_chars)
+            self._save()
+    
+    def budget_for(self, task, target_chars, default):
+        """
+        목표 길이에 맞는 출력 토큰 예산
+        
+        Args:
+            task: 호출 종류
+            target_chars: 목표 글자 수
+            default: 호출자가 지정한 max_output_tokens (예산의 상한, 학습이 부족하면 그대로 사용)
+            
+        Returns:
+            max_output_tokens로 쓸 토큰 수
+        """
+        with self._lock:
+            entry = dict(self._tasks.get(task, {}))
+        
+        if (entry.get("tokens_per_char_samples", 0) < self.min_samples
+                or entry.get("length_ratio_samples", 0) < self.min_samples):
+            return default
+        
+        expected = target_chars * entry["length_ratio"] * entry["tokens_per_char"]
+        return int(min(default, max(self.min_tokens, expected * self.headroom)))
+    
+    def can_continue(self, finish_reason, continuations):
+        """MAX_TOKENS로 잘린 결과를 한 번 더 이어서 생성할지 여부"""
+        return finish_reason == "MAX_TOKENS" and continuations < self.max_continuations
+    
+    def record_continuation(self):
+        """이어쓰기 요청 한 건 기록"""
+        with self._lock:
+            self.continuations += 1
+    
+    def usage(self):
+        """학습한 비율과 이어쓰기 횟수 (통계 저장용)"""
+        with self._lock:
+            return {
+                "continuations": self.continuations,
+                "tasks": {task: dict(entry) for task, entry in self._tasks.items()},
+            }
+
+
+class RateLimiter:
+    """분당 요청 수(RPM)/토큰 수(TPM) 토큰 버킷과 할당량 오류에 반응하는 동시 실행 수 조절기"""
+    
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, max_concurrency=8, min_concurrency=1):
+        """
+        속도 제한기 초기화
+        
+        Args:
+            requests_per_minute: 분당 최대 요청 수 (None이면 제한 없음)
+            tokens_per_minute: 분당 최대 토큰 수 (None이면 제한 없음)
+            max_concurrency: 최대 동시 요청 수
+            min_concurrency: 할당량 오류가 계속되어도 유지할 최소 동시 요청 수
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        
+        # 버킷은 가득 찬 상태로 시작
+        self.request_tokens = float(requests_per_minute or 0)
+        self.token_tokens = float(tokens_per_minute or 0)
+        self.concurrency_limit = max_concurrency
+        self.in_flight = 0
+        self.success_streak = 0
+        
+        self._last_refill = time.monotonic()
+        self._condition = threading.Condition()
+    
+    def _refill(self):
+        """경과 시간만큼 버킷 충전 (락을 잡은 상태에서 호출)"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        
+        if self.requests_per_minute:
+            self.request_tokens = min(
+                float(self.requests_per_minute),
+                self.request_tokens + elapsed * self.requests_per_minute / 60.0
+            )
+        if self.tokens_per_minute:
+            self.token_tokens = min(
+                float(self.tokens_per_minute),
+                self.token_tokens + elapsed * self.tokens_per_minute / 60.0
+            )
+    
+    def _wait_time(self, estimated_tokens):
+        """지금 요청할 수 없으면 기다릴 시간(초), 가능하면 0 (락을 잡은 상태에서 호출)"""
+        wait = 0.0
+        if self.requests_per_minute and self.request_tokens < 1:
+            wait = max(wait, (1 - self.request_tokens) * 60.0 / self.requests_per_minute)
+        if self.tokens_per_minute:
+            # 한 번에 버킷보다 큰 요청은 버킷이 가득 찼을 때 허용
+            needed = min(estimated_tokens, self.tokens_per_minute)
+            if self.token_tokens < needed:
+                wait = max(wait, (needed - self.token_tokens) * 60.0 / self.tokens_per_minute)
+        return wait
+    
+    def acquire(self, estimated_tokens=0):
+        """
+        요청 슬롯 확보 (동시 실행 수와 RPM/TPM 예산이 허락할 때까지 대기)
+        
+        Args:
+            estimated_tokens: 이번 요청이 사용할 것으로 예상되는 토큰 수
+        """
+        with self._condition:
+            while True:
+                if self.in_flight < self.concurrency_limit:
+                    self._refill()
+                    wait = self._wait_time(estimated_tokens)
+                    if wait <= 0:
+                        break
+                    self._condition.wait(timeout=wait)
+                else:
+                    self._condition.wait()
+            
+            if self.requests_per_minute:
+                self.request_tokens -= 1
+            if self.tokens_per_minute:
+                self.token_tokens -= estimated_tokens
+            self.in_flight += 1
+    
+    def release(self, success=True, rate_limited=False, estimated_tokens=0, actual_tokens=None):
+        """
+        요청 슬롯 반납 및 동시 실행 수 조절
+        
+        할당량 오류가 나면 동시 실행 수를 절반으로 줄이고,
+        현재 한도만큼 연속으로 성공하면 하나씩 다시 늘린다.
+        
+        Args:
+            success: 요청 성공 여부
+            rate_limited: 429/RESOURCE_EXHAUSTED 응답 여부
+            estimated_tokens: acquire 시 예약한 토큰 수
+            actual_tokens: 실제 사용한 토큰 수 (알 수 있으면 예약분과의 차이를 정산)
+        """
+        with self._condition:
+            self.in_flight -= 1
+            
+            if self.tokens_per_minute and actual_tokens is not None:
+                self.token_tokens += estimated_tokens - actual_tokens
+            
+            if rate_limited:
+                self.success_streak = 0
+                new_limit = max(self.min_concurrency, self.concurrency_limit // 2)
+                if new_limit != self.concurrency_limit:
+                    print(f"[속도 제한] 할당량 초과 감지 - 동시 실행 수 {self.concurrency_limit} → {new_limit}")
+                self.concurrency_limit = new_limit
+            elif success:
+                self.success_streak += 1
+                if self.success_streak >= self.concurrency_limit and self.concurrency_limit < self.max_concurrency:
+                    self.concurrency_limit += 1
+                    self.success_streak = 0
+            
+            self._condition.notify_all()
+
+
+# 프로세스 전체에서 공유하는 클라이언트 레지스트리 (API 키별 genai 클라이언트, 키 조합별 GeminiAPI)
+_client_registry = {}
+_api_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_client(api_key):
+    """
+    API 키별로 하나만 만들어 재사용하는 genai 클라이언트 반환
+    
+    같은 클라이언트를 계속 쓰면 내부 HTTP 연결(keep-alive)이 재사용되어
+    호출마다 TLS 연결을 새로 맺지 않는다.
+    GEMINI_BASE_URL 환경변수가 있으면 그 주소로 요청한다 (프록시, 벤치마크용 가짜 서버 등).
+    """
+    base_url = os.environ.get("GEMINI_BASE_URL")
+    with _registry_lock:
+        client = _client_registry.get((api_key, base_url))
+        if client is None:
+            if base_url:
+                client = genai.Client(api_key=api_key, http_options={"base_url": base_url})
+            else:
+                client = genai.Client(api_key=api_key)
+            _client_registry[(api_key, base_url)] = client
+        return client
+
+
+def mask_api_key(api_key):
+    """로그/통계 출력용으로 API 키 가운데 부분을 가림"""
+    if len(api_key) <= 8:
+        return "*" * len(api_key)
+    return f"{api_key[:4]}...{api_key[-4:]}"
+
+
+class ApiKeyPool:
+    """여러 API 키에 요청을 분산하고 키별 사용량/할당량 초과를 추적하는 풀"""
+    
+    def __init__(self, api_keys, cooldown_seconds=60.0):
+        """
+        키 풀 초기화 (키마다 별도의 genai 클라이언트 생성)
+        
+        Args:
+            api_keys: API 키 리스트
+            cooldown_seconds: 할당량 오류가 난 키를 쉬게 할 시간(초)
+        """
+        api_keys = [key.strip() for key in api_keys if key and key.strip()]
+        if not api_keys:
+            raise ValueError("API 키가 제공되지 않았습니다. api_key 매개변수나 GEMINI_API_KEY 환경변수를 설정해주세요.")
+        
+        self.cooldown_seconds = cooldown_seconds
+        self.entries = [
+            {
+                "api_key": api_key,
+                "client": get_client(api_key),
+                "in_flight": 0,
+                "requests": 0,
+                "tokens": 0,
+                "quota_errors": 0,
+                "cooldown_until": 0.0,
+            }
+            for api_key in dict.fromkeys(api_keys)
+        ]
+        self._condition = threading.Condition()
+    
+    @staticmethod
+    def keys_from_env():
+        """환경변수에서 키 목록 읽기 (GEMINI_API_KEYS는 쉼표로 구분, 없으면 GEMINI_API_KEY)"""
+        keys = os.environ.get("GEMINI_API_KEYS", "")
+        if keys.strip():
+            return [key.strip() for key in keys.split(",") if key.strip()]
+        single_key = os.environ.get("GEMINI_API_KEY")
+        return [single_key] if single_key else []
+    
+    def acquire(self):
+        """
+        요청에 사용할 키 선택 (쉬는 중이 아닌 키 중 진행 중인 요청과 누적 요청이 가장 적은 키)
+        
+        모든 키가 쉬는 중이면 가장 먼저 풀리는 키를 기다린다.
+        
+        Returns:
+            선택된 키 항목 (release에 그대로 전달)
+        """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                available = [entry for entry in self.entries if entry["cooldown_until"] <= now]
+                if available:
+                    entry = min(available, key=lambda item: (item["in_flight"], item["requests"]))
+                    entry["in_flight"] += 1
+                    entry["requests"] += 1
+                    return entry
+                
+                wait = min(entry["cooldown_until"] for entry in self.entries) - now
+                print(f"[키 풀] 모든 키가 할당량 초과로 대기 중 - {wait:.0f}초 후 재개")
+                self._condition.wait(timeout=wait)
+    
+    def release(self, entry, tokens=None, quota_error=False):
+        """
+        키 사용 종료 기록
+        
+        Args:
+            entry: acquire가 반환한 키 항목
+            tokens: 이번 요청에서 사용한 토큰 수
+            quota_error: 할당량 초과(429) 응답 여부 - True면 해당 키를 cooldown_seconds 동안 제외
+        """
+        with self._condition:
+            entry["in_flight"] -= 1
+            entry["tokens"] += tokens or 0
+            if quota_error:
+                entry["quota_errors"] += 1
+                entry["cooldown_until"] = time.monotonic() + self.cooldown_seconds
+                print(f"[키 풀] {mask_api_key(entry['api_key'])} 할당량 초과 - {self.cooldown_seconds:.0f}초 동안 제외")
+            self._condition.notify_all()
+    
+    def usage(self):
+        """키별 사용량 (키는 가려서 반환)"""
+        now = time.monotonic()
+        with self._condition:
+            return [
+                {
+                    "api_key": mask_api_key(entry["api_key"]),
+                    "requests": entry["requests"],
+                    "tokens": entry["tokens"],
+                    "quota_errors": entry["quota_errors"],
+                    "cooling_down": entry["cooldown_until"] > now,
+                }
+                for entry in self.entries
+            ]
+
+
+def response_usage(response):
+    """
+    응답 객체의 usage_metadata와 finish_reason 추출
+    
+    Returns:
+        {"prompt_tokens", "output_tokens", "total_tokens", "finish_reason"} 딕셔너리 (없는 값은 None)
+    """
+    usage = getattr(response, "usage_metadata", None)
+    finish_reason = None
+    candidates = getattr(response, "candidates", None)
+    if candidates:
+        reason = getattr(candidates[0], "finish_reason", None)
+        if reason is not None:
+            finish_reason = getattr(reason, "name", None) or str(reason)
+    
+    return {
+        "prompt_tokens": getattr(usage, "prompt_token_count", None) if usage else None,
+        "output_tokens": getattr(usage, "candidates_token_count", None) if usage else None,
+        "total_tokens": getattr(usage, "total_token_count", None) if usage else None,
+        "finish_reason": finish_reason,
+    }
+
+
+def percentile(values, percent):
+    """정렬된 값 목록에서 nearest-rank 방식 백분위수 계산 (값이 없으면 None)"""
+    if not values:
+        return None
+    rank = max(1, int(-(-percent * len(values) // 100)))  # ceil(percent/100 * n)
+    return values[min(rank, len(values)) - 1]
+
+
+class UsageStats:
+    """생성 호출별 토큰 사용량/지연 시간/종료 사유 기록 및 집계"""
+    
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+    
+    def record(self, task, model_name, latency, usage=None, error=None):
+        """
+        호출 한 건 기록
+        
+        Args:
+            task: 호출 종류 (blog_post, summarize, translate, improve, generate 등)
+            model_name: 사용한 모델명
+            latency: 지연 시간(초)
+            usage: response_usage()의 반환값 (실패 시 None)
+            error: 실패한 경우 오류 객체
+        """
+        usage = usage or {}
+        entry = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "task": task,
+            "model": model_name,
+            "latency": round(latency, 4),
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "output_tokens": usage.get("output_tokens"),
+            "total_tokens": usage.get("total_tokens"),
+            "finish_reason": usage.get("finish_reason"),
+            "success": error is None,
+            "error": str(error)[:200] if error is not None else None,
+        }
+        with self._lock:
+            self.records.append(entry)
+    
+    @staticmethod
+    def _aggregate(records):
+        """기록 목록의 합계/평균/지연 시간 백분위수 계산"""
+        latencies = sorted(record["latency"] for record in records if record["success"])
+        succeeded = [record for record in records if record["success"]]
+        
+        def total(field):
+            return sum(record[field] or 0 for record in succeeded)
+        
+        finish_reasons = {}
+        for record in succeeded:
+            reason = record["finish_reason"] or "UNKNOWN"
+            finish_reasons[reason] = finish_reasons.get(reason, 0) + 1
+        
+        return {
+            "calls": len(records),
+            "succeeded": len(succeeded),
+            "failed": len(records) - len(succeeded),
+            "prompt_tokens": total("prompt_tokens"),
+            "output_tokens": total("output_tokens"),
+            "total_tokens": total("total_tokens"),
+            "avg_total_tokens": round(total("total_tokens") / len(succeeded), 1) if succeeded else None,
+            "latency_total": round(sum(latencies), 3),
+            "latency_p50": percentile(latencies, 50),
+            "latency_p95": percentile(latencies, 95),
+            "latency_p99": percentile(latencies, 99),
+            "finish_reasons": finish_reasons,
+        }
+    
+    def summary(self):
+        """
+        전체 및 호출 종류별 집계
+        
+        Returns:
+            {"overall": {...}, "by_task": {task: {...}}, "tokens_per_post": ...} 딕셔너리
+        """
+        with self._lock:
+            records = list(self.records)
+        
+        by_task = {}
+        for record in records:
+            by_task.setdefault(record["task"], []).append(record)
+        
+        task_summaries = {task: self._aggregate(task_records) for task, task_records in by_task.items()}
+        blog_records = [record for record in records if record["task"] in BLOG_POST_TASKS]
+        blog_summary = self._aggregate(blog_records) if blog_records else None
+        
+        return {
+            "overall": self._aggregate(records),
+            "by_task": task_summaries,
+            "tokens_per_post": blog_summary["avg_total_tokens"] if blog_summary else None,
+        }
+    
+    def latencies(self, task=None):
+        """성공한 호출의 지연 시간 목록 (오름차순)"""
+        with self._lock:
+            return sorted(
+                record["latency"] for record in self.records
+                if record["success"] and (task is None or record["task"] == task)
+            )
+    
+    def percentile_latency(self, percent, task=None):
+        """성공한 호출의 지연 시간 백분위수 (기록이 없으면 None)"""
+        return percentile(self.latencies(task=task), percent)
+    
+    def dump_json(self, path, extra=None):
+        """
+        집계 결과와 개별 기록을 JSON 파일로 저장
+        
+        Args:
+            path: 저장할 파일 경로
+            extra: 함께 저장할 추가 정보 딕셔너리 (예: 키별 사용량)
+        """
+        with self._lock:
+            records = list(self.records)
+        data = {"summary": self.summary(), "records": records}
+        data.update(extra or {})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"[OK] 생성 통계 저장: {path}")
+    
+    def print_summary(self):
+        """집계 결과를 콘솔에 출력"""
+        overall = self.summary()["overall"]
+        print(f"[통계] 호출 {overall['calls']}회 (실패 {overall['failed']}회), "
+              f"토큰 {overall['total_tokens']}개, "
+              f"지연 p50/p95/p99: {overall['latency_p50']}/{overall['latency_p95']}/{overall['latency_p99']}초")
+
+
+# 모델 구성: 긴 블로그 글은 큰 모델, 요약/번역/교정 같은 짧은 보조 작업은 빠르고 저렴한 모델
+DEFAULT_MODEL = "gemini-2.0-flash-exp"
+LIGHT_MODEL = "gemini-2.0-flash-lite"
+FALLBACK_MODEL = "gemini-2.0-flash"
+
+# 블로그 글 한 편을 통째로 생성하는 호출 종류
+# 출력 형태(서식 HTML, JSON, 순수 텍스트)마다 글자 수 대비 토큰 비율이 크게 달라 TokenBudget이 따로 학습한다.
+BLOG_POST_TASKS = ("blog_post_html", "blog_post_styled", "blog_post_json", "blog_post_plain")
+
+# 호출 종류별 모델 우선순위 (앞의 모델이 느리거나 실패하면 다음 모델 사용)
+DEFAULT_MODEL_ROUTES = {
+    "blog_post_html": [DEFAULT_MODEL, FALLBACK_MODEL],
+    "blog_post_styled": [DEFAULT_MODEL, FALLBACK_MODEL],
+    "blog_post_json": [DEFAULT_MODEL, FALLBACK_MODEL],
+    "blog_post_plain": [DEFAULT_MODEL, FALLBACK_MODEL],
+    "blog_outline": [DEFAULT_MODEL, FALLBACK_MODEL],
+    "blog_section": [DEFAULT_MODEL, FALLBACK_MODEL],
+    "summarize": [LIGHT_MODEL, FALLBACK_MODEL],
+    "translate": [LIGHT_MODEL, FALLBACK_MODEL],
+    "improve": [LIGHT_MODEL, FALLBACK_MODEL],
+}
+
+
+class ModelRouter:
+    """호출 종류별로 모델을 선택하고, 주 모델이 느리거나 실패하면 대체 모델로 우회하는 라우터"""
+    
+    def __init__(self, routes=None, default_model=DEFAULT_MODEL, slow_threshold_seconds=None, failure_threshold=3,
+                 recovery_seconds=60.0):
+        """
+        라우터 초기화
+        
+        Args:
+            routes: {호출 종류: [모델명, ...]} 우선순위 목록 (None이면 DEFAULT_MODEL_ROUTES)
+            default_model: routes에 없는 호출 종류에 사용할 모델
+            slow_threshold_seconds: 최근 평균 지연 시간이 이 값을 넘으면 대체 모델을 먼저 사용 (None이면 지연 기준 우회 안 함)
+            failure_threshold: 연속 실패가 이 횟수에 도달하면 대체 모델을 먼저 사용
+            recovery_seconds: 느리거나 실패 중인 모델을 이 시간(초)이 지나면 다시 주 모델로 시도
+        """
+        self.routes = dict(DEFAULT_MODEL_ROUTES if routes is None else routes)
+        self.default_model = default_model
+        self.slow_threshold_seconds = slow_threshold_seconds
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        
+        # (호출 종류, 모델)별 지수 이동 평균 지연 시간, 연속 실패 횟수, 마지막 기록 시각
+        self.latency_ewma = {}
+        self.consecutive_failures = {}
+        self.last_recorded = {}
+        self._lock = threading.Lock()
+    
+    def primary(self, task):
+        """호출 종류의 주 모델 (캐시 키 등 결정적인 값이 필요할 때 사용)"""
+        return (self.routes.get(task) or [self.default_model])[0]
+    
+    def _is_healthy(self, task, model_name):
+        """최근 지연 시간과 연속 실패 기준으로 모델 상태 판단 (락을 잡은 상태에서 호출)"""
+        last_recorded = self.last_recorded.get((task, model_name))
+        if last_recorded is not None and time.monotonic() - last_recorded >= self.recovery_seconds:
+            # 오래 사용하지 않은 모델은 다시 시도해 상태를 갱신
+            return True
+        if self.consecutive_failures.get((task, model_name), 0) >= self.failure_threshold:
+            return False
+        latency = self.latency_ewma.get((task, model_name))
+        if self.slow_threshold_seconds is not None and latency is not None and latency > self.slow_threshold_seconds:
+            return False
+        return True
+    
+    def candidates(self, task):
+        """
+        이번 호출에서 시도할 모델 순서
+        
+        Returns:
+            정상 상태인 모델을 우선순위대로, 느리거나 실패 중인 모델을 그 뒤에 배치한 리스트
+        """
+        models = self.routes.get(task) or [self.default_model]
+        with self._lock:
+            healthy = [model for model in models if self._is_healthy(task, model)]
+            unhealthy = [model for model in models if model not in healthy]
+        return healthy + unhealthy
+    
+    def record(self, task, model_name, latency, success):
+        """호출 결과를 기록해 다음 라우팅에 반영"""
+        key = (task, model_name)
+        with self._lock:
+            self.last_recorded[key] = time.monotonic()
+            if success:
+                previous = self.latency_ewma.get(key)
+                self.latency_ewma[key] = latency if previous is None else previous * 0.7 + latency * 0.3
+                self.consecutive_failures[key] = 0
+            else:
+                self.consecutive_failures[key] = self.consecutive_failures.get(key, 0) + 1
+
+
+BATCH_DONE_STATES = ("JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED")
+
+
+def batch_job_state(job):
+    """배치 작업 객체의 상태 이름 (예: "JOB_STATE_RUNNING")"""
+    state = getattr(job, "state", None)
+    return getattr(state, "name", None) or str(state)
+
+
+class LocalBatchJobs:
+    """
+    client.batches와 같은 create/get 형태로 동작하는 로컬 대체 배치 서버
+    
+    배치 API를 쓸 수 없는 키이거나 제출-대기-수집 흐름을 오프라인에서 확인할 때 사용한다.
+    제출된 요청은 백그라운드 스레드에서 일반 생성 API로 처리된다.
+    """
+    
+    def __init__(self, client, concurrency=8):
+        """
+        Args:
+            client: 요청을 실제로 처리할 genai 클라이언트
+            concurrency: 작업 하나를 처리할 때 동시에 보낼 최대 요청 수
+        """
+        self.client = client
+        self.concurrency = max(1, concurrency)
+        self.jobs = {}
+        self.lock = threading.Lock()
+    
+    def create(self, model, src, config=None):
+        """배치 작업 등록 후 바로 반환 (처리는 백그라운드에서 진행)"""
+        with self.lock:
+            name = f"local-batches/{len(self.jobs) + 1}"
+            job = SimpleNamespace(
+                name=name,
+                display_name=(config or {}).get("display_name"),
+                state=SimpleNamespace(name="JOB_STATE_PENDING"),
+                dest=None
+            )
+            self.jobs[name] = job
+        
+        threading.Thread(target=self._run, args=(job, model, list(src)), daemon=True).start()
+        return job
+    
+    def get(self, name):
+        """배치 작업 조회"""
+        with self.lock:
+            job = self.jobs.get(name)
+        if job is None:
+            raise ValueError(f"배치 작업을 찾을 수 없습니다: {name}")
+        return job
+    
+    def _run(self, job, model, requests):
+        job.state = SimpleNamespace(name="JOB_STATE_RUNNING")
+        
+        def run_one(request):
+            try:
+                response = self.client.models.generate_content(
+                    model=model,
+                    contents=request["contents"],
+                    config=request.get("config")
+                )
+                return SimpleNamespace(response=response, error=None)
+            except Exception as error:
+                return SimpleNamespace(response=None, error=SimpleNamespace(message=str(error)))
+        
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, max(1, len(requests)))) as executor:
+            responses = list(executor.map(run_one, requests))
+        
+        job.dest = SimpleNamespace(inlined_responses=responses)
+        job.state = SimpleNamespace(name="JOB_STATE_SUCCEEDED")
+
+
+class GenerateAhead:
+    """
+    다음 글을 미리 생성해 두는 생산자/소비자 파이프라인
+    
+    생산자 스레드가 produce(item)을 순서대로 실행하고, 소비자(브라우저 작성 루프)는
+    결과를 같은 순서로 꺼내 쓴다. 글 N을 브라우저에 입력하는 동안 글 N+1을 생성하므로
+    모델 호출과 편집기 작업이 서로를 기다리지 않는다.
+    앞서 생성하는 개수는 lookahead로 제한되어 중단 시 버려지는 생성 호출도 그만큼뿐이다.
+    """
+    
+    _DONE = object()
+    
+    def __init__(self, items, produce, lookahead=1):
+        """
+        Args:
+            items: 처리할 항목 목록 (키워드, 엑셀 행 등)
+            produce: 항목 하나를 받아 결과를 반환하는 함수 (백그라운드 스레드에서 실행)
+            lookahead: 소비자보다 앞서 생성해 둘 최대 개수
+        """
+        self.items = list(items)
+        self.produce = produce
+        self.lookahead = max(1, lookahead)
+        self._queue = queue.Queue()
+        self._slots = threading.Semaphore(self.lookahead)
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self):
+        """생산자 스레드 시작 (이미 시작했으면 무시)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self):
+        """더 이상 새 항목을 생성하지 않도록 중단"""
+        self._stop.set()
+    
+    def _wait_slot(self):
+        while not self._stop.is_set():
+            if self._slots.acquire(timeout=0.5):
+                return True
+        return False
+    
+    def _run(self):
+        for item in self.items:
+            if not self._wait_slot():
+                break
+            try:
+                entry = (item, self.produce(item), None)
+            except Exception as error:
+                entry = (item, None, error)
+            self._queue.put(entry)
+        self._queue.put(self._DONE)
+    
+    def __iter__(self):
+        """
+        (항목, 결과, 오류) 튜플을 입력 순서대로 반환
+        
+        produce에서 발생한 예외는 던지지 않고 오류 자리에 담아 다음 항목으로 넘어갈 수 있게 한다.
+        반복을 중간에 멈추면 생산자도 함께 중단된다.
+        """
+        self.start()
+        try:
+            while True:
+                entry = self._queue.get()
+                if entry is self._DONE:
+                    return
+                # 소비자가 하나를 가져가면 그 다음 항목 생성을 허용
+                self._slots.release()
+                yield entry
+        finally:
+            self.stop()
+
+
+class GeminiAPI:
+    """Gemini API를 사용하기 위한 클래스"""
+    
+    def __init__(self, api_key=None, cache=None, rate_limiter=None, retry_policy=None, circuit_breaker=None, stats=None,
+                 api_keys=None, key_cooldown_seconds=60.0, router=None, duplicate_index=None, hedging_policy=None,
+                 cassette=None, token_budget=None, single_flight=None):
+        """
+        Gemini API 클라이언트 초기화
+        
+        Args:
+            api_key: Gemini API 키 (None이면 환경변수에서 가져옴)
+            cache: 생성 결과를 재사용할 ResponseCache (None이면 캐시 사용 안 함)
+            rate_limiter: 요청 속도/동시 실행 수를 조절할 RateLimiter (None이면 제한 없음)
+            retry_policy: 일시적 오류 재시도 정책 (None이면 기본 RetryPolicy)
+            circuit_breaker: 연속 실패 시 호출을 차단할 CircuitBreaker (None이면 기본 CircuitBreaker)
+            stats: 호출별 토큰/지연 시간을 기록할 UsageStats (None이면 새로 생성)
+            api_keys: 요청을 분산할 API 키 리스트 (지정하면 api_key보다 우선)
+            key_cooldown_seconds: 할당량 초과가 난 키를 쉬게 할 시간(초)
+            router: 호출 종류별 모델을 선택할 ModelRouter (None이면 기본 라우팅)
+            duplicate_index: 키워드/본문 중복을 확인할 DuplicateIndex (None이면 확인 안 함)
+            hedging_policy: 느린 호출에 헤지 요청을 보낼 HedgingPolicy (None이면 사용 안 함)
+            cassette: 호출을 녹화하거나 녹화된 응답을 재생할 Cassette (None이면 GEMINI_CASSETTE_MODE 환경변수 확인)
+            token_budget: 목표 길이로 출력 토큰 예산을 정하고 잘린 결과를 이어서 생성할 TokenBudget (None이면 사용 안 함)
+            single_flight: 같은 요청의 동시 실행을 병합할 SingleFlight (None이면 기본 SingleFlight)
+        """
+        self.cache = cache
+        self.single_flight = single_flight or SingleFlight()
+        self.token_budget = token_budget
+        self.cassette = cassette or Cassette.from_env()
+        self.duplicate_index = duplicate_index
+        self.hedging_policy = hedging_policy
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.stats = stats or UsageStats()
+        
+        # API 키 설정 (프로세스 전역 환경변수는 건드리지 않음)
+        keys = api_keys or ([api_key] if api_key else ApiKeyPool.keys_from_env())
+        if not keys and self.cassette is not None and self.cassette.replaying:
+            # 재생 모드는 네트워크를 쓰지 않으므로 키 없이도 실행 가능
+            keys = ["cassette-replay"]
+        if not keys:
+            raise ValueError("API 키가 제공되지 않았습니다. api_key 매개변수나 GEMINI_API_KEY 환경변수를 설정해주세요.")
+        
+        # 클라이언트 초기화
+        try:
+            self.key_pool = ApiKeyPool(keys, cooldown_seconds=key_cooldown_seconds)
+            self.client = self.key_pool.entries[0]["client"]
+            self.model_name = DEFAULT_MODEL
+            self.router = router or ModelRouter(default_model=self.model_name)
+            print(f"[OK] Gemini API 클라이언트 초기화 완료 (모델: {self.model_name}, API 키: {len(self.key_pool.entries)}개)")
+        except Exception as error:
+            raise Exception(f"Gemini API 초기화 실패: {str(error)}")
+        
+        if self.cassette is not None:
+            print(f"[OK] 카세트 {'녹화' if self.cassette.recording else '재생'} 모드 ({self.cassette.path})")
+    
+    def warm_up(self, background=False):
+        """
+        키별 클라이언트의 연결을 미리 맺어 첫 생성 요청의 연결 지연을 줄임 (실패해도 무시)
+        
+        Args:
+            background: True면 별도 스레드에서 실행하고 바로 반환
+        """
+        if background:
+            threading.Thread(target=self.warm_up, daemon=True).start()
+            return
+        
+        if self.cassette is not None and self.cassette.replaying:
+            return
+        
+        for entry in self.key_pool.entries:
+            started = time.perf_counter()
+            try:
+                entry["client"].models.get(model=self.model_name)
+                print(f"[OK] 연결 준비 완료 ({mask_api_key(entry['api_key'])}, {time.perf_counter() - started:.2f}초)")
+            except Exception as error:
+                print(f"[경고] 연결 준비 실패 (무시): {str(error)[:100]}")
+    
+    def generate_content(self, prompt, temperature=1.0, max_output_tokens=16384, task="generate", response_mime_type=None,
+                         target_chars=None):
+        """
+        텍스트 생성 요청
+        
+        Args:
+            prompt: 생성할 텍스트의 프롬프트
+            temperature: 생성 다양성 (0.0 ~ 2.0, 높을수록 창의적)
+            max_output_tokens: 최대 출력 토큰 수 (TokenBudget이 있으면 예산의 상한)
+            task: 통계 집계용 호출 종류
+            response_mime_type: 응답 형식 (예: "application/json", None이면 일반 텍스트)
+            target_chars: 목표 출력 글자 수 (TokenBudget이 있으면 이 길이에 맞춰 출력 토큰 예산을 줄임)
+            
+        Returns:
+            생성된 텍스트 문자열
+        """
+        try:
+            print(f"\n[생성 요청] 프롬프트: {prompt[:100]}...")
+            
+            # 생성 설정
+            generation_config = self._generation_config(temperature, max_output_tokens, response_mime_type)
+            
+            # 캐시 조회 (같은 키로 진행 중인 요청도 확인)
+            cache_key = ResponseCache.make_key(self.router.primary(task), prompt, generation_config)
+            if self.cache is not None:
+                cached_text = self.cache.get(cache_key)
+                if cached_text is not None:
+                    print(f"[캐시 적중] 저장된 결과 사용 (길이: {len(cached_text)}자)")
+                    return cached_text
+            
+            def generate():
+                # API 호출 및 응답 텍스트 추출 (일시적 오류는 재시도, 캐시 키는 예산 적용 전 설정 기준)
+                call_config = self._budgeted_config(generation_config, task, target_chars)
+                models_used = []
+                result_text, finish_reason = self._generate_text(prompt, call_config, task=task, nominal_config=generation_config,
+                                                                 models_used=models_used)
+                
+                # JSON 같은 구조화된 출력은 이어 붙이면 깨지므로, 줄인 예산 때문에 잘렸으면 원래 한도로 한 번만 다시 생성
+                if response_mime_type and finish_reason == "MAX_TOKENS" and call_config is not generation_config:
+                    print(f"[다시 생성] 출력 토큰 예산({call_config['max_output_tokens']})으로 잘린 {response_mime_type} 응답 - "
+                          f"원래 한도({generation_config['max_output_tokens']})로 재요청")
+                    result_text, finish_reason = self._generate_text(prompt, generation_config, task=task,
+                                                                     models_used=models_used)
+                
+                # 토큰 한도로 잘렸으면 처음부터 다시 만들지 않고 이어서 생성 (구조화된 출력은 제외)
+                continuations = 0
+                while (not response_mime_type and self.token_budget is not None
+                       and self.token_budget.can_continue(finish_reason, continuations)):
+                    continuations += 1
+                    self.token_budget.record_continuation()
+                    print(f"[이어서 생성] 출력 토큰 한도({call_config['max_output_tokens']})로 잘림 - {continuations}번째 이어쓰기")
+                    more_text, finish_reason = self._generate_text(
+                        build_continuation_prompt(prompt, result_text), call_config, task=task, nominal_config=generation_config,
+                        models_used=models_used
+                    )
+                    result_text += more_text
+                
+                if target_chars and self._learning_budget() is not None:
+                    self.token_budget.observe_length(task, target_chars, len(result_text))
+                print(f"[OK] 생성 완료 (길이: {len(result_text)}자)")
+                
+                if self.cache is not None and result_text and self._served_by_primary(task, models_used):
+                    self.cache.set(cache_key, result_text)
+                
+                return result_text
+            
+            # 같은 요청이 이미 진행 중이면 새로 호출하지 않고 그 결과를 함께 받음
+            return self.single_flight.do(cache_key, generate)
+            
+        except Exception as error:
+            print(f"[ERROR] 텍스트 생성 중 오류 발생: {str(error)}")
+            raise
+    
+    @staticmethod
+    def _generation_config(temperature=1.0, max_output_tokens=16384, response_mime_type=None):
+        """generate_content의 생성 설정 딕셔너리 (캐시 키 계산에도 사용)"""
+        generation_config = {
+            "temperature": temperature,
+            "max_output_tokens": max_output_tokens,
+        }
+        if response_mime_type:
+            generation_config["response_mime_type"] = response_mime_type
+        return generation_config
+    
+    def _budgeted_config(self, generation_config, task, target_chars):
+        """목표 길이가 있으면 학습한 비율로 max_output_tokens를 줄인 생성 설정 (없으면 그대로)"""
+        if not target_chars or self.token_budget is None:
+            return generation_config
+        
+        budget = self.token_budget.budget_for(task, target_chars, generation_config["max_output_tokens"])
+        if budget == generation_config["max_output_tokens"]:
+            return generation_config
+        print(f"[토큰 예산] 목표 {target_chars}자 → 최대 출력 {budget}토큰 ({task})")
+        return dict(generation_config, max_output_tokens=budget)
+    
+    def _learning_budget(self):
+        """비율을 학습할 TokenBudget (재생 모드에서는 녹화된 응답으로 학습 파일을 바꾸지 않도록 None)"""
+        if self.cassette is not None and self.cassette.replaying:
+            return None
+        return self.token_budget
+    
+    def _served_by_primary(self, task, models_used):
+        """
+        응답이 모두 주 모델에서 왔는지 확인 (캐시 키는 주 모델 기준이므로 대체 모델 응답은 캐시하지 않음)
+        
+        Args:
+            models_used: _generate_text/_stream_routed가 채운 응답 모델명 리스트
+        """
+        primary = self.router.primary(task)
+        fallbacks = sorted(set(model for model in models_used if model != primary))
+        if fallbacks:
+            print(f"[캐시 제외] 대체 모델({', '.join(fallbacks)})이 응답한 결과는 캐시하지 않음")
+            return False
+        return True
+    
+    def replace_cached(self, prompt, text, temperature=1.0, max_output_tokens=16384, task="generate", response_mime_type=None):
+        """
+        generate_content로 캐시된 결과를 바꿔 저장 (검증 후 보완한 결과 등, 캐시가 없으면 무시)
+        
+        인자는 원래 generate_content 호출과 같아야 같은 캐시 키가 된다.
+        """
+        if self.cache is None:
+            return
+        generation_config = self._generation_config(temperature, max_output_tokens, response_mime_type)
+        self.cache.set(self.cache.make_key(self.router.primary(task), prompt, generation_config), text)
+    
+    def generate_candidates(self, prompt, candidate_count=3, temperature=1.0, max_output_tokens=16384, task="generate",
+                            response_mime_type=None, target_chars=None):
+        """
+        한 번의 요청으로 여러 후보 생성 (candidate_count)
+        
+        후보마다 처음부터 따로 호출하지 않으므로 왕복 지연은 한 번뿐이고 프롬프트 토큰도 한 번만 든다.
+        토큰 한도로 잘린 후보는 이어서 생성하지 않는다 (점수 비교에서 구조 점수가 깎임).
+        
+        Args:
+            prompt: 생성할 텍스트의 프롬프트
+            candidate_count: 후보 수 (모델이 지원하는 범위 안에서, 보통 최대 8)
+            temperature: 생성 다양성 (후보끼리 달라야 하므로 너무 낮추지 말 것)
+            max_output_tokens: 후보 하나당 최대 출력 토큰 수 (TokenBudget이 있으면 예산의 상한)
+            task: 통계 집계용 호출 종류
+            response_mime_type: 응답 형식 (예: "application/json", None이면 일반 텍스트)
+            target_chars: 후보 하나의 목표 출력 글자 수 (TokenBudget이 있으면 예산 계산에 사용)
+            
+        Returns:
+            후보 텍스트 리스트 (차단되었거나 빈 후보는 제외)
+        """
+        print(f"\n[후보 생성 요청] {candidate_count}개 후보, 프롬프트: {prompt[:100]}...")
+        
+        generation_config = self._generation_config(temperature, max_output_tokens, response_mime_type)
+        generation_config["candidate_count"] = candidate_count
+        
+        # 후보 목록 전체를 JSON으로 캐시
+        cache_key = ResponseCache.make_key(self.router.primary(task), prompt, generation_config)
+        if self.cache is not None:
+            cached_text = self.cache.get(cache_key)
+            if cached_text is not None:
+                print(f"[캐시 적중] 저장된 후보 {len(json.loads(cached_text))}개 사용")
+                return json.loads(cached_text)
+        
+        def generate():
+            call_config = self._budgeted_config(generation_config, task, target_chars)
+            models_used = []
+            texts = self._generate_text(prompt, call_config, task=task, extract=extract_candidate_texts,
+                                        nominal_config=generation_config, models_used=models_used)
+            print(f"[OK] 후보 생성 완료 ({len(texts)}/{candidate_count}개, 길이: {', '.join(str(len(text)) for text in texts)}자)")
+            
+            if self.cache is not None and self._served_by_primary(task, models_used):
+                self.cache.set(cache_key, json.dumps(texts, ensure_ascii=False))
+            return texts
+        
+        try:
+            return self.single_flight.do(cache_key, generate)
+        except Exception as error:
+            print(f"[ERROR] 후보 생성 중 오류 발생: {str(error)}")
+            raise
+    
+    def _generate_text(self, prompt, generation_config, task="generate", extract=None, nominal_config=None,
+                       models_used=None):
+        """
+        재시도 정책과 회로 차단기를 적용해 모델을 호출하고 텍스트 반환
+        
+        Args:
+            extract: 응답 객체에서 결과를 꺼낼 함수 (None이면 첫 후보의 텍스트와 finish_reason)
+            nominal_config: 토큰 예산 적용 전 생성 설정 (카세트 조회 키, None이면 generation_config)
+            models_used: 실제로 응답한 모델명을 추가할 리스트 (대체 모델 응답 캐시 제외 판단용)
+        
+        Returns:
+            (생성된 텍스트, finish_reason) 튜플 (extract를 지정하면 그 반환값)
+        """
+        def call_routed():
+            # 라우터가 정한 순서대로 모델을 시도 (일시적 오류면 바로 다음 모델로)
+            models = self.router.candidates(task)
+            for index, model_name in enumerate(models):
+                try:
+                    response = self._call_hedged(prompt, generation_config, task=task, model_name=model_name,
+                                                 nominal_config=nominal_config)
+                    if extract is not None:
+                        result = extract(response)
+                    else:
+                        result = extract_response_text(response), response_usage(response)["finish_reason"]
+                    if models_used is not None:
+                        models_used.append(model_name)
+                    return result
+                except Exception as error:
+                    if index + 1 >= len(models) or not self.retry_policy.is_retryable(error):
+                        raise
+                    print(f"[모델 우회] {model_name} 실패 - {models[index + 1]}로 재요청 ({str(error)[:100]})")
+        
+        def attempt():
+            self.circuit_breaker.before_call()
+            try:
+                result = call_routed()
+            except Exception as error:
+                # 차단/잘못된 요청은 서버가 정상 응답한 것이므로 장애로 세지 않음
+                if self.retry_policy.is_retryable(error):
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+                raise
+            self.circuit_breaker.record_success()
+            return result
+        
+        return self.retry_policy.run(attempt)
+    
+    def _call_hedged(self, prompt, generation_config, task="generate", model_name=None, nominal_config=None):
+        """
+        헤지 정책이 있으면 p95 지연 시간이 지나도 끝나지 않은 호출에 같은 요청을 한 번 더 보냄
+        
+        먼저 끝난 응답을 사용하고 나머지 요청은 결과를 버린다. 동기 SDK 호출은 도중에 끊을 수
+        없으므로 버려진 요청은 백그라운드에서 끝날 때까지 실행된 뒤 속도 제한/키 슬롯을 반납한다.
+        
+        Returns:
+            google-genai 응답 객체
+        """
+        delay = self.hedging_policy.delay_for(self.stats, task) if self.hedging_policy is not None else None
+        if delay is None:
+            return self._call_model(prompt, generation_config, task=task, model_name=model_name, nominal_config=nominal_config)
+        
+        def start_call():
+            future = Future()
+            
+            def run():
+                try:
+                    future.set_result(self._call_model(prompt, generation_config, task=task, model_name=model_name,
+                                                       nominal_config=nominal_config))
+                except Exception as error:
+                    future.set_exception(error)
+            
+            threading.Thread(target=run, daemon=True).start()
+            return future
+        
+        primary = start_call()
+        done, _ = wait([primary], timeout=delay)
+        if done or not self.hedging_policy.try_hedge():
+            return primary.result()
+        
+        print(f"[헤지 요청] {delay:.1f}초 안에 응답이 없어 같은 요청을 한 번 더 보냄 ({task})")
+        hedge = start_call()
+        done, _ = wait([primary, hedge], return_when=FIRST_COMPLETED)
+        first = hedge if hedge in done else primary
+        other = primary if first is hedge else hedge
+        
+        if first.exception() is not None:
+            # 먼저 끝난 쪽이 실패했으면 나머지 결과를 기다림 (둘 다 실패하면 먼저 난 오류 전달)
+            try:
+                response = other.result()
+            except Exception:
+                raise first.exception()
+            first = other
+        else:
+            response = first.result()
+        
+        if first is hedge:
+            self.hedging_policy.record_win()
+        return response
+    
+    def _call_model(self, prompt, generation_config, task="generate", model_name=None, nominal_config=None):
+        """
+        모델 호출 (속도 제한 적용, 토큰/지연 시간 기록)
+        
+        Args:
+            model_name: 호출할 모델 (None이면 라우터의 주 모델)
+            nominal_config: 토큰 예산 적용 전 생성 설정 (카세트 조회 키, None이면 generation_config)
+        
+        Returns:
+            google-genai 응답 객체
+        """
+        model_name = model_name or self.router.primary(task)
+        # 학습한 예산은 녹화와 재생 사이에 바뀌므로 카세트는 예산 적용 전 설정으로 찾음
+        cassette_config = nominal_config or generation_config
+        estimated_tokens = estimate_tokens(prompt) + generation_config.get("max_output_tokens", 0)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(estimated_tokens)
+        
+        response = None
+        usage = None
+        rate_limited = False
+        key_entry = self.key_pool.acquire()
+        started = time.perf_counter()
+        try:
+            try:
+                if self.cassette is not None and self.cassette.replaying:
+                    response = self.cassette.replay(model_name, prompt, cassette_config)
+                else:
+                    response = key_entry["client"].models.generate_content(
+                        model=model_name,
+                        contents=prompt,
+                        config=generation_config
+                    )
+            except Exception as error:
+                latency = time.perf_counter() - started
+                rate_limited = is_rate_limit_error(error)
+                self.stats.record(task, model_name, latency, error=error)
+                self.router.record(task, model_name, latency, success=False)
+                if self.cassette is not None and self.cassette.recording:
+                    self.cassette.record(model_name, prompt, cassette_config, task, latency, error=error)
+                raise
+            
+            latency = time.perf_counter() - started
+            usage = response_usage(response)
+            self.stats.record(task, model_name, latency, usage=usage)
+            # 후보가 여러 개면 출력 토큰이 모든 후보의 합이라 비율 학습에서 제외
+            if self._learning_budget() is not None and generation_config.get("candidate_count", 1) == 1:
+                try:
+                    self.token_budget.observe_output(task, usage["output_tokens"], len(response.text or ""))
+                except Exception:
+                    pass
+            self.router.record(task, model_name, latency, success=True)
+            if self.cassette is not None and self.cassette.recording:
+                self.cassette.record(model_name, prompt, cassette_config, task, latency, response=response)
+        finally:
+            # 응답 후 기록(녹화, 사용량 집계)이 실패해도 키와 슬롯은 반드시 반납
+            actual_tokens = usage["total_tokens"] if usage is not None else None
+            self.key_pool.release(key_entry, tokens=actual_tokens, quota_error=rate_limited)
+            if self.rate_limiter is not None:
+                self.rate_limiter.release(
+                    success=response is not None,
+                    rate_limited=rate_limited,
+                    estimated_tokens=estimated_tokens,
+                    actual_tokens=actual_tokens
+                )
+        
+        return response
+    
+    def generate_content_stream(self, prompt, temperature=1.0, max_output_tokens=16384, on_chunk=None, task="generate",
+                                target_chars=None):
+        """
+        텍스트 생성 요청 (스트리밍) - 모델이 생성하는 대로 텍스트 조각을 순서대로 반환
+        
+        Args:
+            prompt: 생성할 텍스트의 프롬프트
+            temperature: 생성 다양성 (0.0 ~ 2.0, 높을수록 창의적)
+            max_output_tokens: 최대 출력 토큰 수 (TokenBudget이 있으면 예산의 상한)
+            on_chunk: 조각이 도착할 때마다 호출할 함수 on_chunk(chunk_text)
+            task: 통계 집계용 호출 종류
+            target_chars: 목표 출력 글자 수 (TokenBudget이 있으면 이 길이에 맞춰 출력 토큰 예산을 줄임)
+            
+        Yields:
+            생성된 텍스트 조각 (토큰 한도로 잘려 이어서 생성한 부분도 이어서 반환)
+        """
+        print(f"\n[스트리밍 요청] 프롬프트: {prompt[:100]}...")
+        
+        # 생성 설정
+        generation_config = self._generation_config(temperature, max_output_tokens)
+        
+        # 캐시에 있으면 전체 결과를 한 조각으로 반환
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(self.router.primary(task), prompt, generation_config)
+            cached_text = self.cache.get(cache_key)
+            if cached_text is not None:
+                print(f"[캐시 적중] 저장된 결과 사용 (길이: {len(cached_text)}자)")
+                if on_chunk:
+                    on_chunk(cached_text)
+                yield cached_text
+                return
+        
+        # 같은 요청이 이미 진행 중이면 끝나기를 기다렸다가 전체 결과를 한 조각으로 반환
+        flight_key = ResponseCache.make_key(self.router.primary(task), prompt, generation_config)
+        future, shared_text = self.single_flight.join(flight_key)
+        if future is None:
+            if on_chunk:
+                on_chunk(shared_text)
+            yield shared_text
+            return
+        
+        finished = False
+        try:
+            call_config = self._budgeted_config(generation_config, task, target_chars)
+            chunks = []
+            models_used = []
+            finish_reason = yield from self._stream_routed(prompt, call_config, task, chunks, on_chunk,
+                                                           nominal_config=generation_config, models_used=models_used)
+            
+            # 토큰 한도로 잘렸으면 처음부터 다시 만들지 않고 이어서 생성
+            continuations = 0
+            while self.token_budget is not None and self.token_budget.can_continue(finish_reason, continuations):
+                continuations += 1
+                self.token_budget.record_continuation()
+                print(f"[이어서 생성] 출력 토큰 한도({call_config['max_output_tokens']})로 잘림 - {continuations}번째 이어쓰기")
+                finish_reason = yield from self._stream_routed(
+                    build_continuation_prompt(prompt, "".join(chunks)), call_config, task, chunks, on_chunk,
+                    nominal_config=generation_config, models_used=models_used
+                )
+            
+            result_text = "".join(chunks)
+            print(f"[OK] 스트리밍 생성 완료 (길이: {len(result_text)}자)")
+            
+            if target_chars and self._learning_budget() is not None:
+                self.token_budget.observe_length(task, target_chars, len(result_text))
+            
+            if cache_key is not None and result_text and self._served_by_primary(task, models_used):
+                self.cache.set(cache_key, result_text)
+            
+            self.single_flight.finish(flight_key, future, result=result_text)
+            finished = True
+        except Exception as error:
+            self.single_flight.finish(flight_key, future, error=error)
+            finished = True
+            raise
+        finally:
+            # 소비자가 중간에 반복을 멈추면 기다리던 호출이 직접 다시 요청하도록 결과 없이 완료
+            if not finished:
+                self.single_flight.finish(flight_key, future)
+    
+    def _stream_routed(self, prompt, generation_config, task, collected, on_chunk=None, nominal_config=None,
+                       models_used=None):
+        """
+        재시도 정책과 모델 우회를 적용한 스트리밍 호출 (_generate_text와 같은 기준)
+        
+        첫 조각을 내보내기 전에 난 일시적 오류만 다음 모델로 우회하거나 대기 후 다시 시도하고,
+        이미 조각을 내보낸 뒤의 오류는 같은 내용이 두 번 출력되지 않도록 그대로 전달
+        
+        Args:
+            collected: 받은 텍스트 조각을 이어 붙일 리스트
+            nominal_config: 토큰 예산 적용 전 생성 설정 (카세트 조회 키, None이면 generation_config)
+            models_used: 실제로 응답한 모델명을 추가할 리스트 (대체 모델 응답 캐시 제외 판단용)
+            
+        Yields:
+            생성된 텍스트 조각
+            
+        Returns:
+            마지막 조각의 finish_reason
+        """
+        policy = self.retry_policy
+        for attempt in range(policy.max_attempts):
+            models = self.router.candidates(task)
+            for index, model_name in enumerate(models):
+                received = len(collected)
+                try:
+                    finish_reason = yield from self._stream_once(prompt, generation_config, model_name, task, collected,
+                                                                 on_chunk, nominal_config=nominal_config)
+                    if models_used is not None:
+                        models_used.append(model_name)
+                    return finish_reason
+                except Exception as error:
+                    if len(collected) > received or not policy.is_retryable(error):
+                        raise
+                    if index + 1 < len(models):
+                        print(f"[모델 우회] {model_name} 실패 - {models[index + 1]}로 재요청 ({str(error)[:100]})")
+                        continue
+                    if attempt + 1 >= policy.max_attempts:
+                        raise
+                    delay = policy.delay_for(attempt)
+                    print(f"[재시도] {attempt + 1}/{policy.max_attempts - 1}회 - {delay:.1f}초 후 다시 시도 ({str(error)[:100]})")
+                    time.sleep(delay)
+    
+    def _stream_once(self, prompt, generation_config, model_name, task, collected, on_chunk=None, nominal_config=None):
+        """
+        스트리밍 호출 한 번 (회로 차단기/속도 제한/키 분산 적용, 토큰/지연 시간 기록)
+        
+        Args:
+            collected: 받은 텍스트 조각을 이어 붙일 리스트
+            nominal_config: 토큰 예산 적용 전 생성 설정 (카세트 조회 키, None이면 generation_config)
+            
+        Yields:
+            생성된 텍스트 조각
+            
+        Returns:
+            마지막 조각의 finish_reason
+        """
+        # 서버 장애로 회로가 열려 있으면 바로 실패
+        self.circuit_breaker.before_call()
+        
+        # 카세트는 예산 적용 전 설정으로 찾음 (_call_model과 같은 기준)
+        cassette_config = nominal_config or generation_config
+        estimated_tokens = estimate_tokens(prompt) + generation_config["max_output_tokens"]
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(estimated_tokens)
+        
+        chunks = []
+        completed = False
+        rate_limited = False
+        last_response = None
+        key_entry = self.key_pool.acquire()
+        started = time.perf_counter()
+        try:
+            # API 호출 (재생 모드면 녹화된 조각을 같은 간격으로 재생)
+            if self.cassette is not None and self.cassette.replaying:
+                responses = self.cassette.replay_stream(model_name, prompt, cassette_config)
+            else:
+                responses = key_entry["client"].models.generate_content_stream(
+                    model=model_name,
+                    contents=prompt,
+                    config=generation_config
+                )
+            for response in responses:
+                last_response = response
+                chunk_text = response.text
+                if not chunk_text:
+                    continue
+                chunks.append(chunk_text)
+                collected.append(chunk_text)
+                if on_chunk:
+                    on_chunk(chunk_text)
+                yield chunk_text
+            completed = True
+            if self.cassette is not None and self.cassette.recording:
+                self.cassette.record(model_name, prompt, cassette_config, task, time.perf_counter() - started,
+                                     response=last_response, chunks=chunks)
+            self.circuit_breaker.record_success()
+            # 마지막 조각에 전체 사용량이 담겨 옴
+            usage = response_usage(last_response)
+            self.stats.record(task, model_name, time.perf_counter() - started, usage=usage)
+            self.router.record(task, model_name, time.perf_counter() - started, success=True)
+            if self._learning_budget() is not None:
+                self.token_budget.observe_output(task, usage["output_tokens"], len("".join(chunks)))
+        except Exception as error:
+            print(f"[ERROR] 스트리밍 생성 중 오류 발생: {str(error)}")
+            if self.cassette is not None and self.cassette.recording:
+                self.cassette.record(model_name, prompt, cassette_config, task, time.perf_counter() - started, error=error)
+            self.stats.record(task, model_name, time.perf_counter() - started, error=error)
+            self.router.record(task, model_name, time.perf_counter() - started, success=False)
+            rate_limited = is_rate_limit_error(error)
+            if self.retry_policy.is_retryable(error):
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            raise
+        finally:
+            # 소비자가 중간에 반복을 멈춘 경우에도 키와 슬롯을 반납
+            self.key_pool.release(
+                key_entry,
+                tokens=response_usage(last_response)["total_tokens"] if last_response is not None else None,
+                quota_error=rate_limited
+            )
+            if self.rate_limiter is not None:
+                self.rate_limiter.release(
+                    success=completed,
+                    rate_limited=rate_limited,
+                    estimated_tokens=estimated_tokens,
+                    actual_tokens=estimate_tokens(prompt) + estimate_tokens("".join(chunks))
+                )
+        
+        return usage["finish_reason"]
+    
+    def generate_many(self, prompts, concurrency=8, temperature=1.0, max_output_tokens=16384, task="generate", response_mime_type=None):
+        """
+        여러 프롬프트를 스레드 풀로 동시에 생성
+        
+        Args:
+            prompts: 프롬프트 문자열 리스트
+            concurrency: 동시에 실행할 최대 요청 수
+            temperature: 생성 다양성 (0.0 ~ 2.0, 높을수록 창의적)
+            max_output_tokens: 최대 출력 토큰 수
+            task: 통계 집계용 호출 종류
+            response_mime_type: 응답 형식 (예: "application/json", None이면 일반 텍스트)
+            
+        Returns:
+            입력 순서와 같은 순서의 결과 리스트
+            각 항목은 {"prompt", "text", "error"} 딕셔너리이며,
+            실패한 항목은 text가 None이고 error에 오류 메시지가 담김
+        """
+        prompts = list(prompts)
+        if not prompts:
+            return []
+        
+        def run_one(prompt):
+            try:
+                text = self.generate_content(
+                    prompt,
+                    temperature=temperature,
+                    max_output_tokens=max_output_tokens,
+                    task=task,
+                    response_mime_type=response_mime_type
+                )
+                return {"prompt": prompt, "text": text, "error": None}
+            except Exception as error:
+                # 한 항목의 실패가 전체 배치를 중단시키지 않도록 결과에 기록
+                return {"prompt": prompt, "text": None, "error": str(error)}
+        
+        worker_count = max(1, min(concurrency, len(prompts)))
+        print(f"\n[배치 생성] {len(prompts)}개 요청 (동시 실행: {worker_count})")
+        
+        # executor.map은 완료 순서와 무관하게 입력 순서대로 결과를 돌려줌
+        with ThreadPoolExecutor(max_workers=worker_count) as executor:
+            results = list(executor.map(run_one, prompts))
+        
+        failed = sum(1 for result in results if result["error"] is not None)
+        print(f"[OK] 배치 생성 완료 (성공: {len(results) - failed}개, 실패: {failed}개)")
+        
+        return results
+    
+    def submit_batch(self, prompts, temperature=1.0, max_output_tokens=16384, task="generate", backend=None, display_name=None):
+        """
+        여러 프롬프트를 하나의 비동기 배치 작업으로 제출
+        
+        Args:
+            prompts: 프롬프트 문자열 리스트
+            temperature: 생성 다양성 (0.0 ~ 2.0, 높을수록 창의적)
+            max_output_tokens: 최대 출력 토큰 수
+            task: 모델 선택용 호출 종류
+            backend: 배치 작업 백엔드 (None이면 client.batches, 로컬 대체 시 LocalBatchJobs)
+            display_name: 작업 표시 이름
+            
+        Returns:
+            배치 작업 이름 (wait_batch로 결과 수집)
+        """
+        backend = backend or self.client.batches
+        generation_config = {
+            "temperature": temperature,
+            "max_output_tokens": max_output_tokens,
+        }
+        src = [
+            {"contents": [{"role": "user", "parts": [{"text": prompt}]}], "config": generation_config}
+            for prompt in prompts
+        ]
+        display_name = display_name or f"{task}-{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        
+        job = backend.create(model=self.router.primary(task), src=src, config={"display_name": display_name})
+        print(f"[배치 제출] {len(src)}개 요청 (작업: {job.name})")
+        return job.name
+    
+    def wait_batch(self, job_name, task="generate", poll_interval=30.0, timeout=None, backend=None):
+        """
+        배치 작업이 끝날 때까지 주기적으로 상태를 확인하고 결과 수집
+        
+        Args:
+            job_name: submit_batch가 반환한 작업 이름
+            task: 통계 집계용 호출 종류 (지연 시간이 섞이지 않도록 "<task>_batch"로 기록)
+            poll_interval: 상태 확인 간격(초)
+            timeout: 최대 대기 시간(초, None이면 무제한)
+            backend: submit_batch에 사용한 배치 작업 백엔드
+            
+        Returns:
+            제출 순서와 같은 순서의 {"text", "error"} 딕셔너리 리스트
+        """
+        backend = backend or self.client.batches
+        started = time.monotonic()
+        last_state = None
+        
+        while True:
+            job = backend.get(name=job_name)
+            state = batch_job_state(job)
+            if state != last_state:
+                print(f"[배치 상태] {job_name}: {state} ({time.monotonic() - started:.0f}초 경과)")
+                last_state = state
+            if state in BATCH_DONE_STATES:
+                break
+            if timeout is not None and time.monotonic() - started >= timeout:
+                raise TimeoutError(f"배치 작업 대기 시간 초과: {job_name} ({state})")
+            time.sleep(poll_interval)
+        
+        if state != "JOB_STATE_SUCCEEDED":
+            raise BatchJobFailedError(f"배치 작업 실패: {job_name} ({state}, {getattr(job, 'error', None)})")
+        
+        # 배치 지연 시간은 대기 시간 전체이므로 일반 호출 통계와 분리해 기록
+        elapsed = time.monotonic() - started
+        model_name = self.router.primary(task)
+        results = []
+        for item in job.dest.inlined_responses:
+            try:
+                if getattr(item, "error", None) is not None:
+                    raise Exception(getattr(item.error, "message", None) or str(item.error))
+                text = extract_response_text(item.response)
+                self.stats.record(f"{task}_batch", model_name, elapsed, usage=response_usage(item.response))
+                results.append({"text": text, "error": None})
+            except Exception as error:
+                self.stats.record(f"{task}_batch", model_name, elapsed, error=error)
+                results.append({"text": None, "error": str(error)})
+        
+        failed = sum(1 for result in results if result["error"] is not None)
+        print(f"[OK] 배치 수집 완료 (성공: {len(results) - failed}개, 실패: {failed}개)")
+        return results
+    
+    def run_batch(self, prompts, temperature=1.0, max_output_tokens=16384, task="generate", poll_interval=30.0,
+                  timeout=None, backend=None, job_name=None, on_submit=None):
+        """
+        캐시에 없는 프롬프트만 배치 작업으로 제출하고 완료되면 결과 반환
+        
+        처리량과 비용이 행별 지연 시간보다 중요한 대량 작업(야간 실행 등)에 사용한다.
+        
+        Args:
+            prompts: 프롬프트 문자열 리스트
+            temperature: 생성 다양성 (0.0 ~ 2.0, 높을수록 창의적)
+            max_output_tokens: 최대 출력 토큰 수
+            task: 모델 선택 및 통계 집계용 호출 종류
+            poll_interval: 상태 확인 간격(초)
+            timeout: 최대 대기 시간(초, None이면 무제한)
+            backend: 배치 작업 백엔드 (None이면 client.batches)
+            job_name: 이미 제출한 작업 이름 (지정하면 제출 없이 이어서 대기, 모든 프롬프트가 작업에 포함된 것으로 간주)
+            on_submit: 작업 제출 직후 작업 이름을 받는 콜백 (재실행 시 이어받기용 저장)
+            
+        Returns:
+            입력 순서와 같은 순서의 {"prompt", "text", "error"} 딕셔너리 리스트
+        """
+        prompts = list(prompts)
+        results = [{"prompt": prompt, "text": None, "error": None} for prompt in prompts]
+        if not prompts:
+            return results
+        
+        generation_config = {
+            "temperature": temperature,
+            "max_output_tokens": max_output_tokens,
+        }
+        
+        # 캐시에 있는 항목은 제출하지 않음 (이어받기 시에는 작업 구성이 바뀌지 않도록 건너뜀)
+        pending = []
+        for index, prompt in enumerate(prompts):
+            if job_name is None and self.cache is not None:
+                cached_text = self.cache.get(self.cache.make_key(self.router.primary(task), prompt, generation_config))
+                if cached_text is not None:
+                    results[index]["text"] = cached_text
+                    continue
+            pending.append(index)
+        
+        if not pending:
+            print(f"[캐시 적중] 배치 {len(prompts)}개 모두 저장된 결과 사용")
+            return results
+        
+        if job_name is None:
+            job_name = self.submit_batch(
+                [prompts[index] for index in pending],
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+                task=task,
+                backend=backend
+            )
+            if on_submit is not None:
+                on_submit(job_name)
+        
+        collected = self.wait_batch(job_name, task=task, poll_interval=poll_interval, timeout=timeout, backend=backend)
+        for index, result in zip(pending, collected):
+            results[index].update(result)
+            if self.cache is not None and result["text"]:
+                self.cache.set(self.cache.make_key(self.router.primary(task), prompts[index], generation_config), result["text"])
+        
+        return results
+    
+    def ensure_not_duplicate(self, text, kind="keyword"):
+        """
+        중복 색인에 유사한 항목이 있으면 DuplicateContentError 발생 (색인이 없으면 통과)
+        
+        Args:
+            text: 확인할 키워드 또는 본문
+            kind: "keyword" 또는 "post"
+        """
+        if self.duplicate_index is None:
+            return
+        
+        matches = self.duplicate_index.find_similar(text, kind=kind)
+        if matches:
+            similarity, label = matches[0]
+            kind_name = "키워드" if kind == "keyword" else "본문"
+            raise DuplicateContentError(f"이미 다룬 {kind_name}와 유사합니다 (유사도 {similarity:.2f}): {label}")
+    
+    def remember_post(self, topic, post):
+        """
+        발행한 키워드와 본문을 중복 색인에 등록 (색인이 없으면 무시)
+        
+        생성 직후가 아니라 호출하는 쪽에서 발행(저장)이 성공한 뒤에 호출한다.
+        발행 전에 등록하면 발행에 실패한 키워드가 다음 실행에서 중복으로 걸러진다.
+        """
+        if self.duplicate_index is None:
+            return
+        
+        self.duplicate_index.add(topic, kind="keyword")
+        self.duplicate_index.add(post, kind="post", label=topic)
+    
+    def repair_blog_post(self, topic, blog_post, style="친근하고 정보적인", validation=None, expected_faq=5, concurrency=8):
+        """
+        구조 검증에 실패한 블로그 글에서 빠졌거나 잘린 구역만 다시 생성해 채움
+        
+        목차, 작성 기준일, 마지막 안내 문구는 로컬에서 다시 만들고, 제목/도입부/추천 대상/요약,
+        소제목별 본문, FAQ, 마무리/참고 사이트는 필요한 것만 동시에 요청한다.
+        정상인 구역은 원문 그대로 유지한다.
+        
+        Args:
+            topic: 블로그 글 주제
+            blog_post: "제목: ..." 줄로 시작하는 블로그 글
+            style: 글 스타일
+            validation: validate_blog_post 결과 (None이면 새로 검사)
+            expected_faq: 필요한 FAQ 질문 수
+            concurrency: 구역 동시 생성 수
+            
+        Returns:
+            보완된 블로그 글 (본문 소제목을 하나도 찾을 수 없으면 ValueError 발생)
+        """
+        validation = validation or validate_blog_post(blog_post, expected_faq=expected_faq)
+        if validation["valid"]:
+            return blog_post
+        
+        missing = set(validation["missing"])
+        if "sections" in missing:
+            raise ValueError("본문 소제목을 찾을 수 없어 부분 재생성할 수 없습니다")
+        
+        blocks = split_blog_post_blocks(blog_post)
+        numbers = sorted(validation["headings"])
+        head_lines = [line for line in blocks["head"].splitlines() if line.strip()]
+        title_line = next((line.strip() for line in head_lines if line.strip().startswith("제목:")), "")
+        outline = {
+            "title": title_line[len("제목:"):].strip() or topic,
+            "headings": [validation["headings"][number] for number in numbers],
+        }
+        
+        # 다시 만들 구역별 프롬프트 (소제목은 빈 번호를 건너뛰고 1부터 다시 매김)
+        requests = {}
+        if missing & {"title", "intro", "recommend", "summary"}:
+            requests["header"] = build_header_parts_prompt(topic, outline, style=style)
+        for position, number in enumerate(numbers, 1):
+            if f"section{number}" in missing:
+                requests[f"section{number}"] = build_section_prompt(topic, outline, position, style=style)
+        if "faq" in missing:
+            requests["faq"] = build_faq_prompt(topic, outline, style=style)
+        if missing & {"links", "closing"}:
+            requests["closing"] = build_closing_prompt(topic, outline, style=style)
+        
+        print(f"\n[부분 재생성] {', '.join(validation['problems'])} → {len(requests)}개 구역 요청")
+        parts = {}
+        if requests:
+            results = self.generate_many(
+                list(requests.values()),
+                concurrency=concurrency,
+                max_output_tokens=4096,
+                task="blog_section",
+                response_mime_type="application/json"
+            )
+            for name, result in zip(requests, results):
+                if result["error"] is not None:
+                    raise Exception(f"부분 재생성 실패 ({name}): {result['error']}")
+                parts[name] = parse_json_response(result["text"])
+        header = parts.get("header", {})
+        
+        # 제목/기준일/도입부
+        head_rest = [line for line in head_lines if not line.strip().startswith("제목:")]
+        date_lines = [line for line in head_rest if DATE_DISCLAIMER_MARKER in line]
+        intro_lines = [line for line in head_rest if DATE_DISCLAIMER_MARKER not in line]
+        rebuilt = [f"제목: {str(header.get('title') or outline['title']).strip()}" if "title" in missing else title_line]
+        rebuilt += date_lines
+        rebuilt.append(render_intro_html(header.get("intro")) if "intro" in missing else "\n".join(intro_lines))
+        
+        rebuilt.append(render_recommend_html(header.get("recommend")) if "recommend" in missing else blocks["recommend"])
+        rebuilt.append(render_toc_html(outline["headings"]) if "toc" in missing else blocks["toc"])
+        rebuilt.append(render_summary_html(header.get("summary")) if "summary" in missing else blocks["summary"])
+        
+        for position, number in enumerate(numbers, 1):
+            if f"section{number}" in missing:
+                paragraphs = parts[f"section{number}"].get("paragraphs")
+                rebuilt.append(render_section_html(position, validation["headings"][number], paragraphs))
+            else:
+                rebuilt.append(re.sub(rf"([\"'])section{number}\1", f'"section{position}"', blocks["sections"][number], count=1))
+        
+        rebuilt.append(render_faq_html(parts["faq"].get("faq")) if "faq" in missing else blocks["faq"])
+        closing_part = parts.get("closing", {})
+        rebuilt.append(render_links_html(closing_part.get("links")) if "links" in missing else blocks["links"])
+        rebuilt.append(render_closing_html(closing_part.get("closing")) if "closing" in missing else blocks["closing"])
+        rebuilt.append(render_disclaimer_html() if "disclaimer" in missing else blocks["disclaimer"])
+        
+        repaired = "\n\n".join(part.strip() for part in rebuilt if part and part.strip())
+        if "date" in missing:
+            repaired = insert_date_disclaimer(repaired)
+        
+        remaining = validate_blog_post(repaired, expected_faq=expected_faq, require_date="date" in missing or bool(date_lines))
+        if not remaining["valid"]:
+            print(f"[경고] 보완 후에도 남은 문제: {', '.join(remaining['problems'])}")
+        return repaired
+    
+    def generate_blog_post(self, topic, style="친근하고 정보적인", word_count=1000, output_format="html", allow_duplicate=False,
+                           validate=True, candidates=1):
+        """
+        블로그 글 생성
+        
+        Args:
+            topic: 블로그 글 주제
+            style: 글 스타일
+            word_count: 목표 단어 수
+            output_format: "html"이면 모델이 서식까지 포함한 HTML을 작성,
+                           "json"이면 모델은 내용만 JSON으로 반환하고 HTML은 로컬에서 렌더링
+                           (출력 토큰과 생성 시간 절감)
+            allow_duplicate: True면 중복 색인 확인을 건너뜀 (발행 실패 후 같은 키워드로 재시도 등)
+            validate: True면 HTML 구조를 검사하고 빠졌거나 잘린 구역만 다시 생성해 채움
+            candidates: 2 이상이면 한 번의 요청으로 후보를 여러 개 받아 score_blog_post 점수가 가장 높은 글 사용
+            
+        Returns:
+            생성된 블로그 글 (중복 색인 등록은 발행 후 remember_post로)
+        """
+        # 이미 다룬 키워드면 생성 비용을 쓰기 전에 중단
+        if not allow_duplicate:
+            self.ensure_not_duplicate(topic, kind="keyword")
+        
+        # 프롬프트는 목표 길이와 함께 최소 길이도 요구하므로 점수와 토큰 예산은 둘 중 큰 값 기준
+        target_chars = blog_post_target_chars(word_count)
+        
+        if output_format == "json":
+            prompt = build_blog_post_json_prompt(topic, style=style, word_count=word_count)
+            if candidates > 1:
+                texts = self.generate_candidates(
+                    prompt,
+                    candidate_count=candidates,
+                    task="blog_post_json",
+                    response_mime_type="application/json",
+                    target_chars=target_chars
+                )
+                posts = []
+                for text in texts:
+                    try:
+                        posts.append(render_blog_post_html(parse_json_response(text)))
+                    except Exception as error:
+                        print(f"[경고] JSON 후보 해석 실패 (제외): {str(error)[:100]}")
+                if not posts:
+                    raise Exception("해석 가능한 JSON 후보가 없습니다")
+                blog_post = self.pick_best_post(posts, word_count=target_chars)
+            else:
+                result_text = self.generate_content(
+                    prompt,
+                    task="blog_post_json",
+                    response_mime_type="application/json",
+                    target_chars=target_chars
+                )
+                blog_post = render_blog_post_html(parse_json_response(result_text))
+        else:
+            prompt = build_blog_post_prompt(topic, style=style, word_count=word_count)
+            
+            if candidates > 1:
+                texts = self.generate_candidates(prompt, candidate_count=candidates, task="blog_post_html", target_chars=target_chars)
+                result_text = self.pick_best_post(texts, word_count=target_chars)
+            else:
+                result_text = self.generate_content(prompt, task="blog_post_html", target_chars=target_chars)
+            
+            # 잘렸거나 구조가 빠진 글은 전체를 다시 만들지 않고 해당 구역만 보완
+            # (단일 생성이면 캐시도 보완본으로 교체, 후보 목록 캐시는 그대로 두고 다음에도 같은 후보를 골라 보완)
+            if validate:
+                validation = validate_blog_post(result_text, require_date=False)
+                if not validation["valid"]:
+                    result_text = self.repair_blog_post(topic, result_text, style=style, validation=validation)
+                    if candidates <= 1:
+                        self.replace_cached(prompt, result_text, task="blog_post_html")
+            
+            # 날짜는 프롬프트에서 제외하고 생성 후 삽입 (날짜가 바뀌어도 캐시 재사용 가능)
+            blog_post = insert_date_disclaimer(result_text)
+        
+        # 다른 키워드였어도 본문이 기존 글과 거의 같으면 발행하지 않도록 중단
+        if not allow_duplicate:
+            self.ensure_not_duplicate(blog_post, kind="post")
+        
+        return blog_post
+    
+    @staticmethod
+    def pick_best_post(posts, word_count=BLOG_POST_MIN_CHARS):
+        """
+        블로그 글 후보 중 score_blog_post 점수가 가장 높은 글 선택 (같으면 먼저 온 후보)
+        
+        Args:
+            posts: 블로그 글 후보 리스트
+            word_count: 프롬프트가 요구하는 목표 길이(자, blog_post_target_chars 참고)
+            
+        Returns:
+            선택된 블로그 글
+        """
+        scores = [score_blog_post(post, word_count=word_count) for post in posts]
+        best = max(range(len(posts)), key=lambda index: scores[index]["score"])
+        for index, score in enumerate(scores):
+            mark = "✓" if index == best else " "
+            print(f"  {mark} 후보 {index + 1}: 점수 {score['score']:.3f} (길이 {score['length']}자, "
+                  f"구조 문제 {len(score['problems'])}개, 마크다운 {score['markdown']}개)")
+        return posts[best]
+    
+    def generate_blog_post_outlined(self, topic, style="친근하고 정보적인", word_count=1000, concurrency=8, allow_duplicate=False):
+        """
+        개요 → 섹션 병렬 생성 방식의 블로그 글 생성
+        
+        짧은 개요(제목, 도입부, 소제목 5-7개)를 먼저 받은 뒤 각 소제목 본문, FAQ, 마무리를
+        동시에 요청하고 로컬에서 조립한다. 전체 지연 시간이 가장 긴 섹션 하나 수준으로 줄어든다.
+        
+        Args:
+            topic: 블로그 글 주제
+            style: 글 스타일
+            word_count: 목표 단어 수 (소제목당 문단 수 결정에 사용)
+            concurrency: 섹션 동시 생성 수
+            allow_duplicate: True면 중복 색인 확인을 건너뜀
+            
+        Returns:
+            생성된 블로그 글 (generate_blog_post와 같은 형식, 중복 색인 등록은 발행 후 remember_post로)
+        """
+        if not allow_duplicate:
+            self.ensure_not_duplicate(topic, kind="keyword")
+        
+        # 1. 개요 생성
+        outline = parse_json_response(self.generate_content(
+            build_outline_prompt(topic, style=style),
+            max_output_tokens=2048,
+            task="blog_outline",
+            response_mime_type="application/json"
+        ))
+        headings = [str(heading).strip() for heading in outline.get("headings") or [] if str(heading).strip()]
+        if not headings:
+            raise ValueError("개요에 소제목이 없습니다")
+        outline["headings"] = headings[:7]
+        print(f"[개요] 제목: {outline.get('title', '')} / 소제목 {len(outline['headings'])}개")
+        
+        # 2. 소제목 본문, FAQ, 마무리를 동시에 생성
+        paragraph_count = max(2, min(4, word_count // (len(outline["headings"]) * 150)))
+        prompts = [
+            build_section_prompt(topic, outline, index, style=style, paragraph_count=paragraph_count)
+            for index in range(1, len(outline["headings"]) + 1)
+        ]
+        prompts.append(build_faq_prompt(topic, outline, style=style))
+        prompts.append(build_closing_prompt(topic, outline, style=style))
+        
+        results = self.generate_many(
+            prompts,
+            concurrency=concurrency,
+            max_output_tokens=4096,
+            task="blog_section",
+            response_mime_type="application/json"
+        )
+        
+        failed = [index for index, result in enumerate(results) if result["error"] is not None]
+        if failed:
+            raise Exception(f"섹션 생성 실패 ({len(failed)}개): {results[failed[0]]['error']}")
+        
+        parsed = [parse_json_response(result["text"]) for result in results]
+        section_parts, faq_part, closing_part = parsed[:-2], parsed[-2], parsed[-1]
+        
+        # 3. 조립 및 렌더링
+        data = {
+            "title": outline.get("title"),
+            "intro": outline.get("intro"),
+            "recommend": outline.get("recommend"),
+            "summary": outline.get("summary"),
+            "sections": [
+                {"heading": heading, "paragraphs": part.get("paragraphs") or []}
+                for heading, part in zip(outline["headings"], section_parts)
+            ],
+            "faq": faq_part.get("faq"),
+            "links": closing_part.get("links"),
+            "closing": closing_part.get("closing"),
+        }
+        blog_post = render_blog_post_html(data)
+        if not allow_duplicate:
+            self.ensure_not_duplicate(blog_post, kind="post")
+        
+        return blog_post
+    
+    def generate_blog_post_stream(self, topic, style="친근하고 정보적인", word_count=1000, on_chunk=None):
+        """
+        블로그 글 생성 (스트리밍)
+        
+        제목 줄이 완성되면 바로 작성 기준일 안내 문구를 붙여 내보내고,
+        이후 본문은 생성되는 대로 전달한다.
+        
+        Args:
+            topic: 블로그 글 주제
+            style: 글 스타일
+            word_count: 목표 단어 수
+            on_chunk: 조각이 도착할 때마다 호출할 함수 on_chunk(chunk_text)
+            
+        Yields:
+            생성된 블로그 글 조각
+        """
+        prompt = build_blog_post_prompt(topic, style=style, word_count=word_count)
+        
+        buffer = ""
+        title_done = False
+        for chunk in self.generate_content_stream(prompt, task="blog_post_html"):
+            if not title_done:
+                buffer += chunk
+                # 첫 번째 비어있지 않은 줄(제목 줄)이 끝날 때까지 모아둠
+                head_start = len(buffer) - len(buffer.lstrip())
+                newline_index = buffer.find('\n', head_start)
+                if newline_index == -1:
+                    continue
+                chunk = insert_date_disclaimer(buffer[:newline_index]) + buffer[newline_index:]
+                title_done = True
+            
+            if on_chunk:
+                on_chunk(chunk)
+            yield chunk
+        
+        # 줄바꿈 없이 끝난 경우
+        if not title_done and buffer:
+            chunk = insert_date_disclaimer(buffer)
+            if on_chunk:
+                on_chunk(chunk)
+            yield chunk
+    
+    def summarize_text(self, text, max_sentences=5, chunk_chars=SUMMARY_CHUNK_CHARS, concurrency=8):
+        """
+        텍스트 요약
+        
+        chunk_chars보다 긴 텍스트는 문단 단위 조각으로 나눠 동시에 부분 요약한 뒤(map)
+        부분 요약들을 합쳐 최종 요약을 만든다(reduce).
+        
+        Args:
+            text: 요약할 텍스트
+            max_sentences: 최대 문장 수
+            chunk_chars: 한 번의 요청에 넣을 최대 글자 수
+            concurrency: 부분 요약을 동시에 실행할 최대 요청 수
+            
+        Returns:
+            요약된 텍스트
+        """
+        if len(text) <= chunk_chars:
+            prompt = build_summarize_prompt(text, max_sentences=max_sentences)
+            return self.generate_content(prompt, temperature=0.3, task="summarize")
+        
+        chunks = split_into_chunks(text, max_chars=chunk_chars)
+        print(f"\n[분할 요약] {len(text)}자 → {len(chunks)}개 조각")
+        
+        results = self.generate_many(
+            [build_chunk_summary_prompt(chunk, index, len(chunks)) for index, chunk in enumerate(chunks)],
+            concurrency=concurrency,
+            temperature=0.3,
+            task="summarize"
+        )
+        failed = [result["error"] for result in results if result["error"] is not None]
+        if failed:
+            # 일부 조각이 빠진 요약은 원문을 왜곡하므로 실패로 처리
+            raise Exception(f"부분 요약 실패 ({len(failed)}/{len(chunks)}개): {failed[0]}")
+        
+        summaries = [result["text"] for result in results]
+        reduce_prompt = build_reduce_summary_prompt(summaries, max_sentences=max_sentences)
+        if len(reduce_prompt) > chunk_chars:
+            # 부분 요약을 합쳐도 너무 길면 한 단계 더 요약
+            return self.summarize_text(
+                "\n\n".join(summaries),
+                max_sentences=max_sentences,
+                chunk_chars=chunk_chars,
+                concurrency=concurrency
+            )
+        
+        return self.generate_content(reduce_prompt, temperature=0.3, task="summarize")
+    
+    def translate_text(self, text, target_language="한국어"):
+        """
+        텍스트 번역
+        
+        Args:
+            text: 번역할 텍스트
+            target_language: 목표 언어
+            
+        Returns:
+            번역된 텍스트
+        """
+        prompt = build_translate_prompt(text, target_language=target_language)
+        
+        return self.generate_content(prompt, temperature=0.3, task="translate")
+    
+    def translate_many(self, texts, target_languages=("English",), batch_chars=4000, concurrency=8):
+        """
+        여러 텍스트를 여러 언어로 묶음 번역
+        
+        짧은 텍스트를 구분자로 묶어 한 요청에 여러 개씩 번역하고, 목표 언어별 요청을 동시에 보낸다.
+        결과는 (텍스트 해시, 언어) 단위로 캐시에 저장되어 같은 문단은 다시 번역하지 않는다.
+        
+        Args:
+            texts: 번역할 텍스트 리스트 (문단 등)
+            target_languages: 목표 언어 리스트
+            batch_chars: 한 요청에 묶을 원문 최대 글자 수
+            concurrency: 동시에 실행할 최대 요청 수
+            
+        Returns:
+            {목표 언어: 입력 순서와 같은 순서의 번역 리스트} 딕셔너리
+            (번역에 실패한 항목은 None)
+        """
+        texts = list(texts)
+        model_name = self.router.primary("translate")
+        
+        def segment_key(text, language):
+            return self.cache.make_key(model_name, text, {"translate_to": language})
+        
+        translations = {language: {} for language in target_languages}
+        jobs = []
+        for language in target_languages:
+            # 캐시에 없는 고유 텍스트만 글자 수 기준으로 묶음
+            batch = []
+            batch_size = 0
+            for text in dict.fromkeys(text for text in texts if text and text.strip()):
+                if self.cache is not None:
+                    cached_text = self.cache.get(segment_key(text, language))
+                    if cached_text is not None:
+                        translations[language][text] = cached_text
+                        continue
+                if batch and batch_size + len(text) > batch_chars:
+                    jobs.append((language, batch))
+                    batch = []
+                    batch_size = 0
+                batch.append(text)
+                batch_size += len(text)
+            if batch:
+                jobs.append((language, batch))
+        
+        if jobs:
+            print(f"\n[묶음 번역] {len(texts)}개 텍스트 × {len(target_languages)}개 언어 → {len(jobs)}개 요청")
+            results = self.generate_many(
+                [build_batch_translate_prompt(batch, target_language=language) for language, batch in jobs],
+                concurrency=concurrency,
+                temperature=0.3,
+                task="translate"
+            )
+            
+            retries = []
+            for (language, batch), result in zip(jobs, results):
+                parsed = parse_batch_translation(result["text"], len(batch)) if result["error"] is None else [None] * len(batch)
+                for text, translated in zip(batch, parsed):
+                    if translated is None:
+                        retries.append((language, text))
+                        continue
+                    translations[language][text] = translated
+                    if self.cache is not None:
+                        self.cache.set(segment_key(text, language), translated)
+            
+            # 구분자가 깨졌거나 요청이 실패한 항목만 개별 번역으로 보완 (translate_text와 같은 프롬프트/설정으로 동시에)
+            if retries:
+                print(f"[묶음 번역] {len(retries)}개 항목 개별 번역으로 보완")
+                results = self.generate_many(
+                    [build_translate_prompt(text, target_language=language) for language, text in retries],
+                    concurrency=concurrency,
+                    temperature=0.3,
+                    task="translate"
+                )
+                for (language, text), result in zip(retries, results):
+                    if result["error"] is not None:
+                        print(f"[ERROR] 번역 실패 ({language}): {result['error']}")
+                        continue
+                    translations[language][text] = result["text"]
+                    if self.cache is not None:
+                        self.cache.set(segment_key(text, language), result["text"])
+        
+        return {
+            language: [translations[language].get(text) if text and text.strip() else text for text in texts]
+            for language in target_languages
+        }
+    
+    def improve_writing(self, text):
+        """
+        글쓰기 개선
+        
+        Args:
+            text: 개선할 텍스트
+            
+        Returns:
+            개선된 텍스트
+        """
+        prompt = build_improve_writing_prompt(text)
+        
+        return self.generate_content(prompt, temperature=0.5, task="improve")
+
+
+
+def _warn_ignored_options(gemini, options):
+    """공유 인스턴스와 다른 생성 인자가 넘어오면 적용되지 않는다고 경고"""
+    current_values = {"key_cooldown_seconds": gemini.key_pool.cooldown_seconds}
+    ignored = []
+    for name, value in options.items():
+        if value is None:
+            continue
+        current = current_values[name] if name in current_values else getattr(gemini, name, None)
+        if current is not value and current != value:
+            ignored.append(name)
+    if ignored:
+        print(f"[경고] 이미 만든 Gemini API 인스턴스를 재사용하므로 다음 인자는 적용되지 않습니다: {', '.join(ignored)}")
+
+
+def get_gemini_api(api_key=None, api_keys=None, warm_up=False, **options):
+    """
+    키 조합별로 하나만 만들어 재사용하는 GeminiAPI 반환 (스레드 안전)
+    
+    Args:
+        api_key: Gemini API 키
+        api_keys: API 키 리스트 (지정하면 api_key보다 우선)
+        warm_up: 처음 만들 때 백그라운드로 연결을 미리 맺을지 여부
+        **options: GeminiAPI 생성 인자 (cache, rate_limiter 등) - 처음 만들 때만 적용되며,
+                   이미 만든 인스턴스와 다른 객체를 넘기면 무시된다는 경고를 출력
+                   (같은 객체를 계속 넘기도록 호출하는 쪽에서 한 번만 만들어 재사용할 것)
+        
+    Returns:
+        공유 GeminiAPI 인스턴스
+    """
+    keys = api_keys or ([api_key] if api_key else ApiKeyPool.keys_from_env())
+    registry_key = tuple(sorted(key.strip() for key in keys if key and key.strip()))
+    
+    with _registry_lock:
+        gemini = _api_registry.get(registry_key)
+    if gemini is not None:
+        _warn_ignored_options(gemini, options)
+        return gemini
+    
+    gemini = GeminiAPI(api_keys=list(registry_key), **options)
+    with _registry_lock:
+        # 동시에 만든 경우 먼저 등록된 인스턴스를 사용
+        gemini = _api_registry.setdefault(registry_key, gemini)
+    
+    if warm_up:
+        gemini.warm_up(background=True)
+    return gemini
+
+
+class AsyncGeminiAPI:
+    """google-genai 클라이언트의 비동기(aio) 인터페이스를 사용하는 Gemini API 클래스"""
+    
+    def __init__(self, api_key=None):
+        """
+        비동기 Gemini API 클라이언트 초기화
+        
+        Args:
+            api_key: Gemini API 키 (None이면 환경변수에서 가져옴)
+        """
+        api_key = api_key or os.environ.get('GEMINI_API_KEY')
+        if not api_key:
+            raise ValueError("API 키가 제공되지 않았습니다. api_key 매개변수나 GEMINI_API_KEY 환경변수를 설정해주세요.")
+        
+        # 클라이언트 초기화
+        try:
+            self.client = get_client(api_key)
+            self.model_name = DEFAULT_MODEL
+            print(f"[OK] 비동기 Gemini API 클라이언트 초기화 완료 (모델: {self.model_name})")
+        except Exception as error:
+            raise Exception(f"Gemini API 초기화 실패: {str(error)}")
+    
+    async def generate_content(self, prompt, temperature=1.0, max_output_tokens=16384):
+        """
+        텍스트 생성 요청 (비동기)
+        
+        Args:
+            prompt: 생성할 텍스트의 프롬프트
+            temperature: 생성 다양성 (0.0 ~ 2.0, 높을수록 창의적)
+            max_output_tokens: 최대 출력 토큰 수
+            
+        Returns:
+            생성된 텍스트 문자열
+        """
+        try:
+            print(f"\n[비동기 생성 요청] 프롬프트: {prompt[:100]}...")
+            
+            # 생성 설정
+            generation_config = {
+                "temperature": temperature,
+                "max_output_tokens": max_output_tokens,
+            }
+            
+            # API 호출 (이벤트 루프를 막지 않음)
+            response = await self.client.aio.models.generate_content(
+                model=self.model_name,
+                contents=prompt,
+                config=generation_config
+            )
+            
+            # 응답 텍스트 추출
+            result_text = response.text
+            print(f"[OK] 생성 완료 (길이: {len(result_text)}자)")
+            
+            return result_text
+            
+        except Exception as error:
+            print(f"[ERROR] 텍스트 생성 중 오류 발생: {str(error)}")
+            raise
+    
+    async def generate_many(self, prompts, concurrency=32, temperature=1.0, max_output_tokens=16384):
+        """
+        여러 프롬프트를 하나의 이벤트 루프에서 동시에 생성
+        
+        Args:
+            prompts: 프롬프트 문자열 리스트
+            concurrency: 동시에 진행할 최대 요청 수
+            temperature: 생성 다양성 (0.0 ~ 2.0, 높을수록 창의적)
+            max_output_tokens: 최대 출력 토큰 수
+            
+        Returns:
+            입력 순서와 같은 순서의 {"prompt", "text", "error"} 딕셔너리 리스트
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def run_one(prompt):
+            async with semaphore:
+                try:
+                    text = await self.generate_content(
+                        prompt,
+                        temperature=temperature,
+                        max_output_tokens=max_output_tokens
+                    )
+                    return {"prompt": prompt, "text": text, "error": None}
+                except Exception as error:
+                    return {"prompt": prompt, "text": None, "error": str(error)}
+        
+        return await asyncio.gather(*(run_one(prompt) for prompt in prompts))
+    
+    async def generate_blog_post(self, topic, style="친근하고 정보적인", word_count=1000):
+        """
+        블로그 글 생성 (비동기)
+        
+        Args:
+            topic: 블로그 글 주제
+            style: 글 스타일
+            word_count: 목표 단어 수
+            
+        Returns:
+            생성된 블로그 글
+        """
+        prompt = build_blog_post_prompt(topic, style=style, word_count=word_count)
+        
+        return insert_date_disclaimer(await self.generate_content(prompt))
+    
+    async def summarize_text(self, text, max_sentences=5, chunk_chars=SUMMARY_CHUNK_CHARS, concurrency=8):
+        """
+        텍스트 요약 (비동기, 긴 텍스트는 조각별 동시 요약 후 합침)
+        
+        Args:
+            text: 요약할 텍스트
+            max_sentences: 최대 문장 수
+            chunk_chars: 한 번의 요청에 넣을 최대 글자 수
+            concurrency: 부분 요약을 동시에 실행할 최대 요청 수
+            
+        Returns:
+            요약된 텍스트
+        """
+        if len(text) <= chunk_chars:
+            prompt = build_summarize_prompt(text, max_sentences=max_sentences)
+            return await self.generate_content(prompt, temperature=0.3)
+        
+        chunks = split_into_chunks(text, max_chars=chunk_chars)
+        print(f"\n[분할 요약] {len(text)}자 → {len(chunks)}개 조각")
+        
+        results = await self.generate_many(
+            [build_chunk_summary_prompt(chunk, index, len(chunks)) for index, chunk in enumerate(chunks)],
+            concurrency=concurrency,
+            temperature=0.3
+        )
+        failed = [result["error"] for result in results if result["error"] is not None]
+        if failed:
+            raise Exception(f"부분 요약 실패 ({len(failed)}/{len(chunks)}개): {failed[0]}")
+        
+        summaries = [result["text"] for result in results]
+        reduce_prompt = build_reduce_summary_prompt(summaries, max_sentences=max_sentences)
+        if len(reduce_prompt) > chunk_chars:
+            return await self.summarize_text(
+                "\n\n".join(summaries),
+                max_sentences=max_sentences,
+                chunk_chars=chunk_chars,
+                concurrency=concurrency
+            )
+        
+        return await self.generate_content(reduce_prompt, temperature=0.3)
+    
+    async def translate_text(self, text, target_language="한국어"):
+        """
+        텍스트 번역 (비동기)
+        
+        Args:
+            text: 번역할 텍스트
+            target_language: 목표 언어
+            
+        Returns:
+            번역된 텍스트
+        """
+        prompt = build_translate_prompt(text, target_language=target_language)
+        
+        return await self.generate_content(prompt, temperature=0.3)
+    
+    async def improve_writing(self, text):
+        """
+        글쓰기 개선 (비동기)
+        
+        Args:
+            text: 개선할 텍스트
+            
+        Returns:
+            개선된 텍스트
+        """
+        prompt = build_improve_writing_prompt(text)
+        
+        return await self.generate_content(prompt, temperature=0.5)
+
 # 사용 예시
 def main():
     """메인 실행 함수"""
@@ -1,32 +1,60 @@
 # -*- coding: utf-8 -*-
 import os
 import sys
+import json
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from openpyxl import load_workbook
 
 # Windows 콘솔 인코딩 설정
 if sys.platform == "win32":
     sys.stdout.reconfigure(encoding='utf-8')
 
-from google import genai
+from gemini import (BatchJobFailedError, DuplicateIndex, HedgingPolicy, LocalBatchJobs, PLAIN_POST_TARGET_CHARS, RateLimiter,
+                    ResponseCache, TokenBudget, build_plain_post_prompt, get_gemini_api)
 
 
 class BlogContentGenerator:
     """블로그 본문을 자동으로 생성하는 클래스"""
     
-    def __init__(self, api_key):
+    def __init__(self, api_key, cache=None, token_budget=None, rate_limiter=None):
         """
-        Gemini API 클라이언트 초기화
+        Gemini API 클라이언트 초기화 (프로세스 공용 클라이언트 재사용)
         
         Args:
             api_key: Gemini API 키
+            cache: 생성 결과를 재사용할 ResponseCache (None이면 캐시 사용 안 함)
+            token_budget: 목표 길이로 출력 토큰 예산을 정할 TokenBudget (None이면 항상 최대값 요청)
+            rate_limiter: 요청 속도/동시 실행 수를 조절할 RateLimiter (None이면 제한 없음)
         """
         try:
-            self.client = genai.Client(api_key=api_key)
-            self.model_name = "gemini-2.0-flash-exp"
+            # 재시도, 캐시, 통계는 공용 GeminiAPI가 처리
+            # 대량 생성은 몇몇 느린 호출이 전체 완료 시간을 좌우하므로 p95를 넘기면 헤지 요청
+            self.gemini = get_gemini_api(
+                api_key,
+                cache=cache,
+                hedging_policy=HedgingPolicy(),
+                token_budget=token_budget,
+                rate_limiter=rate_limiter
+            )
+            self.stats = self.gemini.stats
+            self.model_name = self.gemini.model_name
             print(f"[OK] Gemini API 클라이언트 초기화 완료 (모델: {self.model_name})")
         except Exception as error:
             raise Exception(f"Gemini API 초기화 실패: {str(error)}")
     
+    def build_prompt(self, title):
+        """
+        블로그 제목으로 서론-본론-결론 구조의 본문 작성 프롬프트 생성
+        
+        Args:
+            title: 블로그 제목
+            
+        Returns:
+            프롬프트 문자열
+        """
+        return build_plain_post_prompt(title)
+    
     def generate_blog_content(self, title):
         """
         블로그 제목을 입력받아 서론-본론-결론 구조의 본문 생성
@@ -37,57 +65,120 @@ class BlogContentGenerator:
         Returns:
             생성된 블로그 본문 텍스트
         """
-        prompt = f"""
-다음 제목으로 블로그 본문을 작성해주세요:
-
-제목: {title}
-
-요구사항:
-1. 서론-본론-결론의 3단 구조로 작성할 것
-2. 서론: 주제를 소개하고 독자의 관심을 끌 것
-3. 본론: 핵심 내용을 구체적이고 상세하게 설명할 것 (2-3개의 소주제 포함)
-4. 결론: 내용을 요약하고 행동을 유도할 것
-5. 읽기 쉽고 자연스러운 한국어로 작성할 것
-6. 실용적인 정보와 구체적인 예시를 포함할 것
-7. 약 800-1200자 분량으로 작성할 것
-8. 마크다운 문법을 사용하지 말고 순수 텍스트로만 작성할 것
-
-블로그 본문을 작성해주세요:
-"""
+        prompt = self.build_prompt(title)
         
         try:
-            # 생성 설정
-            generation_config = {
-                "temperature": 1.0,
-                "max_output_tokens": 8192,
-            }
-            
-            # API 호출
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config=generation_config
+            return self.gemini.generate_content(
+                prompt,
+                temperature=1.0,
+                max_output_tokens=8192,
+                task="blog_post_plain",
+                target_chars=PLAIN_POST_TARGET_CHARS
             )
             
-            # 응답 텍스트 추출
-            result_text = response.text
-            return result_text
-            
         except Exception as error:
             raise Exception(f"블로그 본문 생성 실패: {str(error)}")
 
 
-def process_blog_titles(excel_file_path, api_key):
+def generate_rows_batch(generator, pending_rows, job_file_path, batch_mode="remote", poll_interval=30.0):
+    """
+    처리할 행 전체를 하나의 배치 작업으로 제출하고 완료되면 결과 반환
+    
+    제출한 작업 이름과 행별 (행 번호, 제목)은 job_file_path에 저장되어, 대기 중 중단되더라도
+    다시 실행하면 새로 제출하지 않고 같은 작업의 결과를 이어서 수집한다. 이어받은 결과는
+    제출 후 제목이 바뀌었거나 본문이 채워진 행(이번 실행의 처리 대상에 없는 행)에는 쓰지 않는다.
+    작업이 실패/취소/만료로 끝나면 저장한 정보를 지워 다음 실행에서 새로 제출한다.
+    
+    Args:
+        generator: BlogContentGenerator 인스턴스
+        pending_rows: 이번 실행에서 처리할 (행 번호, 제목) 리스트
+        job_file_path: 제출한 작업 정보를 저장할 파일 경로
+        batch_mode: "remote"면 Gemini 배치 API, "local"이면 로컬 대체 배치 서버 사용
+        poll_interval: 작업 상태 확인 간격(초)
+        
+    Returns:
+        (행 번호, 본문, 오류) 튜플 리스트
+    """
+    backend = LocalBatchJobs(generator.gemini.client) if batch_mode == "local" else None
+    job_name = None
+    current_titles = {row_index: str(title) for row_index, title in pending_rows}
+    
+    # 이전 실행에서 제출한 작업이 있으면 이어서 수집 (로컬 작업은 프로세스와 함께 사라지므로 제외)
+    if batch_mode == "remote" and os.path.exists(job_file_path):
+        with open(job_file_path, "r", encoding="utf-8") as job_file:
+            saved_job = json.load(job_file)
+        job_name = saved_job["job_name"]
+        pending_rows = [tuple(row_item) for row_item in saved_job["rows"]]
+        print(f"[이어받기] 제출된 배치 작업 {job_name} ({len(pending_rows)}개 행)")
+    
+    def save_job(submitted_job_name):
+        if batch_mode != "remote":
+            return
+        with open(job_file_path, "w", encoding="utf-8") as job_file:
+            json.dump({"job_name": submitted_job_name, "rows": pending_rows}, job_file, ensure_ascii=False)
+    
+    try:
+        results = generator.gemini.run_batch(
+            [generator.build_prompt(title) for _, title in pending_rows],
+            temperature=1.0,
+            max_output_tokens=8192,
+            task="blog_post_plain",
+            poll_interval=poll_interval,
+            backend=backend,
+            job_name=job_name,
+            on_submit=save_job
+        )
+    except BatchJobFailedError:
+        # 끝난 작업은 다시 기다려도 결과가 없으므로 이어받지 않도록 삭제 (대기 시간 초과는 진행 중이므로 유지)
+        if os.path.exists(job_file_path):
+            os.remove(job_file_path)
+            print(f"[안내] 실패한 배치 작업 정보를 삭제했습니다. 다시 실행하면 새 작업으로 제출합니다.")
+        raise
+    
+    # 결과를 모두 받았으므로 작업 정보 삭제 (캐시를 쓰면 재실행 시에도 결과 재사용)
+    if os.path.exists(job_file_path):
+        os.remove(job_file_path)
+    
+    outcomes = []
+    for (row_index, title), result in zip(pending_rows, results):
+        # 이어받은 작업은 제출 당시의 행 기준이므로 그 사이 바뀐 행에는 결과를 쓰지 않음
+        if current_titles.get(row_index) != str(title):
+            print(f"[건너뛰기] {row_index}행: 배치 제출 후 제목이 바뀌었거나 본문이 채워짐 ({str(title)[:30]})")
+            continue
+        outcomes.append((row_index, result["text"], Exception(result["error"]) if result["error"] else None))
+    return outcomes
+
+
+def process_blog_titles(excel_file_path, api_key, concurrency=8, cache_path=None, batch_mode=None, poll_interval=30.0,
+                        dedup_path=None, token_budget_path=None, requests_per_minute=None, tokens_per_minute=None):
     """
     엑셀 파일의 제목을 읽어 블로그 본문을 생성하고 저장
     
     Args:
         excel_file_path: 엑셀 파일 경로
         api_key: Gemini API 키
+        concurrency: 동시에 생성할 최대 글 수
+        cache_path: 생성 결과 캐시 파일 경로 (None이면 캐시 사용 안 함)
+        batch_mode: None이면 행별 동시 호출, "remote"/"local"이면 전체를 하나의 배치 작업으로 처리
+        poll_interval: 배치 작업 상태 확인 간격(초)
+        dedup_path: 유사 중복 색인 파일 경로 (None이면 중복 확인 안 함)
+        token_budget_path: 출력 토큰 예산 학습 파일 경로 (None이면 예산 조절/이어쓰기 안 함)
+        requests_per_minute: 분당 최대 요청 수 (None이면 제한 없음, 할당량 오류 시 동시 실행 수는 항상 줄임)
+        tokens_per_minute: 분당 최대 토큰 수 (None이면 제한 없음)
     """
     try:
         # Gemini API 초기화
-        generator = BlogContentGenerator(api_key)
+        cache = ResponseCache(cache_path) if cache_path else None
+        token_budget = TokenBudget(token_budget_path) if token_budget_path else None
+        # 429가 나면 동시 실행 수를 절반으로 줄였다가 연속 성공 시 다시 늘림 (헤지 요청도 같은 한도 안에서 실행)
+        rate_limiter = RateLimiter(
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            max_concurrency=max(1, concurrency)
+        )
+        generator = BlogContentGenerator(api_key, cache=cache, token_budget=token_budget, rate_limiter=rate_limiter)
+        duplicate_index = DuplicateIndex(dedup_path) if dedup_path else None
+        sheet_index = DuplicateIndex(":memory:") if dedup_path else None
         
         # 엑셀 파일 열기
         print(f"\n[파일 열기] {excel_file_path}")
@@ -98,7 +189,8 @@ def process_blog_titles(excel_file_path, api_key):
         max_row = sheet.max_row
         print(f"[정보] 총 {max_row - 1}개의 제목 발견 (헤더 제외)")
         
-        # 2행부터 마지막 행까지 순회 (1행은 헤더)
+        # 2행부터 마지막 행까지 순회하며 처리할 제목 수집 (1행은 헤더)
+        pending_rows = []
         for row_index in range(2, max_row + 1):
             # A열에서 제목 읽기
             title_cell = sheet.cell(row=row_index, column=1)
@@ -109,25 +201,99 @@ def process_blog_titles(excel_file_path, api_key):
                 print(f"[건너뛰기] {row_index}행: 제목이 비어있음")
                 continue
             
-            print(f"\n{'='*60}")
-            print(f"[진행중] 현재 {row_index}행: {title}")
-            print(f"{'='*60}")
+            # B열이 이미 채워진 행은 이전 실행에서 완료된 것으로 보고 건너뛰기
+            content_value = sheet.cell(row=row_index, column=2).value
+            if content_value and str(content_value).strip():
+                print(f"[건너뛰기] {row_index}행: 본문이 이미 있음")
+                continue
+            
+            # 이미 다룬 제목이나 시트 안에서 앞 행과 거의 같은 제목은 생성하지 않음
+            if duplicate_index is not None:
+                signature = duplicate_index.signature(str(title), kind="keyword")
+                matches = (duplicate_index.find_similar(str(title), kind="keyword", signature=signature)
+                           or sheet_index.find_similar(str(title), kind="keyword", signature=signature))
+                if matches:
+                    print(f"[건너뛰기] {row_index}행: 유사한 제목이 이미 있음 ({matches[0][1]}, 유사도 {matches[0][0]:.2f})")
+                    continue
+                sheet_index.add(str(title), kind="keyword", signature=signature)
             
+            pending_rows.append((row_index, title))
+        
+        def generate_row(row_item):
+            row_index, title = row_item
+            print(f"[진행중] 현재 {row_index}행: {title}")
             try:
                 # 블로그 본문 생성
-                blog_content = generator.generate_blog_content(title)
+                return row_index, generator.generate_blog_content(title), None
+            except Exception as error:
+                return row_index, None, error
+        
+        # 중복 색인 등록은 엑셀 저장이 성공한 뒤에 한꺼번에 처리
+        # (저장 전에 중단되면 다음 실행에서 같은 제목을 중복으로 보고 건너뛰는 문제 방지)
+        written_posts = []
+        
+        def write_rows(outcomes):
+            # 셀 쓰기는 메인 스레드에서 행 순서대로 처리
+            for row_index, blog_content, error in outcomes:
+                if error is not None:
+                    # 예외 발생 시 에러 메시지 출력하고 다음 행으로 진행
+                    print(f"[ERROR] {row_index}행 처리 중 오류 발생: {str(error)}")
+                    print(f"[계속] 다음 행으로 진행합니다...")
+                    continue
+                
+                if duplicate_index is not None:
+                    # 제목은 달라도 본문이 기존 글이나 이번 실행의 앞 행과 거의 같으면 저장하지 않음
+                    signature = duplicate_index.signature(blog_content, kind="post")
+                    matches = (duplicate_index.find_similar(blog_content, kind="post", signature=signature)
+                               or sheet_index.find_similar(blog_content, kind="post", signature=signature))
+                    if matches:
+                        print(f"[건너뛰기] {row_index}행: 기존 글과 본문이 유사함 ({matches[0][1]}, 유사도 {matches[0][0]:.2f})")
+                        continue
+                    title = str(sheet.cell(row=row_index, column=1).value)
+                    sheet_index.add(blog_content, kind="post", label=title, signature=signature)
+                    written_posts.append((title, blog_content, signature))
                 
                 # B열에 생성된 본문 저장
                 content_cell = sheet.cell(row=row_index, column=2)
                 content_cell.value = blog_content
                 
                 print(f"[완료] {row_index}행 본문 생성 완료 (길이: {len(blog_content)}자)")
-                
-            except Exception as error:
-                # 예외 발생 시 에러 메시지 출력하고 다음 행으로 진행
-                print(f"[ERROR] {row_index}행 처리 중 오류 발생: {str(error)}")
-                print(f"[계속] 다음 행으로 진행합니다...")
-                continue
+        
+        if batch_mode:
+            print(f"\n{'='*60}")
+            print(f"[생성 시작] {len(pending_rows)}개 제목 (배치 작업: {batch_mode})")
+            print(f"{'='*60}")
+            
+            # 행별 지연 시간 대신 처리량과 비용을 우선하는 대량 처리
+            if pending_rows or os.path.exists(f"{excel_file_path}.batch.json"):
+                write_rows(generate_rows_batch(
+                    generator,
+                    pending_rows,
+                    f"{excel_file_path}.batch.json",
+                    batch_mode=batch_mode,
+                    poll_interval=poll_interval
+                ))
+        else:
+            worker_count = max(1, min(concurrency, len(pending_rows) or 1))
+            print(f"\n{'='*60}")
+            print(f"[생성 시작] {len(pending_rows)}개 제목 (동시 실행: {worker_count})")
+            print(f"{'='*60}")
+            
+            # 생성은 스레드 풀에서 동시에 처리
+            with ThreadPoolExecutor(max_workers=worker_count) as executor:
+                write_rows(executor.map(generate_row, pending_rows))
+        
+        # 생성 통계 출력 및 저장
+        if generator.stats.records:
+            generator.stats.print_summary()
+            generator.stats.dump_json(
+                f"생성통계_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                extra={
+                    "hedging": generator.gemini.hedging_policy.usage() if generator.gemini.hedging_policy else None,
+                    "token_budget": generator.gemini.token_budget.usage() if generator.gemini.token_budget else None,
+                    "single_flight": generator.gemini.single_flight.usage(),
+                }
+            )
         
         # 수정된 데이터를 원본 파일에 덮어쓰기
         print(f"\n[저장중] 파일 저장: {excel_file_path}")
@@ -142,6 +308,11 @@ def process_blog_titles(excel_file_path, api_key):
             print(f"[완료] 대신 새 파일로 저장했습니다: {backup_file_path}")
             print(f"[안내] 원본 파일을 닫은 후 다시 실행하거나, 완성본 파일을 사용하세요.")
         
+        # 저장된 제목과 본문만 중복 색인에 등록
+        for title, blog_content, signature in written_posts:
+            duplicate_index.add(title, kind="keyword")
+            duplicate_index.add(blog_content, kind="post", label=title, signature=signature)
+        
     except FileNotFoundError:
         print(f"[ERROR] 파일을 찾을 수 없습니다: {excel_file_path}")
     except Exception as error:
@@ -164,8 +335,22 @@ def main():
     print("블로그 글 AI 자동 완성 프로그램")
     print("="*60)
     
-    # 블로그 제목 처리
-    process_blog_titles(excel_file_path, api_key)
+    # 대량 처리 시 --batch (Gemini 배치 API) 또는 --batch-local (로컬 대체 배치 서버)
+    batch_mode = None
+    if "--batch" in sys.argv:
+        batch_mode = "remote"
+    elif "--batch-local" in sys.argv:
+        batch_mode = "local"
+    
+    # 블로그 제목 처리 (중단 후 재실행 시 캐시된 본문 재사용)
+    process_blog_titles(
+        excel_file_path,
+        api_key,
+        cache_path="gemini_cache.sqlite3",
+        batch_mode=batch_mode,
+        dedup_path="gemini_dedup.sqlite3",
+        token_budget_path="gemini_token_budget.json"
+    )
 
 
 if __name__ == "__main__":
@@ -13,7 +13,7 @@ import re
 
 # gemini 모듈 임포트
 try:
-    from gemini import GeminiAPI
+    from gemini import GeminiAPI, get_gemini_api
 except ImportError:
     print("[경고] gemini.py 파일을 찾을 수 없습니다.")
     GeminiAPI = None
@@ -205,7 +205,8 @@ def generate_blog_content(topic="파이썬 프로그래밍"):
     
     try:
         log_print(f"\n[Gemini API] '{topic}' 주제로 블로그 글 생성 중...")
-        gemini = GeminiAPI(api_key=GEMINI_API_KEY)
+        # 호출마다 새로 만들지 않고 공용 클라이언트 재사용 (연결 유지)
+        gemini = get_gemini_api(api_key=GEMINI_API_KEY)
         
         # 블로그 글 생성
         blog_post = gemini.generate_blog_post(
@@ -272,12 +273,10 @@ def generate_blog_content(topic="파이썬 프로그래밍"):
         }
         
     except Exception as e:
+        # 재시도 후에도 실패한 경우 임시 텍스트를 게시하지 않도록 None 반환
         log_print(f"[ERROR] Gemini API 오류: {str(e)}")
-        log_print("기본 텍스트를 사용합니다.")
-        return {
-            "title": f"{topic} - 초보자 가이드",
-            "content": f"{topic}에 대해 알아보겠습니다.\n\n기본적인 내용부터 차근차근 설명드리겠습니다.\n\n따라하시면 쉽게 이해하실 수 있습니다."
-        }
+        log_print("글 생성에 실패하여 작성을 건너뜁니다.")
+        return None
 
 # 블로그 글 작성 함수
 def write_blog_post(driver, blog_content=None):
@@ -286,6 +285,9 @@ def write_blog_post(driver, blog_content=None):
         # 블로그 내용이 제공되지 않았다면 생성
         if blog_content is None:
             blog_content = generate_blog_content("파이썬 웹 스크래핑")
+        if blog_content is None:
+            log_print("[ERROR] 작성할 글이 없습니다.")
+            return False
         # 1. iframe 전환
         log_print("\niframe으로 전환 중...")
         iframe = WebDriverWait(driver, 15).until(
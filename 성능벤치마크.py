@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+"""
+Gemini 호출 경로 성능 벤치마크 (네트워크/할당량 없이 로컬 가짜 서버 사용)
+
+로컬에 Gemini REST API 형태의 가짜 모델 서버를 띄우고 GEMINI_BASE_URL로 연결해
+GeminiAPI, BlogContentGenerator.generate_blog_content, GUI의 글 생성 경로를
+같은 조건에서 측정한다. 지연 시간, 지터, 오류율, 출력 길이를 조절할 수 있고
+시드를 고정하면 같은 조건의 결과를 다시 얻을 수 있다.
+
+사용 예:
+    python 성능벤치마크.py --requests 40 --concurrency 8 --latency 0.5 --jitter 0.2 --error-rate 0.05
+    python 성능벤치마크.py --scenarios many,cache --json 벤치마크결과.json
+"""
+import os
+import sys
+import json
+import random
+import tempfile
+import argparse
+import importlib
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+
+# Windows 콘솔 인코딩 설정
+if sys.platform == "win32":
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from gemini import GeminiAPI, ResponseCache, percentile, render_blog_post_html
+
+
+class FakeGeminiServer:
+    """generateContent / streamGenerateContent를 흉내 내는 로컬 가짜 모델 서버"""
+    
+    def __init__(self, latency=0.5, jitter=0.1, error_rate=0.0, output_chars=3000, seed=42, stream_chunks=10):
+        """
+        가짜 서버 초기화
+        
+        Args:
+            latency: 요청당 평균 응답 시간(초)
+            jitter: 응답 시간 표준편차(초)
+            error_rate: 503 UNAVAILABLE을 돌려줄 확률 (0.0 ~ 1.0)
+            output_chars: 응답 본문 길이(자)
+            seed: 요청별 난수 시드 (같은 시드면 같은 순서의 요청에 같은 지연/오류)
+            stream_chunks: 스트리밍 응답을 나눌 조각 수
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.output_chars = output_chars
+        self.seed = seed
+        self.stream_chunks = max(1, stream_chunks)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+    
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self):
+        """백그라운드 스레드에서 서버 시작 (빈 포트 자동 선택)"""
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def do_GET(self):
+                # warm_up의 models.get 요청
+                model = self.path.split("?")[0].rsplit("/", 1)[-1]
+                self._send_json(200, {"name": f"models/{model}", "displayName": model})
+            
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                server.handle(self, body)
+            
+            def _send_json(self, status, payload):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+        
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """서버 종료"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+    
+    def reset_counters(self):
+        """요청/오류 횟수 초기화 (시나리오마다 호출)"""
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+    
+    def _next_random(self):
+        with self._lock:
+            self.requests += 1
+            return random.Random(f"{self.seed}:{self.requests}")
+    
+    def _output_text(self, max_output_tokens, json_mode=False):
+        """
+        출력 길이에 맞춘 응답 텍스트 (max_output_tokens를 넘으면 잘라서 MAX_TOKENS로 표시)
+        
+        일반 요청은 구조 검증을 통과하는 블로그 글 HTML(작성 기준일 제외)로, 소제목 수를 늘려
+        output_chars 이상이 되게 만든다. 실제 모델처럼 목차에 FAQ 항목도 넣어, 구역 분리가 목차 항목을
+        FAQ 제목으로 착각하면 gui 시나리오에서 부분 재생성 요청(서버 요청 수 증가)으로 드러나게 한다. JSON 요청은 블로그 글/개요/섹션/FAQ/마무리 프롬프트
+        어느 형식으로도 읽을 수 있는 JSON을 돌려준다.
+        
+        Returns:
+            (텍스트, 잘림 여부)
+        """
+        paragraph = "벤치마크용 가짜 응답 문단입니다. 실제 모델 대신 로컬 서버가 생성했습니다."
+        
+        def build(section_count):
+            return {
+                "title": "벤치마크 테스트 글",
+                "intro": paragraph,
+                "recommend": [f"추천 대상 {index}" for index in range(1, 5)],
+                "summary": paragraph,
+                "headings": [f"소제목 {index}" for index in range(1, section_count + 1)],
+                "sections": [
+                    {"heading": f"소제목 {index}", "paragraphs": [paragraph] * 3}
+                    for index in range(1, section_count + 1)
+                ],
+                "paragraphs": [paragraph] * 3,
+                "faq": [{"q": f"질문 {index}", "a": paragraph} for index in range(1, 6)],
+                "links": [{"name": "참고 사이트", "url": "https://example.com"}],
+                "closing": paragraph,
+            }
+        
+        if json_mode:
+            text = json.dumps(build(5), ensure_ascii=False)
+        else:
+            section_count = 1
+            while True:
+                # 모델은 작성 기준일 안내를 쓰지 않으므로 렌더링 결과에서 제외
+                blocks = render_blog_post_html(build(section_count)).split("\n\n")
+                text = "\n\n".join(blocks[:1] + blocks[2:])
+                toc_end = text.index("</ul>", text.index("📌 목차"))
+                text = text[:toc_end] + "<li>자주 묻는 질문(FAQ)</li>\n" + text[toc_end:]
+                if len(text) >= self.output_chars or section_count >= 100:
+                    break
+                section_count += 1
+        
+        if max_output_tokens and len(text) > int(max_output_tokens):
+            return text[:int(max_output_tokens)], True
+        return text, False
+    
+    @staticmethod
+    def _response_payload(text, prompt_chars, finish_reason="STOP", output_tokens=None, candidate_count=1):
+        # 스트리밍 조각의 사용량은 실제 API처럼 지금까지의 누적값으로 표시
+        output_tokens = (len(text) if output_tokens is None else output_tokens) * candidate_count
+        return {
+            "candidates": [
+                {
+                    "content": {"role": "model", "parts": [{"text": text}]},
+                    "finishReason": finish_reason,
+                    "index": index,
+                }
+                for index in range(candidate_count)
+            ],
+            "usageMetadata": {
+                "promptTokenCount": prompt_chars,
+                "candidatesTokenCount": output_tokens,
+                "totalTokenCount": prompt_chars + output_tokens,
+            },
+        }
+    
+    def handle(self, handler, body):
+        """요청 하나 처리 (지연 → 오류 또는 응답)"""
+        rng = self._next_random()
+        delay = max(0.0, rng.gauss(self.latency, self.jitter))
+        failed = rng.random() < self.error_rate
+        
+        prompt_chars = sum(
+            len(part.get("text", ""))
+            for content in body.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        generation_config = body.get("generationConfig") or {}
+        text, truncated = self._output_text(
+            generation_config.get("maxOutputTokens"),
+            json_mode=generation_config.get("responseMimeType") == "application/json"
+        )
+        finish_reason = "MAX_TOKENS" if truncated else "STOP"
+        
+        if failed:
+            time.sleep(delay)
+            with self._lock:
+                self.errors += 1
+            handler._send_json(503, {"error": {
+                "code": 503,
+                "message": "The model is overloaded. Please try again later. (fake server)",
+                "status": "UNAVAILABLE",
+            }})
+            return
+        
+        if ":streamGenerateContent" not in handler.path:
+            time.sleep(delay)
+            handler._send_json(200, self._response_payload(
+                text, prompt_chars, finish_reason, candidate_count=int(generation_config.get("candidateCount") or 1)
+            ))
+            return
+        
+        # 스트리밍: 전체 지연 시간을 조각 수만큼 나눠 SSE로 전송
+        handler.send_response(200)
+        handler.send_header("Content-Type", "text/event-stream")
+        handler.send_header("Connection", "close")
+        handler.end_headers()
+        chunk_size = max(1, -(-len(text) // self.stream_chunks))
+        pieces = [text[index:index + chunk_size] for index in range(0, len(text), chunk_size)] or [""]
+        for index, piece in enumerate(pieces):
+            time.sleep(delay / len(pieces))
+            reason = finish_reason if index == len(pieces) - 1 else None
+            sent = sum(len(previous) for previous in pieces[:index + 1])
+            payload = self._response_payload(piece, prompt_chars, reason, output_tokens=sent)
+            if reason is None:
+                del payload["candidates"][0]["finishReason"]
+            handler.wfile.write(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+            handler.wfile.flush()
+        handler.close_connection = True
+
+
+def summarize_latencies(latencies):
+    """지연 시간 목록의 p50/p95/p99/최대값"""
+    values = sorted(latencies)
+    return {
+        "latency_p50": round(percentile(values, 50), 3) if values else None,
+        "latency_p95": round(percentile(values, 95), 3) if values else None,
+        "latency_p99": round(percentile(values, 99), 3) if values else None,
+        "latency_max": round(values[-1], 3) if values else None,
+    }
+
+
+def run_items(items, func, concurrency):
+    """
+    항목별로 func를 동시에 실행하고 항목별 지연 시간과 성공 여부 측정
+    
+    Returns:
+        (전체 소요 시간, 지연 시간 리스트, 실패 수)
+    """
+    def timed(item):
+        started = time.perf_counter()
+        try:
+            ok = func(item) is not None
+        except Exception:
+            ok = False
+        return time.perf_counter() - started, ok
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        outcomes = list(executor.map(timed, items))
+    elapsed = time.perf_counter() - started
+    
+    return elapsed, [latency for latency, _ in outcomes], sum(1 for _, ok in outcomes if not ok)
+
+
+def make_result(name, server, elapsed, latencies, failed, concurrency):
+    """시나리오 결과 딕셔너리"""
+    result = {
+        "scenario": name,
+        "items": len(latencies),
+        "concurrency": concurrency,
+        "failed": failed,
+        "elapsed": round(elapsed, 3),
+        "throughput_per_sec": round(len(latencies) / elapsed, 3) if elapsed > 0 else None,
+        "server_requests": server.requests,
+        "server_errors": server.errors,
+    }
+    result.update(summarize_latencies(latencies))
+    return result
+
+
+def scenario_sequential(server, options, api_key):
+    """GeminiAPI.generate_content를 한 건씩 순서대로 호출 (동시성 비교 기준선)"""
+    gemini = GeminiAPI(api_key=api_key)
+    prompts = [f"벤치마크 순차 요청 {index}" for index in range(options.requests)]
+    elapsed, latencies, failed = run_items(prompts, lambda prompt: gemini.generate_content(prompt), 1)
+    return make_result("sequential", server, elapsed, latencies, failed, 1)
+
+
+def scenario_many(server, options, api_key):
+    """GeminiAPI.generate_many 동시 호출"""
+    gemini = GeminiAPI(api_key=api_key)
+    prompts = [f"벤치마크 동시 요청 {index}" for index in range(options.requests)]
+    started = time.perf_counter()
+    results = gemini.generate_many(prompts, concurrency=options.concurrency)
+    elapsed = time.perf_counter() - started
+    
+    # generate_many는 항목별 시간을 주지 않으므로 UsageStats의 호출별 지연 시간 사용
+    latencies = [record["latency"] for record in gemini.stats.records if record["success"]]
+    failed = sum(1 for result in results if result["error"] is not None)
+    return make_result("many", server, elapsed, latencies, failed, options.concurrency)
+
+
+def scenario_cache(server, options, api_key):
+    """같은 프롬프트를 두 번 생성해 두 번째 실행의 캐시 효과 측정"""
+    cache_dir = tempfile.mkdtemp(prefix="gemini_bench_")
+    cache = ResponseCache(os.path.join(cache_dir, "cache.sqlite3"))
+    gemini = GeminiAPI(api_key=api_key, cache=cache)
+    prompts = [f"벤치마크 캐시 요청 {index}" for index in range(options.requests)]
+    
+    gemini.generate_many(prompts, concurrency=options.concurrency)
+    server.reset_counters()
+    elapsed, latencies, failed = run_items(prompts, lambda prompt: gemini.generate_content(prompt), options.concurrency)
+    cache.close()
+    
+    result = make_result("cache", server, elapsed, latencies, failed, options.concurrency)
+    result["cache_hits"] = cache.hits
+    return result
+
+
+def scenario_blog_generator(server, options, api_key):
+    """BlogContentGenerator.generate_blog_content (엑셀 제목 → 본문 경로) 동시 호출"""
+    module = importlib.import_module("블로그글AI완성하기")
+    
+    generator = module.BlogContentGenerator(api_key)
+    titles = [f"벤치마크 제목 {index}" for index in range(options.requests)]
+    elapsed, latencies, failed = run_items(titles, generator.generate_blog_content, options.concurrency)
+    return make_result("blog_generator", server, elapsed, latencies, failed, options.concurrency)
+
+
+def scenario_gui(server, options, api_key):
+    """GUI의 generate_blog_content (스트리밍 생성 경로)를 창 없이 한 건씩 호출"""
+    module = importlib.import_module("AI글쓰기자동화봇_GUI")
+    
+    class HeadlessGUI:
+        """GUI 글 생성 메서드가 사용하는 속성만 가진 대역 (로그는 버림)"""
+        
+        def __init__(self):
+            self.gemini = GeminiAPI(api_key=api_key)
+        
+        def log(self, message):
+            pass
+    
+    gui = HeadlessGUI()
+    keywords = [f"벤치마크 키워드 {index}" for index in range(max(1, options.requests // 4))]
+    elapsed, latencies, failed = run_items(
+        keywords,
+        lambda keyword: module.NaverBlogAutomationGUI.generate_blog_content(gui, keyword),
+        1
+    )
+    return make_result("gui_stream", server, elapsed, latencies, failed, 1)
+
+
+SCENARIOS = {
+    "sequential": scenario_sequential,
+    "many": scenario_many,
+    "cache": scenario_cache,
+    "blog_generator": scenario_blog_generator,
+    "gui": scenario_gui,
+}
+
+
+def print_results(results):
+    """결과 표 출력"""
+    print(f"\n{'='*100}")
+    print(f"{'시나리오':<16}{'건수':>6}{'동시':>6}{'실패':>6}{'소요(초)':>10}{'처리량/초':>10}"
+          f"{'p50':>8}{'p95':>8}{'p99':>8}{'서버요청':>10}{'서버오류':>10}")
+    print(f"{'-'*100}")
+    for result in results:
+        if "skipped" in result:
+            print(f"{result['scenario']:<16}[건너뛰기] {result['skipped']}")
+            continue
+        print(f"{result['scenario']:<16}{result['items']:>6}{result['concurrency']:>6}{result['failed']:>6}"
+              f"{result['elapsed']:>10}{result['throughput_per_sec']:>10}"
+              f"{result['latency_p50']:>8}{result['latency_p95']:>8}{result['latency_p99']:>8}"
+              f"{result['server_requests']:>10}{result['server_errors']:>10}")
+    print(f"{'='*100}")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="로컬 가짜 서버를 사용한 Gemini 호출 경로 벤치마크")
+    parser.add_argument("--requests", type=int, default=40, help="시나리오별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 실행 수")
+    parser.add_argument("--latency", type=float, default=0.5, help="평균 응답 시간(초)")
+    parser.add_argument("--jitter", type=float, default=0.1, help="응답 시간 표준편차(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 오류 확률 (0.0 ~ 1.0)")
+    parser.add_argument("--output-chars", type=int, default=3000, help="응답 본문 길이(자)")
+    parser.add_argument("--seed", type=int, default=42, help="지연/오류 난수 시드")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="실행할 시나리오 (쉼표 구분)")
+    parser.add_argument("--json", dest="json_path", help="결과를 저장할 JSON 파일 경로")
+    options = parser.parse_args()
+    
+    server = FakeGeminiServer(
+        latency=options.latency,
+        jitter=options.jitter,
+        error_rate=options.error_rate,
+        output_chars=options.output_chars,
+        seed=options.seed
+    ).start()
+    
+    # 모든 클라이언트가 가짜 서버로 요청하도록 설정 (클라이언트 생성 시점에 적용됨)
+    os.environ["GEMINI_BASE_URL"] = server.base_url
+    print(f"[OK] 가짜 Gemini 서버 시작: {server.base_url}")
+    
+    results = []
+    try:
+        for index, name in enumerate(name.strip() for name in options.scenarios.split(",") if name.strip()):
+            if name not in SCENARIOS:
+                print(f"[경고] 알 수 없는 시나리오: {name}")
+                continue
+            
+            print(f"\n[시나리오] {name}")
+            server.reset_counters()
+            try:
+                # 시나리오마다 다른 키를 써서 공용 클라이언트/인스턴스 상태가 섞이지 않게 함
+                results.append(SCENARIOS[name](server, options, f"benchmark-key-{index}"))
+            except ImportError as error:
+                results.append({"scenario": name, "skipped": f"모듈을 불러올 수 없음 ({str(error)})"})
+    finally:
+        server.stop()
+    
+    print_results(results)
+    
+    if options.json_path:
+        with open(options.json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "options": vars(options),
+                "results": results,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"[OK] 벤치마크 결과 저장: {options.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,12 +13,25 @@ import time
 from datetime import datetime
 import openpyxl
 
+# 본문이 빈 행은 Gemini로 생성 (gemini 모듈이 없으면 본문이 있는 행만 작성)
+try:
+    from gemini import GenerateAhead, ResponseCache, get_gemini_api, prepare_post
+except ImportError:
+    GenerateAhead = None
+    ResponseCache = None
+    get_gemini_api = None
+    prepare_post = None
+
 # ========== 설정 영역 - 여기만 수정하세요 ==========
 NAVER_ID = "shinung"  # 네이버 아이디
 NAVER_PW = "wE0905**"  # 네이버 비밀번호
 EXCEL_FILE = "posting_완성본.xlsx"  # 엑셀 파일명
+GEMINI_API_KEY = None  # 본문이 빈 행을 생성할 API 키 (None이면 GEMINI_API_KEY 환경변수)
 # ===================================================
 
+# 생성 결과 캐시 파일 (엑셀 저장에 실패한 뒤 재실행해도 같은 제목은 다시 생성하지 않음)
+CACHE_FILE = "gemini_cache.sqlite3"
+
 # 로그 파일 설정
 log_file = f"자동글쓰기_로그_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
 
@@ -94,6 +107,15 @@ def read_excel_data():
                     "content": content
                 })
                 log_print(f"  [{row_num-1}번째] 제목: {title[:50]}...")
+            elif title and get_gemini_api is not None:
+                # 제목만 있는 행은 작성 중 백그라운드에서 본문 생성
+                title = str(title).strip()
+                posts.append({
+                    "row": row_num,
+                    "title": title,
+                    "content": None
+                })
+                log_print(f"  [{row_num-1}번째] 제목: {title[:50]}... (본문 생성 예정)")
             else:
                 log_print(f"  [{row_num}행] 건너뜀 (빈 데이터)")
         
@@ -110,6 +132,36 @@ def read_excel_data():
         log_print(f"[ERROR] 엑셀 파일 읽기 오류: {str(e)}")
         return []
 
+def save_generated_content(post, content):
+    """
+    생성한 본문을 엑셀 B열에 기록 (게시 전에 저장해 중단 후 재실행 시 다시 생성하지 않도록 함)
+    
+    Returns:
+        저장 성공 여부
+    """
+    try:
+        workbook = openpyxl.load_workbook(EXCEL_FILE)
+        sheet = workbook.active
+        title_cell = sheet.cell(row=post['row'], column=1)
+        content_cell = sheet.cell(row=post['row'], column=2)
+        
+        # 실행 중에 엑셀에서 행을 고쳤으면 덮어쓰지 않음
+        if str(title_cell.value or "").strip() != post['title'] or content_cell.value:
+            workbook.close()
+            log_print(f"  [건너뛰기] {post['row']}행: 읽은 뒤 제목이 바뀌었거나 본문이 채워져 엑셀에 기록하지 않음")
+            return False
+        
+        content_cell.value = content
+        workbook.save(EXCEL_FILE)
+        workbook.close()
+        post['content'] = content
+        log_print(f"  [저장] {post['row']}행 생성 본문을 엑셀에 기록")
+        return True
+    except Exception as e:
+        # 엑셀에서 파일을 열어 둔 경우 등 - 재실행 시에는 캐시된 본문을 재사용
+        log_print(f"  [경고] 생성 본문을 엑셀에 저장하지 못했습니다: {str(e)}")
+        return False
+
 def naver_login(driver):
     """네이버 로그인 수행"""
     try:
@@ -393,6 +445,7 @@ def write_single_post(driver, title, content):
 def main():
     """메인 실행 함수"""
     driver = None
+    pipeline = None
     
     try:
         log_print(f"\n{'='*80}")
@@ -423,6 +476,27 @@ def main():
             log_print("\n사용자가 작업을 취소했습니다.")
             return
         
+        # 본문이 빈 행이 있으면 Gemini 준비
+        gemini = None
+        if any(not post['content'] for post in posts):
+            try:
+                gemini = get_gemini_api(api_key=GEMINI_API_KEY, cache=ResponseCache(CACHE_FILE))
+            except Exception as e:
+                # API 키가 없거나 초기화에 실패하면 본문이 있는 행만 작성
+                log_print(f"[경고] Gemini API 초기화 실패 - 본문이 빈 행은 건너뜁니다: {str(e)}")
+                posts = [post for post in posts if post['content']]
+                if not posts:
+                    log_print("\n[ERROR] 작성할 글이 없습니다.")
+                    return
+        
+        # 생성-작성 파이프라인: 글 N을 브라우저에 입력하는 동안 글 N+1 본문을 미리 생성
+        # (첫 글 생성은 브라우저 실행/로그인과 동시에 진행)
+        if GenerateAhead is not None:
+            pipeline = GenerateAhead(posts, lambda post: prepare_post(gemini, post, log=log_print)).start()
+            entries = pipeline
+        else:
+            entries = ((post, post['content'], None) for post in posts)
+        
         # 드라이버 설정
         log_print("\n크롬 브라우저 실행 중...")
         driver = setup_driver()
@@ -440,11 +514,20 @@ def main():
         log_print(f"총 {len(posts)}개의 글 작성 시작")
         log_print(f"{'='*80}")
         
-        for idx, post in enumerate(posts, 1):
+        for idx, (post, content, error) in enumerate(entries, 1):
             log_print(f"\n[{idx}/{len(posts)}] {post['row']-1}번째 글 작성 중...")
             log_print(f"  제목: {post['title'][:60]}")
             
-            if write_single_post(driver, post['title'], post['content']):
+            if error is not None or not content:
+                fail_count += 1
+                log_print(f"  ✗ 본문 생성 실패: {str(error) if error else '빈 응답'}")
+                continue
+            
+            # 생성한 본문은 게시 전에 엑셀에 기록 (게시 도중 중단되어도 재실행 시 다시 생성하지 않음)
+            if not post['content']:
+                save_generated_content(post, content)
+            
+            if write_single_post(driver, post['title'], content):
                 success_count += 1
                 log_print(f"  ✓ 성공")
             else:
@@ -473,6 +556,10 @@ def main():
         log_print(f"\n[ERROR] 프로그램 실행 중 오류: {str(e)}")
         
     finally:
+        # 미리 생성 중인 작업 중단
+        if pipeline:
+            pipeline.stop()
+        
         # 드라이버 종료
         if driver:
             driver.quit()